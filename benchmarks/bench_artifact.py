@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Compares the start times of processors importing a model from source and
+loading a saved model artifact.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pyfranca import Processor
+
+
+def make_fidl(package, count):
+    """
+    Create FIDL text of a package with count structs, importing the
+    previous package.
+    """
+    lines = ["package Bench{}".format(package)]
+    if package:
+        lines.append("import model \"bench{}.fidl\"".format(package - 1))
+    lines.append("typeCollection Types {")
+    for index in range(count):
+        lines.append("\tstruct P{}S{} {{".format(package, index))
+        lines.append("\t\tUInt64 time")
+        lines.append("\t\tDouble[] values")
+        if index:
+            lines.append("\t\tP{}S{} previous".format(package, index - 1))
+        elif package:
+            lines.append("\t\tP{}S0 base".format(package - 1))
+        lines.append("\t}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares the start times of processors importing a "
+                    "model from source and loading a saved model artifact.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=10,
+        help="Number of packages.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=2000,
+        help="Number of structs per package.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+    directory = tempfile.mkdtemp()
+    try:
+        fspecs = []
+        for package in range(args.packages):
+            fspec = os.path.join(directory, "bench{}.fidl".format(package))
+            with open(fspec, "w") as f:
+                f.write(make_fidl(package, args.number))
+            fspecs.append(fspec)
+        artifact = os.path.join(directory, "model.pfa")
+
+        start = time.time()
+        processor = Processor()
+        for fspec in fspecs:
+            processor.import_file(fspec)
+        print("source   {:>7.3f} s".format(time.time() - start))
+        start = time.time()
+        processor.save(artifact)
+        print("save     {:>7.3f} s, {:.1f} MB".format(
+            time.time() - start, os.path.getsize(artifact) / 1e6))
+        del processor
+
+        start = time.time()
+        processor = Processor()
+        processor.load(artifact)
+        print("load     {:>7.3f} s, {} packages".format(
+            time.time() - start, len(processor.packages)))
+        del processor
+
+        start = time.time()
+        processor = Processor()
+        processor.load(artifact, lazy=True)
+        processor.get_package("Bench0")
+        print("lazy     {:>7.3f} s, {} packages".format(
+            time.time() - start, len(processor.packages)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
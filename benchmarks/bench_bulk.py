@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Compares element-wise and bulk coding of arrays of fixed-layout structs.
+"""
+
+import argparse
+import timeit
+from pyfranca import Processor
+from pyfranca.franca_classes import python_type
+from pyfranca.franca_codec import type_codec, BulkCodec
+
+
+MODEL = """
+package Bench
+typeCollection Types {
+    struct Sample {
+        UInt64 time
+        Int32 x
+        Int32 y
+        Int32 z
+        Float quality
+        Boolean valid
+    }
+    array Samples of Sample
+}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares element-wise and bulk coding of arrays of "
+                    "fixed-layout structs.")
+    parser.add_argument(
+        "-s", "--size", type=int, default=10000,
+        help="Number of array elements.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=20,
+        help="Number of arrays per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    processor.import_string("bench.fidl", MODEL)
+    types = processor.packages["Bench"]["Types"]
+    sample_class = python_type(types.structs["Sample"])
+    samples = [sample_class(time=i, x=i, y=-i, z=0, quality=0.5, valid=True)
+               for i in range(args.size)]
+    codec = type_codec(types.arrays["Samples"])
+    data = bytes(codec.encode(samples))
+
+    codecs = [("element-wise", codec)]
+    columns = BulkCodec(types.arrays["Samples"], use_numpy=False)
+    codecs.append(("bulk (array)", columns))
+    bulk = BulkCodec(types.arrays["Samples"])
+    if bulk.numpy is not None:
+        codecs.append(("bulk (NumPy)", bulk))
+
+    for name, item in codecs:
+        records = item.decode(data)
+        for operation, function in (
+                ("encode", lambda: item.encode(records)),
+                ("decode", lambda: item.decode(data))):
+            seconds = min(timeit.repeat(function, number=args.number,
+                                        repeat=3))
+            print("{:<14} {} {:>12.0f} elements/s".format(
+                name, operation, args.number * args.size / seconds))
+
+
+if __name__ == "__main__":
+    main()
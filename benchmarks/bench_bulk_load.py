@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Compares import times and later garbage collector pauses with and without a
+bulk load.
+"""
+
+import argparse
+import gc
+import time
+from pyfranca import Processor
+
+
+class PauseRecorder(object):
+    """
+    Records the durations of garbage collections, if supported.
+    """
+
+    def __init__(self):
+        self.pauses = []
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.time()
+        elif self._start is not None:
+            self.pauses.append(time.time() - self._start)
+            self._start = None
+
+    def __enter__(self):
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *args):
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.remove(self)
+
+
+def make_fidl(package, count):
+    """
+    Create FIDL text of a package with count structs, importing the
+    previous package.
+    """
+    lines = ["package Bench{}".format(package)]
+    if package:
+        lines.append("import model \"bench{}.fidl\"".format(package - 1))
+    lines.append("typeCollection Types {")
+    for index in range(count):
+        lines.append("\tstruct P{}S{} {{".format(package, index))
+        lines.append("\t\tUInt64 time")
+        lines.append("\t\tDouble[] values")
+        if index:
+            lines.append("\t\tP{}S{} previous".format(package, index - 1))
+        elif package:
+            lines.append("\t\tP{}S0 base".format(package - 1))
+        lines.append("\t}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares import times and later garbage collector "
+                    "pauses with and without a bulk load.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=10,
+        help="Number of packages.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=2000,
+        help="Number of structs per package.")
+    parser.add_argument(
+        "-a", "--allocations", type=int, default=1000000,
+        help="Number of container allocations after loading.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    fidls = [make_fidl(package, args.number)
+             for package in range(args.packages)]
+    for name, bulk, freeze in (("default", False, False),
+                               ("bulk", True, False),
+                               ("frozen", True, True)):
+        gc.collect()
+        processor = Processor()
+        start = time.time()
+        if bulk:
+            with processor.bulk_load(freeze):
+                for package, fidl in enumerate(fidls):
+                    processor.import_string(
+                        "bench{}.fidl".format(package), fidl)
+        else:
+            for package, fidl in enumerate(fidls):
+                processor.import_string("bench{}.fidl".format(package), fidl)
+        seconds = time.time() - start
+        start = time.time()
+        gc.collect()
+        full = time.time() - start
+        # Automatic collections triggered by an allocating workload.
+        with PauseRecorder() as recorder:
+            allocated = [[] for _ in range(args.allocations)]
+        del allocated
+        pauses = recorder.pauses or [0.0]
+        print("{:<8} import {:>6.2f} s, full collection {:>7.1f} ms, "
+              "{:>4} later pauses, max {:>6.1f} ms".format(
+                  name, seconds, full * 1e3, len(recorder.pauses),
+                  max(pauses) * 1e3))
+        del processor
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+
+if __name__ == "__main__":
+    main()
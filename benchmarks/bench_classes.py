@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Compares generated struct classes with dictionaries.
+"""
+
+import argparse
+import sys
+import timeit
+from pyfranca import Processor
+from pyfranca.franca_classes import python_type
+
+
+MODEL = """
+package Bench
+typeCollection Types {
+    struct Sample {
+        UInt64 time
+        Int32 x
+        Int32 y
+        Int32 z
+        Float quality
+        Boolean valid
+    }
+}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares generated struct classes with dictionaries.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=200000,
+        help="Number of operations per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    processor.import_string("bench.fidl", MODEL)
+    sample_class = python_type(
+        processor.packages["Bench"]["Types"].structs["Sample"])
+
+    def make_dict():
+        return {"time": 0, "x": 0, "y": 0, "z": 0, "quality": 0.0,
+                "valid": False}
+
+    obj = sample_class()
+    dct = make_dict()
+
+    def class_access():
+        obj.x = obj.y + obj.z
+
+    def dict_access():
+        dct["x"] = dct["y"] + dct["z"]
+
+    for name, function in (("class instantiation", sample_class),
+                           ("dict instantiation", make_dict),
+                           ("class attribute access", class_access),
+                           ("dict item access", dict_access)):
+        seconds = min(timeit.repeat(function, number=args.number, repeat=3))
+        print("{:<24} {:>8.0f} ns/op".format(
+            name, seconds / args.number * 1e9))
+    print("{:<24} {:>8} bytes".format("class instance size",
+                                      sys.getsizeof(obj)))
+    print("{:<24} {:>8} bytes".format("dict size", sys.getsizeof(dct)))
+
+
+if __name__ == "__main__":
+    main()
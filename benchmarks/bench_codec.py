@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Measures the throughput of the binary wire codec.
+"""
+
+import argparse
+import timeit
+from pyfranca import Processor
+from pyfranca.franca_classes import python_type
+from pyfranca.franca_codec import method_codecs
+
+
+MODEL = """
+package Bench
+interface Sensors {
+    struct Position { Double latitude Double longitude Float altitude }
+    struct Sample {
+        UInt64 time
+        Position position
+        Int32[] readings
+        String source
+        Boolean valid
+    }
+    method Publish {
+        in { UInt32 sequence Sample sample }
+        out { Boolean accepted }
+    }
+}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Measures the throughput of the binary wire codec.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=100000,
+        help="Number of messages per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    processor.import_string("bench.fidl", MODEL)
+    interface = processor.packages["Bench"]["Sensors"]
+    sample_class = python_type(interface.structs["Sample"])
+    position_class = python_type(interface.structs["Position"])
+    request, _ = method_codecs(interface.methods["Publish"])
+
+    message = (1, sample_class(
+        time=1234567890, position=position_class(48.1, 11.5, 520.0),
+        readings=list(range(8)), source="gps", valid=True))
+    data = bytes(request.encode(message))
+
+    for name, function in (("encode", lambda: request.encode(message)),
+                           ("decode", lambda: request.decode(data))):
+        seconds = min(timeit.repeat(function, number=args.number, repeat=3))
+        print("{:<8} {:>10.0f} msgs/s {:>8.2f} MB/s".format(
+            name, args.number / seconds,
+            args.number * len(data) / seconds / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Compares importing model variants into fresh processors and into forks of a
+processor holding the common base model.
+"""
+
+import argparse
+import gc
+import time
+from pyfranca import Processor
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def make_base(count):
+    """
+    Create FIDL text with a type collection of count structs.
+    """
+    lines = ["package Base", "typeCollection Types {"]
+    for index in range(count):
+        lines.append("\tstruct Struct{} {{".format(index))
+        lines.append("\t\tUInt64 time")
+        lines.append("\t\tDouble value")
+        lines.append("\t}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def make_overlay(variant):
+    """
+    Create FIDL text of a variant extending the base package.
+    """
+    return "\n".join([
+        "package Base",
+        "import Base.Types.* from \"base.fidl\"",
+        "typeCollection Variant{} {{".format(variant),
+        "\tstruct Extended extends Struct0 { Struct1 other }",
+        "}",
+    ]) + "\n"
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares importing model variants into fresh processors "
+                    "and into forks.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=3000,
+        help="Number of structs in the base model.")
+    parser.add_argument(
+        "-v", "--variants", type=int, default=10,
+        help="Number of variants.")
+    args = parser.parse_args()
+    return args
+
+
+def fresh(base, overlays):
+    variants = []
+    for index, overlay in enumerate(overlays):
+        processor = Processor()
+        processor.import_string("base.fidl", base)
+        processor.import_string("variant{}.fidl".format(index), overlay)
+        variants.append(processor)
+    return variants
+
+
+def forked(base, overlays):
+    processor = Processor()
+    processor.import_string("base.fidl", base)
+    variants = [processor]
+    for index, overlay in enumerate(overlays):
+        variant = processor.fork()
+        variant.import_string("variant{}.fidl".format(index), overlay)
+        variants.append(variant)
+    return variants
+
+
+def main():
+    args = parse_command_line()
+
+    base = make_base(args.number)
+    overlays = [make_overlay(index) for index in range(args.variants)]
+    for name, function in (("fresh", fresh), ("fork", forked)):
+        gc.collect()
+        if tracemalloc is not None:
+            tracemalloc.start()
+        start = time.time()
+        variants = function(base, overlays)
+        seconds = time.time() - start
+        memory = 0
+        if tracemalloc is not None:
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        print("{:<6} {:>8.2f} s {:>8.1f} MB".format(
+            name, seconds, memory / 1e6))
+        del variants
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Measures the formatter on many files with a cold and a warm cache.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pyfranca.franca_formatter import format_files, FormatCache
+
+
+MODEL = """package Bench{0}
+typeCollection Types {{ version {{major 1 minor 0}}
+    enumeration Source {{ GPS GALILEO GLONASS }}
+    struct Position {{ Double latitude Double longitude Float altitude }}
+    struct Sample {{ UInt64 time Position position Int32[] readings
+        Source source // Origin of the sample.
+        Boolean valid }}
+}}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Measures the formatter on many files.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=5000,
+        help="Number of files.")
+    parser.add_argument(
+        "-j", "--jobs", dest="jobs", type=int, default=1,
+        help="Number of worker processes.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = []
+        for index in range(args.number):
+            path = os.path.join(directory, "model{}.fidl".format(index))
+            with open(path, "w") as f:
+                f.write(MODEL.format(index))
+            paths.append(path)
+        cache = FormatCache(os.path.join(directory, "cache.json"))
+
+        for name, check in (("check, cold cache", True),
+                            ("format, cold cache", False),
+                            ("check, warm cache", True)):
+            start = time.time()
+            format_files(paths, check=check, jobs=args.jobs, cache=cache)
+            cache.save()
+            cache = FormatCache(cache.path)
+            print("{:<20} {:>8.2f} s".format(name, time.time() - start))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
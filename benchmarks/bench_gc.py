@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Compares garbage collector pauses while loading and dropping a model with
+strong and with weak references between linked nodes.
+"""
+
+import argparse
+import gc
+import time
+from pyfranca import Processor
+
+
+class PauseRecorder(object):
+    """
+    Records the durations of garbage collections, if supported.
+    """
+
+    def __init__(self):
+        self.pauses = []
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.time()
+        elif self._start is not None:
+            self.pauses.append(time.time() - self._start)
+            self._start = None
+
+    def __enter__(self):
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *args):
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.remove(self)
+
+    def summary(self):
+        if not self.pauses:
+            return "{:>4} pauses".format(0)
+        return "{:>4} pauses, max {:>7.1f} ms, total {:>7.1f} ms".format(
+            len(self.pauses), max(self.pauses) * 1e3,
+            sum(self.pauses) * 1e3)
+
+
+def make_fidl(package, count):
+    """
+    Create FIDL text of a package with two type collections of count structs
+    each, importing the previous package.
+    """
+    lines = ["package Bench{}".format(package)]
+    if package:
+        lines.append("import model \"bench{}.fidl\"".format(package - 1))
+    for name in ("A", "B"):
+        lines.append("typeCollection {} {{".format(name))
+        for index in range(count):
+            lines.append("\tstruct P{}{}{} {{".format(package, name, index))
+            lines.append("\t\tUInt64 time")
+            lines.append("\t\tDouble[] values")
+            if index:
+                lines.append("\t\tP{}{}{} previous".format(
+                    package, name, index - 1))
+            lines.append("\t}")
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares garbage collector pauses with strong and weak "
+                    "references.")
+    parser.add_argument(
+        "-p", "--packages", type=int, default=10,
+        help="Number of packages.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=1000,
+        help="Number of structs per type collection.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    fidls = [make_fidl(package, args.number)
+             for package in range(args.packages)]
+    for weak_references in (False, True):
+        gc.collect()
+        processor = Processor()
+        processor.weak_references = weak_references
+        with PauseRecorder() as load:
+            start = time.time()
+            for package, fidl in enumerate(fidls):
+                processor.import_string("bench{}.fidl".format(package), fidl)
+            seconds = time.time() - start
+        start = time.time()
+        gc.collect()
+        full = time.time() - start
+        with PauseRecorder():
+            del processor
+            start = time.time()
+            collected = gc.collect()
+            drop = time.time() - start
+        name = "weak" if weak_references else "strong"
+        print("{:<7} load {:>6.2f} s, {}".format(name, seconds,
+                                                load.summary()))
+        print("{:<7} full collection of the loaded model {:>7.1f} ms".format(
+            "", full * 1e3))
+        print("{:<7} collection after drop {:>7.1f} ms, {} objects".format(
+            "", drop * 1e3, collected))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measures the throughput of payload generation.
+"""
+
+import argparse
+import timeit
+from pyfranca import Processor
+from pyfranca.franca_generator import PayloadGenerator
+
+
+MODEL = """
+package Bench
+interface Sensors {
+    enumeration Source { GPS GALILEO GLONASS }
+    struct Position { Double latitude Double longitude Float altitude }
+    struct Sample {
+        UInt64 time
+        Position position
+        Int32[] readings
+        Source source
+        Boolean valid
+    }
+    method Publish {
+        in { UInt32 sequence Sample sample }
+        out { Boolean accepted }
+    }
+}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Measures the throughput of payload generation.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=100000,
+        help="Number of values per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    processor.import_string("bench.fidl", MODEL)
+    interface = processor.packages["Bench"]["Sensors"]
+    generator = PayloadGenerator(seed=1, array_size=(0, 8))
+
+    for name, node in (("UInt32", interface.methods["Publish"].in_args[
+                           "sequence"].type),
+                       ("Position", interface.structs["Position"]),
+                       ("Sample", interface.structs["Sample"])):
+        values = generator.values(node)
+        seconds = min(timeit.repeat(lambda: next(values),
+                                    number=args.number, repeat=3))
+        print("{:<10} {:>10.0f} values/s".format(name,
+                                                 args.number / seconds))
+
+
+if __name__ == "__main__":
+    main()
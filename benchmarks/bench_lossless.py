@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Compares parsing time and memory with and without lossless mode.
+"""
+
+import argparse
+import gc
+import time
+from pyfranca import Parser
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def make_fidl(count):
+    """
+    Create FIDL text with a type collection of count structs.
+    """
+    lines = ["package Bench", "typeCollection Types {"]
+    for index in range(count):
+        lines.append("\t// Struct {}.".format(index))
+        lines.append("\tstruct Struct{} {{".format(index))
+        lines.append("\t\tUInt64 time")
+        lines.append("\t\tDouble value")
+        lines.append("\t\tUInt8[] data")
+        lines.append("\t}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares parsing with and without lossless mode.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=5000,
+        help="Number of structs in the model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    fidl = make_fidl(args.number)
+    parser = Parser()
+    for lossless in (False, True):
+        gc.collect()
+        if tracemalloc is not None:
+            tracemalloc.start()
+        start = time.time()
+        package = parser.parse(fidl, lossless)
+        seconds = time.time() - start
+        memory = 0
+        if tracemalloc is not None:
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        print("{:<10} {:>8.2f} s {:>8.1f} MB".format(
+            "lossless" if lossless else "default", seconds, memory / 1e6))
+        del package
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Measures the throughput of the FIDL serializer.
+"""
+
+import argparse
+import tempfile
+import time
+from collections import OrderedDict
+from pyfranca import ast
+from pyfranca.franca_serializer import dump
+
+
+def make_package(count):
+    """
+    Create a package with a type collection of count structs.
+    """
+    members = []
+    for index in range(count):
+        fields = OrderedDict()
+        for name, field_type in (("time", ast.UInt64()),
+                                 ("value", ast.Double()),
+                                 ("name", ast.String()),
+                                 ("data", ast.Array(None, ast.UInt8()))):
+            fields[name] = ast.StructField(name, field_type)
+        members.append(ast.Struct(
+            "Struct{}".format(index), fields,
+            comments=OrderedDict([("@description", "Struct.")])))
+    package = ast.Package("Bench", typecollections=OrderedDict([
+        ("Types", ast.TypeCollection("Types", members=members))]))
+    return package
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Measures the throughput of the FIDL serializer.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=100000,
+        help="Number of structs in the model.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    package = make_package(args.number)
+    with tempfile.TemporaryFile("w+") as stream:
+        start = time.time()
+        dump(package, stream)
+        seconds = time.time() - start
+        size = stream.tell()
+    print("{} structs, {:.1f} MB in {:.2f} s, {:.1f} MB/s".format(
+        args.number, size / 1e6, seconds, size / 1e6 / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Measures the throughput of payload validation.
+"""
+
+import argparse
+import timeit
+from pyfranca import Processor
+from pyfranca.franca_validation import method_validators
+
+
+MODEL = """
+package Bench
+interface Sensors {
+    enumeration Source { GPS GALILEO GLONASS }
+    struct Position { Double latitude Double longitude Float altitude }
+    struct Sample {
+        UInt64 time
+        Position position
+        Int32[] readings
+        Source source
+        Boolean valid
+    }
+    method Publish {
+        in { UInt32 sequence Sample sample }
+        out { Boolean accepted }
+    }
+}
+"""
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Measures the throughput of payload validation.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=100000,
+        help="Number of payloads per measurement.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    processor.import_string("bench.fidl", MODEL)
+    interface = processor.packages["Bench"]["Sensors"]
+    request, _ = method_validators(interface.methods["Publish"])
+
+    payload = {"sequence": 1, "sample": {
+        "time": 1234567890,
+        "position": {"latitude": 48.1, "longitude": 11.5, "altitude": 520.0},
+        "readings": list(range(8)), "source": "GPS", "valid": True}}
+    batch = [payload] * 1000
+
+    seconds = min(timeit.repeat(lambda: request.validate(payload),
+                                number=args.number, repeat=3))
+    print("{:<8} {:>10.0f} payloads/s".format("single",
+                                              args.number / seconds))
+    number = max(args.number // len(batch), 1)
+    seconds = min(timeit.repeat(lambda: request.validate_batch(batch),
+                                number=number, repeat=3))
+    print("{:<8} {:>10.0f} payloads/s".format(
+        "batch", number * len(batch) / seconds))
+
+
+if __name__ == "__main__":
+    main()
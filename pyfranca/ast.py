@@ -2,7 +2,10 @@
 Franca abstract syntax tree representation.
 """
 
+import weakref
 from abc import ABCMeta
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import OrderedDict
 
 
@@ -16,11 +19,133 @@ class ASTException(Exception):
         return self.message
 
 
+class _WeakRef(weakref.ref):
+    """
+    Weak reference pickled as a weak reference.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return _WeakRef, (self(),)
+
+
+class WeakAttribute(object):
+    """
+    Attribute referring to a node the holder does not own, e.g. its parent.
+
+    The attribute is an instance attribute as usual until weaken() turns it
+    into a weak reference, which is then resolved on access.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.key = "_weak_" + name
+
+    def __get__(self, node, cls=None):
+        if node is None:
+            return self
+        try:
+            ref = getattr(node, self.key)
+        except AttributeError:
+            raise AttributeError(self.name)
+        return ref()
+
+
+class WeakList(list):
+    """
+    List of weak references to nodes, returning the nodes on iteration and
+    indexing.
+    """
+
+    def __init__(self, items=()):
+        super(WeakList, self).__init__(_WeakRef(item) for item in items)
+
+    def __iter__(self):
+        for ref in super(WeakList, self).__iter__():
+            yield ref()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ref() for ref in
+                    super(WeakList, self).__getitem__(index)]
+        return super(WeakList, self).__getitem__(index)()
+
+    def __contains__(self, item):
+        return any(node is item for node in self)
+
+    def __reduce__(self):
+        return WeakList, (list(self),)
+
+    def append(self, item):
+        super(WeakList, self).append(_WeakRef(item))
+
+    def extend(self, items):
+        super(WeakList, self).extend(_WeakRef(item) for item in items)
+
+
+# Names of the WeakAttribute attributes by AST class.
+_WEAK_NAMES = {}
+
+
+def weaken(node, refs=None):
+    """
+    Turn the references of a node to nodes it does not own, i.e. its parent
+    and resolved references, into weak references.
+
+    A model with all nodes weakened has no reference cycles, so it is freed
+    as soon as its packages are no longer referenced, without waiting for
+    the cyclic garbage collector. Its nodes must only be used while the
+    packages are referenced, e.g. by a processor. Assigning a weakened
+    attribute stores a strong reference again.
+
+    :param node: AST node.
+    :param refs: Dictionary mapping node ids to weak references, to share a
+        single reference to a node between calls.
+    """
+    cls = node.__class__
+    names = _WEAK_NAMES.get(cls)
+    if names is None:
+        names = tuple(name for name in dir(cls) if
+                      isinstance(getattr(cls, name), WeakAttribute))
+        _WEAK_NAMES[cls] = names
+    if refs is None:
+        refs = {}
+    # The instance dictionary is not accessed, as that would create it for
+    #   objects storing their attributes inline.
+    for name in names:
+        value = getattr(node, name, None)
+        if value is not None:
+            try:
+                delattr(node, name)
+            except AttributeError:
+                # Weakened already.
+                continue
+            setattr(node, "_weak_" + name, _ref(value, refs))
+    references = getattr(node, "namespace_references", None)
+    if references is not None and not isinstance(references, WeakList):
+        weak_references = WeakList()
+        list.extend(weak_references,
+                    [_ref(value, refs) for value in references])
+        node.namespace_references = weak_references
+
+
+def _ref(node, refs):
+    ref = refs.get(id(node))
+    if ref is None:
+        ref = refs[id(node)] = _WeakRef(node)
+    return ref
+
+
 class Package(object):
     """
     AST representation of a Franca package.
     """
 
+    # SourceMap objects of the files of the package, if parsed in lossless
+    #   mode. Only such packages hold a tuple of their own.
+    source_maps = ()
+
     def __init__(self, name, file_name=None, imports=None,
                  interfaces=None, typecollections=None, comments=None):
         """
@@ -33,6 +158,10 @@ class Package(object):
         self.typecollections = typecollections if typecollections else \
             OrderedDict()
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None          # Line of the package declaration.
+        self.span = None            # Offsets of the package name.
+        # Cached structural fingerprints, see franca_fingerprint.
+        self.fingerprints = {}
 
         for item in self.interfaces.values():
             item.package = self
@@ -59,7 +188,10 @@ class Package(object):
         if not isinstance(package, Package):
             raise TypeError
         # Ignore the name
+        self.fingerprints.clear()
         self.files += package.files
+        if package.source_maps:
+            self.source_maps = self.source_maps + package.source_maps
         for item in package.imports:
             self.imports.append(item)
         for item in package.interfaces.values():
@@ -77,11 +209,179 @@ class Package(object):
         return self
 
 
+class SourceMap(object):
+    """
+    Source offsets of a file parsed in lossless mode.
+
+    Offsets are kept in arrays parallel to the list of nodes, so no objects
+    are created per node. Spans are (start, end) offsets into the text,
+    the end being exclusive. Declaration spans include their structured
+    comments.
+    """
+
+    def __init__(self, text, file_name=None):
+        self.text = text
+        self.file = file_name
+        self.nodes = []
+        self.starts = array("l")
+        self.ends = array("l")
+        # Offsets of significant tokens and of comments, in text order.
+        self.token_starts = array("l")
+        self.token_ends = array("l")
+        self.comment_starts = array("l")
+        self.comment_ends = array("l")
+        self._indices = None
+
+    def add(self, node, start, end):
+        """
+        Record the span of a node.
+        """
+        self.nodes.append(node)
+        self.starts.append(start)
+        self.ends.append(end)
+        self._indices = None
+
+    def replace(self, old, new):
+        """
+        Replace a recently recorded node.
+        """
+        for index in range(len(self.nodes) - 1, -1, -1):
+            if self.nodes[index] is old:
+                self.nodes[index] = new
+                self._indices = None
+                return
+
+    def token_end(self, start):
+        """
+        Get the end offset of the token starting at an offset.
+        """
+        index = bisect_left(self.token_starts, start)
+        if index < len(self.token_starts) and \
+                self.token_starts[index] == start:
+            return self.token_ends[index]
+        return start
+
+    def span(self, node):
+        """
+        Get the span of a node.
+
+        :param node: AST node.
+        :return: Tuple of the start and end offsets, None for nodes of other
+            files or nodes created programmatically.
+        """
+        if self._indices is None:
+            self._indices = dict(
+                (id(item), index) for index, item in enumerate(self.nodes))
+        index = self._indices.get(id(node))
+        if index is None:
+            return None
+        return self.starts[index], self.ends[index]
+
+    def source(self, node):
+        """
+        Get the source text of a node, None if unknown.
+        """
+        span = self.span(node)
+        return None if span is None else self.text[span[0]:span[1]]
+
+    def node_at(self, offset):
+        """
+        Get the innermost node spanning an offset.
+
+        :param offset: Offset into the text.
+        :return: AST node or None.
+        """
+        result = None
+        size = None
+        for index in range(len(self.nodes)):
+            start = self.starts[index]
+            end = self.ends[index]
+            if start <= offset < end and (size is None or end - start < size):
+                result = self.nodes[index]
+                size = end - start
+        return result
+
+    def comments(self):
+        """
+        Get the comments of the text.
+
+        :return: List of (start, end) tuples.
+        """
+        return list(zip(self.comment_starts, self.comment_ends))
+
+    def comments_before(self, offset):
+        """
+        Get the comments between the token preceding an offset and the
+        offset, e.g. to find the comments of a declaration.
+
+        :return: List of (start, end) tuples.
+        """
+        index = bisect_left(self.token_starts, offset)
+        previous = self.token_ends[index - 1] if index else 0
+        first = bisect_left(self.comment_starts, previous)
+        last = bisect_right(self.comment_starts, offset)
+        return [(self.comment_starts[i], self.comment_ends[i])
+                for i in range(first, last) if self.comment_ends[i] <= offset]
+
+    def pieces(self):
+        """
+        Split the text into tokens, comments and whitespace.
+
+        The pieces cover the whole text, joining their texts reproduces it.
+
+        :return: Iterator of (kind, start, end) tuples, kind being "token",
+            "comment" or "whitespace".
+        """
+        tokens = [("token", start, end) for start, end in
+                  zip(self.token_starts, self.token_ends)]
+        comments = [("comment", start, end) for start, end in
+                    zip(self.comment_starts, self.comment_ends)]
+        position = 0
+        for kind, start, end in sorted(tokens + comments,
+                                       key=lambda piece: piece[1]):
+            if start > position:
+                yield "whitespace", position, start
+            yield kind, start, end
+            position = end
+        if position < len(self.text):
+            yield "whitespace", position, len(self.text)
+
+
+class LineIndex(object):
+    """
+    Offsets of the line starts of a text, computed once to convert offsets
+    to line and column numbers by binary search.
+    """
+
+    def __init__(self, text):
+        starts = array("l", [0])
+        position = text.find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = text.find("\n", position + 1)
+        self.starts = starts
+
+    def position(self, offset):
+        """
+        Get the position of an offset.
+
+        :param offset: Offset into the text.
+        :return: Tuple of the line and column numbers, both starting at 1.
+        """
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+
 class Import(object):
 
+    package_reference = WeakAttribute("package_reference")
+    namespace_reference = WeakAttribute("namespace_reference")
+
     def __init__(self, file_name, namespace=None):
         self.file = file_name
         self.namespace = namespace          # None for "import model"
+        self.lineno = None
+        self.span = None            # Offsets of the import statement.
         self.package_reference = None
         self.namespace_reference = None
 
@@ -90,8 +390,14 @@ class Namespace(object):
 
     __metaclass__ = ABCMeta
 
+    package = WeakAttribute("package")
+
     def __init__(self, name, flags=None, members=None, comments=None):
         self.package = None
+        self.file = None            # Set by the processor.
+        self.lineno = None
+        self.span = None
+        self.fingerprints = {}
         self.name = name
         self.flags = flags if flags else []         # Unused
         self.version = None
@@ -135,7 +441,7 @@ class Namespace(object):
             return self.arrays[name]
         elif name in self.maps:
             return self.maps[name]
-        elif name in self.constants[name]:
+        elif name in self.constants:
             return self.constants[name]
         else:
             raise KeyError
@@ -201,10 +507,17 @@ class Type(object):
 
     __metaclass__ = ABCMeta
 
+    namespace = WeakAttribute("namespace")
+
     def __init__(self, name=None, comments=None):
         self.namespace = None
         self.name = name if name else self.__class__.__name__
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None          # Set by the parser for declarations.
+        # Offsets of the declared name or of the name of a reference, set by
+        #   the parser.
+        self.span = None
+        self.fingerprints = {}
 
 
 class Typedef(Type):
@@ -354,6 +667,8 @@ class StringValue(Value):
 
 class Enumeration(ComplexType):
 
+    reference = WeakAttribute("reference")
+
     def __init__(self, name, enumerators=None, extends=None, flags=None, comments=None):
         super(Enumeration, self).__init__(comments=comments)
         self.name = name
@@ -369,10 +684,15 @@ class Enumerator(object):
         self.name = name
         self.value = value
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None
+        self.span = None
+        self.fingerprints = {}
 
 
 class Struct(ComplexType):
 
+    reference = WeakAttribute("reference")
+
     def __init__(self, name, fields=None, extends=None, flags=None, comments=None):
         super(Struct, self).__init__(comments=comments)
         self.name = name
@@ -388,10 +708,15 @@ class StructField(object):
         self.name = name
         self.type = field_type
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None
+        self.span = None
+        self.fingerprints = {}
 
 
 class Union(ComplexType):
 
+    reference = WeakAttribute("reference")
+
     def __init__(self, name, fields=None, extends=None, flags=None, comments=None):
         super(Union, self).__init__(comments=comments)
         self.name = name
@@ -407,6 +732,9 @@ class UnionField(object):
         self.name = name
         self.type = field_type
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None
+        self.span = None
+        self.fingerprints = {}
 
 
 class Array(ComplexType):
@@ -437,6 +765,8 @@ class Constant(ComplexType):
 
 class Reference(Type):
 
+    reference = WeakAttribute("reference")
+
     def __init__(self, name):
         super(Reference, self).__init__()
         self.name = name
@@ -445,6 +775,8 @@ class Reference(Type):
 
 class Interface(Namespace):
 
+    reference = WeakAttribute("reference")
+
     def __init__(self, name, flags=None, members=None, extends=None, comments=None):
         super(Interface, self).__init__(name=name, flags=flags, members=None, comments=comments)
         self.attributes = OrderedDict()
@@ -553,3 +885,6 @@ class Argument(object):
         self.name = name
         self.type = arg_type
         self.comments = comments if comments else OrderedDict()
+        self.lineno = None
+        self.span = None
+        self.fingerprints = {}
@@ -0,0 +1,333 @@
+"""
+Run-time Python classes for Franca types.
+
+Creates Python classes mirroring linked Franca type definitions, e.g. for
+test harnesses and simulators::
+
+    Sample = python_type(processor.packages["P"]["Types"].structs["Sample"])
+    sample = Sample(time=10)
+    sample.values.append(1.0)
+
+- Structs become classes with `__slots__`, keyword constructors with typed
+  defaults and inheritance following `extends`.
+- Unions become classes holding one alternative at a time.
+- Enumerations become `IntEnum` classes with resolved enumerator values.
+- Named arrays become `list` subclasses, maps are `dict` objects.
+- Typedefs resolve to the class of their type, primitive types to the
+  corresponding built-in types.
+
+Classes are created once per type and shared by the whole process. Types
+with equal qualified names and structural fingerprints share their classes,
+even if they come from different processors.
+"""
+
+import keyword
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+
+try:
+    from enum import IntEnum
+except ImportError:
+    IntEnum = None
+
+
+class ClassesException(Exception):
+
+    def __init__(self, message):
+        super(ClassesException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Built-in types and defaults of primitive types.
+_PRIMITIVES = {
+    ast.Int8: (int, 0),
+    ast.Int16: (int, 0),
+    ast.Int32: (int, 0),
+    ast.Int64: (int, 0),
+    ast.UInt8: (int, 0),
+    ast.UInt16: (int, 0),
+    ast.UInt32: (int, 0),
+    ast.UInt64: (int, 0),
+    ast.Boolean: (bool, False),
+    ast.Float: (float, 0.0),
+    ast.Double: (float, 0.0),
+    ast.String: (str, ""),
+    ast.ByteBuffer: (bytes, b""),
+}
+
+# Maps (qualified name, fingerprint) to generated classes.
+_classes = {}
+
+
+def _resolve(node):
+    """
+    Follow references and typedefs to the defining type.
+    """
+    while True:
+        if isinstance(node, ast.Reference):
+            if node.reference is None:
+                raise ClassesException(
+                    "Unresolved reference '{}'.".format(node.name))
+            node = node.reference
+        elif isinstance(node, ast.Typedef):
+            node = node.type
+        else:
+            return node
+
+
+def _extended(node):
+    """
+    Get the chain of extended types, base type first.
+    """
+    chain = []
+    while node is not None:
+        if node in chain:
+            raise ClassesException(
+                "Circular extension '{}'.".format(node.name))
+        chain.insert(0, node)
+        node = node.reference
+    return chain
+
+
+def _default(node):
+    """
+    Get the default value of a type and whether it must be created anew
+    for each instance.
+
+    :return: Tuple of the default value or factory and a factory flag.
+    """
+    node = _resolve(node)
+    if isinstance(node, ast.PrimitiveType):
+        return _PRIMITIVES[node.__class__][1], False
+    if isinstance(node, ast.Enumeration):
+        cls = python_type(node)
+        return (list(cls)[0] if len(cls) else None), False
+    if isinstance(node, ast.Map):
+        return dict, True
+    if isinstance(node, ast.Array) and node.name is None:
+        return list, True
+    return python_type(node), True
+
+
+def _parameter(name):
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def _make_init(names, defaults):
+    """
+    Compile a keyword constructor assigning all fields.
+    """
+    namespace = {}
+    parameters = ["self"]
+    lines = []
+    for index, name in enumerate(names):
+        value, factory = defaults[name]
+        parameter = _parameter(name)
+        if factory:
+            namespace["_f{}".format(index)] = value
+            parameters.append("{}=None".format(parameter))
+            expression = "_f{0}() if {1} is None else {1}".format(
+                index, parameter)
+        else:
+            namespace["_d{}".format(index)] = value
+            parameters.append("{}=_d{}".format(parameter, index))
+            expression = parameter
+        if parameter == name:
+            lines.append("    self.{} = {}".format(name, expression))
+        else:
+            lines.append("    _setattr(self, {!r}, {})".format(
+                name, expression))
+    namespace["_setattr"] = object.__setattr__
+    source = "def __init__({}):\n{}\n".format(
+        ", ".join(parameters), "\n".join(lines) if lines else "    pass")
+    exec(source, namespace)
+    return namespace["__init__"]
+
+
+class StructBase(object):
+    """
+    Base class of generated struct classes.
+    """
+
+    __slots__ = ()
+    # Names of all fields, including inherited ones, in declaration order.
+    _fields = ()
+    # Defining ast.Struct.
+    _type = None
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        for name in self._fields:
+            if getattr(self, name) != getattr(other, name):
+                return False
+        return True
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join(
+            "{}={!r}".format(name, getattr(self, name))
+            for name in self._fields))
+
+
+class UnionBase(object):
+    """
+    Base class of generated union classes.
+
+    Alternatives are accessed as attributes. Reading an alternative that is
+    not selected returns None, assigning one selects it.
+    """
+
+    __slots__ = ("_selected", "_value")
+    # Names of all alternatives, including inherited ones.
+    _fields = ()
+    # Defining ast.Union.
+    _type = None
+
+    def __init__(self, **kwargs):
+        if len(kwargs) > 1:
+            raise TypeError("A union holds a single alternative.")
+        self._selected = None
+        self._value = None
+        for name, value in kwargs.items():
+            if name not in self._fields:
+                raise TypeError("Unknown alternative '{}'.".format(name))
+            self._selected = name
+            self._value = value
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._selected == other._selected and \
+            self._value == other._value
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self._selected is None:
+            return "{}()".format(self.__class__.__name__)
+        return "{}({}={!r})".format(self.__class__.__name__, self._selected,
+                                    self._value)
+
+
+def _alternative(name):
+    def getter(self):
+        return self._value if self._selected == name else None
+
+    def setter(self, value):
+        self._selected = name
+        self._value = value
+
+    return property(getter, setter)
+
+
+def _make_struct(node):
+    chain = _extended(node)
+    base = python_type(chain[-2]) if len(chain) > 1 else StructBase
+    names = list(base._fields) + list(node.fields.keys())
+    defaults = {}
+    for item in chain:
+        for name, field in item.fields.items():
+            defaults[name] = _default(field.type)
+    attributes = {
+        "__slots__": tuple(node.fields.keys()),
+        "__init__": _make_init(names, defaults),
+        "_fields": tuple(names),
+        "_type": node,
+    }
+    return type(str(node.name), (base,), attributes)
+
+
+def _make_union(node):
+    chain = _extended(node)
+    base = python_type(chain[-2]) if len(chain) > 1 else UnionBase
+    attributes = {
+        "__slots__": (),
+        "_fields": base._fields + tuple(node.fields.keys()),
+        "_type": node,
+    }
+    for name in node.fields:
+        attributes[name] = _alternative(name)
+    return type(str(node.name), (base,), attributes)
+
+
+def _make_enumeration(node):
+    if IntEnum is None:
+        raise ClassesException(
+            "Enumerations require the 'enum' module (Python 3.4 or enum34).")
+    members = []
+    value = 0
+    for item in _extended(node):
+        for name, enumerator in item.enumerators.items():
+            if enumerator.value is not None:
+                value = int(enumerator.value.value)
+            members.append((str(name), value))
+            value += 1
+    return IntEnum(str(node.name), members)
+
+
+def _make_array(node):
+    return type(str(node.name), (list,), {
+        "_type": node,
+    })
+
+
+def python_type(node):
+    """
+    Get the Python class of a linked Franca type.
+
+    :param node: Struct, Union, Enumeration, Array, Map, Typedef, Reference
+        or primitive type.
+    :return: Python class.
+    """
+    node = _resolve(node)
+    if isinstance(node, ast.PrimitiveType):
+        return _PRIMITIVES[node.__class__][0]
+    if isinstance(node, ast.Map):
+        return dict
+    if isinstance(node, ast.Array) and node.name is None:
+        return list
+    if isinstance(node, ast.Struct):
+        make = _make_struct
+    elif isinstance(node, ast.Union):
+        make = _make_union
+    elif isinstance(node, ast.Enumeration):
+        make = _make_enumeration
+    elif isinstance(node, ast.Array):
+        make = _make_array
+    else:
+        raise ClassesException(
+            "No Python type for '{}'.".format(node.name))
+    key = (qualified_name(node), fingerprint(node))
+    cls = _classes.get(key)
+    if cls is None:
+        cls = make(node)
+        _classes[key] = cls
+    return cls
+
+
+def new(node, **kwargs):
+    """
+    Create a default instance of a linked Franca type.
+
+    :param node: See python_type().
+    :param kwargs: Field values of structs and unions.
+    :return: New instance.
+    """
+    cls = python_type(node)
+    if kwargs:
+        return cls(**kwargs)
+    value, factory = _default(node)
+    return value() if factory else value
@@ -0,0 +1,799 @@
+"""
+Franca binary wire codec.
+
+Encodes and decodes values of linked Franca types in a SOME/IP-like layout:
+
+- Integers, floating point numbers and booleans are fixed width, big endian.
+- Enumerations are encoded as UInt32.
+- Strings (UTF-8) and byte buffers are prefixed with their UInt32 length.
+- Arrays and maps are prefixed with the UInt32 length of their content.
+- Structs are the concatenation of their fields, inherited fields first.
+- Unions are prefixed with the UInt32 length of the value and the UInt32
+  index of the selected alternative, starting at 1. 0 marks an empty union.
+
+Values are represented by the classes of franca_classes::
+
+    codec = type_codec(types.structs["Sample"])
+    data = codec.encode(sample)
+    sample = codec.decode(data)
+
+    request, response = method_codecs(interface.methods["Get"])
+    data = request.encode((1, "name"))
+
+The encoder and the decoder of a type are compiled once and cached. Nested
+structs are inlined, runs of fixed-size fields are handled by a single
+precompiled struct.Struct, and decoding reads from a memoryview of the
+input without copying it.
+
+Arrays of structs made of fixed-size fields only can also be encoded and
+decoded in bulk, without a Python object per element, by a BulkCodec. It
+works on NumPy structured arrays or, without NumPy, on columns of
+`array.array` objects::
+
+    codec = BulkCodec(types.arrays["Samples"])
+    samples = codec.decode(data)
+    print(samples["time"].mean())
+"""
+
+import array
+import keyword
+import struct
+from collections import OrderedDict
+from itertools import chain
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+from pyfranca.franca_classes import python_type, IntEnum
+
+
+class CodecException(Exception):
+
+    def __init__(self, message):
+        super(CodecException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# struct format characters of fixed-size types.
+_FORMATS = {
+    ast.Int8: "b",
+    ast.Int16: "h",
+    ast.Int32: "i",
+    ast.Int64: "q",
+    ast.UInt8: "B",
+    ast.UInt16: "H",
+    ast.UInt32: "I",
+    ast.UInt64: "Q",
+    ast.Boolean: "?",
+    ast.Float: "f",
+    ast.Double: "d",
+}
+ENUMERATION_FORMAT = "I"
+
+# NumPy type strings of fixed-size types.
+_DTYPES = {
+    ast.Int8: "i1",
+    ast.Int16: ">i2",
+    ast.Int32: ">i4",
+    ast.Int64: ">i8",
+    ast.UInt8: "u1",
+    ast.UInt16: ">u2",
+    ast.UInt32: ">u4",
+    ast.UInt64: ">u8",
+    ast.Boolean: "?",
+    ast.Float: ">f4",
+    ast.Double: ">f8",
+}
+ENUMERATION_DTYPE = ">u4"
+
+_LENGTH = struct.Struct(">I")
+_UNION_HEADER = struct.Struct(">II")
+
+# Maps (qualified name, fingerprint) of named types and classes of primitive
+#   types to (encode, decode) function tuples.
+_functions = {}
+# Maps (qualified name, fingerprint, direction) of methods and broadcasts
+#   and (qualified name, fingerprint) of types to Codec objects.
+_codecs = {}
+
+
+def _resolve(node):
+    """
+    Follow references and typedefs to the defining type.
+    """
+    while True:
+        if isinstance(node, ast.Reference):
+            if node.reference is None:
+                raise CodecException(
+                    "Unresolved reference '{}'.".format(node.name))
+            node = node.reference
+        elif isinstance(node, ast.Typedef):
+            node = node.type
+        else:
+            return node
+
+
+def fixed_format(node):
+    """
+    Get the struct format character of a fixed-size type.
+
+    :param node: Type with references and typedefs resolved.
+    :return: Format character, or None if the type is not of fixed size.
+    """
+    if isinstance(node, ast.Enumeration):
+        return ENUMERATION_FORMAT
+    return _FORMATS.get(node.__class__)
+
+
+def _enumeration_class(node):
+    return python_type(node) if IntEnum is not None else None
+
+
+def _extended(node):
+    extended = []
+    while node is not None:
+        if node in extended:
+            raise CodecException(
+                "Circular extension '{}'.".format(node.name))
+        extended.insert(0, node)
+        node = node.reference
+    return extended
+
+
+class _Generator(object):
+    """
+    Generates the source of an encoder and a decoder.
+
+    Fixed-size values are collected into runs handled by a single
+    struct.Struct. Structs are inlined. Other values are handled by calls
+    to their own encoders and decoders.
+    """
+
+    def __init__(self):
+        self.namespace = {}
+        self.encode_lines = []
+        self.decode_lines = []
+        self._count = 0
+        self._formats = []
+        self._expressions = []
+        self._variables = []
+        # Decoder lines to emit once the current run is unpacked.
+        self._pending = []
+
+    def _name(self, prefix, value=None):
+        name = "{}{}".format(prefix, self._count)
+        self._count += 1
+        if value is not None:
+            self.namespace[name] = value
+        return name
+
+    def flush(self):
+        if self._formats:
+            packer = struct.Struct(">" + "".join(self._formats))
+            name = self._name("_s", packer)
+            self.encode_lines.append("out += {}.pack({})".format(
+                name, ", ".join(self._expressions)))
+            self.decode_lines.append(
+                "{}, = {}.unpack_from(buf, offset)".format(
+                    ", ".join(self._variables), name))
+            self.decode_lines.append("offset += {}".format(packer.size))
+            self._formats = []
+            self._expressions = []
+            self._variables = []
+        self.decode_lines.extend(self._pending)
+        self._pending = []
+
+    def add(self, expression, node):
+        """
+        Add a value to the generated functions.
+
+        :param expression: Expression of the value in the encoder.
+        :param node: Type of the value.
+        :return: Name of the variable holding the value in the decoder.
+        """
+        node = _resolve(node)
+        code = fixed_format(node)
+        if code is not None:
+            variable = self._name("v")
+            self._formats.append(code)
+            self._expressions.append(expression)
+            self._variables.append(variable)
+            if isinstance(node, ast.Enumeration) and \
+                    _enumeration_class(node) is not None:
+                self._pending.append("{0} = {1}({0})".format(
+                    variable, self._name("_c", python_type(node))))
+            return variable
+        if isinstance(node, ast.Struct):
+            variables = []
+            for item in _extended(node):
+                for name, field in item.fields.items():
+                    if keyword.iskeyword(name):
+                        field_expression = "getattr({}, {!r})".format(
+                            expression, name)
+                    else:
+                        field_expression = "{}.{}".format(expression, name)
+                    variables.append(self.add(field_expression, field.type))
+            variable = self._name("v")
+            self._pending.append("{} = {}({})".format(
+                variable, self._name("_c", python_type(node)),
+                ", ".join(variables)))
+            return variable
+        self.flush()
+        encode, decode = _compile(node)
+        variable = self._name("v")
+        self.encode_lines.append("{}({}, out)".format(
+            self._name("_e", encode), expression))
+        self.decode_lines.append("{}, offset = {}(buf, offset)".format(
+            variable, self._name("_d", decode)))
+        return variable
+
+    def build(self, result):
+        """
+        Compile the generated functions.
+
+        :param result: Expression of the decoded value.
+        :return: Tuple of the encoder and the decoder.
+        """
+        self.flush()
+        source = "def encode(value, out):\n    {}\n\n" \
+                 "def decode(buf, offset):\n    {}\n    return {}, offset\n" \
+            .format("\n    ".join(self.encode_lines) or "pass",
+                    "\n    ".join(self.decode_lines) or "pass", result)
+        exec(source, self.namespace)
+        return self.namespace["encode"], self.namespace["decode"]
+
+
+def _fixed_functions(code, cls=None):
+    packer = struct.Struct(">" + code)
+    pack = packer.pack
+    unpack_from = packer.unpack_from
+    size = packer.size
+
+    def encode(value, out):
+        out += pack(value)
+
+    if cls is None:
+        def decode(buf, offset):
+            return unpack_from(buf, offset)[0], offset + size
+    else:
+        def decode(buf, offset):
+            return cls(unpack_from(buf, offset)[0]), offset + size
+
+    return encode, decode
+
+
+def _check_end(buf, end):
+    if end > len(buf):
+        raise CodecException("Truncated data.")
+
+
+def _string_functions():
+    def encode(value, out):
+        data = value.encode("utf-8")
+        out += _LENGTH.pack(len(data))
+        out += data
+
+    def decode(buf, offset):
+        length, = _LENGTH.unpack_from(buf, offset)
+        offset += 4
+        end = offset + length
+        _check_end(buf, end)
+        return bytes(buf[offset:end]).decode("utf-8"), end
+
+    return encode, decode
+
+
+def _bytebuffer_functions():
+    def encode(value, out):
+        out += _LENGTH.pack(len(value))
+        out += value
+
+    def decode(buf, offset):
+        length, = _LENGTH.unpack_from(buf, offset)
+        offset += 4
+        end = offset + length
+        _check_end(buf, end)
+        return bytes(buf[offset:end]), end
+
+    return encode, decode
+
+
+def _array_functions(node):
+    element = _resolve(node.type)
+    cls = python_type(node) if node.name is not None else list
+    code = fixed_format(element)
+    if code is not None:
+        size = struct.calcsize(">" + code)
+        convert = _enumeration_class(element) \
+            if isinstance(element, ast.Enumeration) else None
+
+        def encode(value, out):
+            count = len(value)
+            out += _LENGTH.pack(count * size)
+            out += struct.pack(">{}{}".format(count, code), *value)
+
+        def decode(buf, offset):
+            length, = _LENGTH.unpack_from(buf, offset)
+            offset += 4
+            if length % size:
+                raise CodecException("Invalid array length.")
+            items = struct.unpack_from(
+                ">{}{}".format(length // size, code), buf, offset)
+            if convert is not None:
+                items = [convert(item) for item in items]
+            return cls(items), offset + length
+
+        return encode, decode
+
+    encode_element, decode_element = _compile(element)
+
+    def encode(value, out):
+        start = len(out)
+        out += b"\0\0\0\0"
+        for item in value:
+            encode_element(item, out)
+        _LENGTH.pack_into(out, start, len(out) - start - 4)
+
+    def decode(buf, offset):
+        length, = _LENGTH.unpack_from(buf, offset)
+        offset += 4
+        end = offset + length
+        _check_end(buf, end)
+        items = cls()
+        append = items.append
+        while offset < end:
+            item, offset = decode_element(buf, offset)
+            append(item)
+        if offset != end:
+            raise CodecException("Invalid array length.")
+        return items, end
+
+    return encode, decode
+
+
+def _map_functions(node):
+    encode_key, decode_key = _compile(_resolve(node.key_type))
+    encode_value, decode_value = _compile(_resolve(node.value_type))
+
+    def encode(value, out):
+        start = len(out)
+        out += b"\0\0\0\0"
+        for key, item in value.items():
+            encode_key(key, out)
+            encode_value(item, out)
+        _LENGTH.pack_into(out, start, len(out) - start - 4)
+
+    def decode(buf, offset):
+        length, = _LENGTH.unpack_from(buf, offset)
+        offset += 4
+        end = offset + length
+        _check_end(buf, end)
+        items = {}
+        while offset < end:
+            key, offset = decode_key(buf, offset)
+            items[key], offset = decode_value(buf, offset)
+        if offset != end:
+            raise CodecException("Invalid map length.")
+        return items, end
+
+    return encode, decode
+
+
+def _union_functions(node):
+    cls = python_type(node)
+    by_name = {}
+    by_index = {}
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            index = len(by_name) + 1
+            encode_field, decode_field = _compile(_resolve(field.type))
+            by_name[name] = (index, encode_field)
+            by_index[index] = (name, decode_field)
+
+    def encode(value, out):
+        start = len(out)
+        out += b"\0\0\0\0\0\0\0\0"
+        selected = value._selected
+        if selected is not None:
+            index, encode_field = by_name[selected]
+            encode_field(value._value, out)
+            _UNION_HEADER.pack_into(out, start, len(out) - start - 8, index)
+
+    def decode(buf, offset):
+        length, index = _UNION_HEADER.unpack_from(buf, offset)
+        offset += 8
+        end = offset + length
+        value = cls()
+        if index:
+            if index not in by_index:
+                raise CodecException(
+                    "Invalid union alternative {}.".format(index))
+            name, decode_field = by_index[index]
+            value._value, offset = decode_field(buf, offset)
+            value._selected = name
+        if offset != end:
+            raise CodecException("Invalid union length.")
+        return value, end
+
+    return encode, decode
+
+
+def _struct_functions(node):
+    generator = _Generator()
+    result = generator.add("value", node)
+    return generator.build(result)
+
+
+def _compile(node):
+    """
+    Get the encoder and the decoder of a resolved type.
+
+    :return: Tuple of encode(value, out) and decode(buf, offset) functions.
+        The encoder appends to a bytearray, the decoder returns the value
+        and the offset following it.
+    """
+    code = fixed_format(node)
+    if code is not None:
+        if isinstance(node, ast.Enumeration):
+            key = (qualified_name(node), fingerprint(node))
+            if key not in _functions:
+                _functions[key] = _fixed_functions(
+                    code, _enumeration_class(node))
+            return _functions[key]
+        if node.__class__ not in _functions:
+            _functions[node.__class__] = _fixed_functions(code)
+        return _functions[node.__class__]
+    if isinstance(node, ast.String):
+        if ast.String not in _functions:
+            _functions[ast.String] = _string_functions()
+        return _functions[ast.String]
+    if isinstance(node, ast.ByteBuffer):
+        if ast.ByteBuffer not in _functions:
+            _functions[ast.ByteBuffer] = _bytebuffer_functions()
+        return _functions[ast.ByteBuffer]
+    if isinstance(node, ast.Array) and node.name is None:
+        return _array_functions(node)
+
+    if isinstance(node, ast.Struct):
+        make = _struct_functions
+    elif isinstance(node, ast.Union):
+        make = _union_functions
+    elif isinstance(node, ast.Array):
+        make = _array_functions
+    elif isinstance(node, ast.Map):
+        make = _map_functions
+    else:
+        raise CodecException("Cannot encode '{}'.".format(node.name))
+    key = (qualified_name(node), fingerprint(node))
+    functions = _functions.get(key)
+    if functions is None:
+        # Recursive types reach themselves while being compiled. Register
+        #   forwarding functions until the real ones exist.
+        target = []
+        _functions[key] = (lambda value, out: target[0](value, out),
+                           lambda buf, offset: target[1](buf, offset))
+        try:
+            functions = make(node)
+        except Exception:
+            del _functions[key]
+            raise
+        target.extend(functions)
+        _functions[key] = functions
+    return functions
+
+
+class Codec(object):
+    """
+    Encoder and decoder of a type or an argument list.
+    """
+
+    def __init__(self, encode, decode):
+        self._encode = encode
+        self._decode = decode
+
+    def encode(self, value):
+        """
+        Encode a value.
+
+        :param value: Value to encode.
+        :return: Encoded data as a bytearray.
+        """
+        out = bytearray()
+        self.encode_into(value, out)
+        return out
+
+    def encode_into(self, value, out):
+        """
+        Append an encoded value to a bytearray.
+
+        :param value: Value to encode.
+        :param out: bytearray to append to.
+        """
+        try:
+            self._encode(value, out)
+        except (struct.error, AttributeError, TypeError, KeyError,
+                UnicodeError) as e:
+            raise CodecException("Cannot encode value: {}".format(e))
+
+    def decode(self, data):
+        """
+        Decode a value.
+
+        :param data: Bytes-like object holding exactly one encoded value.
+        :return: Decoded value.
+        """
+        value, offset = self.decode_from(data, 0)
+        if offset != len(data):
+            raise CodecException("Trailing data.")
+        return value
+
+    def decode_from(self, data, offset):
+        """
+        Decode a value at an offset.
+
+        :param data: Bytes-like object.
+        :param offset: Offset of the value.
+        :return: Tuple of the decoded value and the offset following it.
+        """
+        try:
+            return self._decode(memoryview(data), offset)
+        except struct.error:
+            raise CodecException("Truncated data.")
+        except ValueError as e:
+            raise CodecException("Invalid data: {}".format(e))
+
+
+def type_codec(node):
+    """
+    Get the codec of a linked Franca type.
+
+    :param node: Type, typedef or reference.
+    :return: Codec object.
+    """
+    node = _resolve(node)
+    if isinstance(node, ast.PrimitiveType) or node.name is None:
+        return Codec(*_compile(node))
+    key = (qualified_name(node), fingerprint(node))
+    codec = _codecs.get(key)
+    if codec is None:
+        codec = Codec(*_compile(node))
+        _codecs[key] = codec
+    return codec
+
+
+def _arguments_codec(item, arguments, direction):
+    key = (qualified_name(item), fingerprint(item), direction)
+    codec = _codecs.get(key)
+    if codec is None:
+        generator = _Generator()
+        variables = [generator.add("value[{}]".format(index), argument.type)
+                     for index, argument in enumerate(arguments.values())]
+        result = "({}{})".format(", ".join(variables),
+                                 "," if len(variables) == 1 else "")
+        codec = Codec(*generator.build(result))
+        _codecs[key] = codec
+    return codec
+
+
+def method_codecs(method):
+    """
+    Get the codecs of the arguments of a method.
+
+    Argument values are tuples in declaration order.
+
+    :param method: ast.Method object.
+    :return: Tuple of the codecs of the in and the out arguments.
+    """
+    return (_arguments_codec(method, method.in_args, "in"),
+            _arguments_codec(method, method.out_args, "out"))
+
+
+def broadcast_codec(broadcast):
+    """
+    Get the codec of the arguments of a broadcast.
+
+    Argument values are tuples in declaration order.
+
+    :param broadcast: ast.Broadcast object.
+    :return: Codec object.
+    """
+    return _arguments_codec(broadcast, broadcast.out_args, "out")
+
+
+def _numpy():
+    """
+    Import NumPy on first use, as it is optional and slow to import.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _layout(node):
+    """
+    Get the layout of a struct made of fixed-size fields only.
+
+    :return: List of (name, type) tuples, where the type is a fixed-size type
+        or the list of a nested struct. None if the struct has fields of
+        variable size.
+    """
+    layout = []
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            field_type = _resolve(field.type)
+            if isinstance(field_type, ast.Struct):
+                nested = _layout(field_type)
+                if nested is None:
+                    return None
+                layout.append((name, nested))
+            elif fixed_format(field_type) is not None:
+                layout.append((name, field_type))
+            else:
+                return None
+    return layout
+
+
+def _flatten(layout, prefix=""):
+    """
+    Get the dotted names and the format characters of a layout.
+    """
+    fields = []
+    for name, item in layout:
+        if isinstance(item, list):
+            fields.extend(_flatten(item, prefix + name + "."))
+        else:
+            fields.append((prefix + name, fixed_format(item)))
+    return fields
+
+
+def _dtype(layout):
+    """
+    Get the NumPy structured dtype description of a layout.
+    """
+    description = []
+    for name, item in layout:
+        if isinstance(item, list):
+            description.append((str(name), _dtype(item)))
+        elif isinstance(item, ast.Enumeration):
+            description.append((str(name), ENUMERATION_DTYPE))
+        else:
+            description.append((str(name), _DTYPES[item.__class__]))
+    return description
+
+
+def _column(code, values):
+    try:
+        return array.array("B" if code == "?" else code, values)
+    except ValueError:
+        # Type code not supported by this Python version.
+        return list(values)
+
+
+class BulkCodec(object):
+    """
+    Encoder and decoder of arrays of fixed-layout structs.
+
+    Arrays are encoded like by the codec of the array type. Records are
+    NumPy structured arrays with big endian fields if NumPy is used, and
+    otherwise OrderedDict objects mapping dotted field names, e.g.
+    "position.latitude", to `array.array` columns. Enumerations are plain
+    integers.
+    """
+
+    def __init__(self, node, use_numpy=None):
+        """
+        Constructor.
+
+        :param node: Array type, or a typedef of or a reference to one, with
+            a struct element type made of fixed-size fields.
+        :param use_numpy: Whether to use NumPy. By default NumPy is used if
+            it is available.
+        """
+        array_type = _resolve(node)
+        if not isinstance(array_type, ast.Array):
+            raise CodecException(
+                "'{}' is not an array.".format(array_type.name))
+        element = _resolve(array_type.type)
+        layout = _layout(element) if isinstance(element, ast.Struct) \
+            else None
+        if not layout:
+            raise CodecException(
+                "'{}' is not a struct with a fixed layout.".format(
+                    element.name))
+        fields = _flatten(layout)
+        self.names = [name for name, _ in fields]
+        self._codes = [code for _, code in fields]
+        self.format = "".join(self._codes)
+        self.size = struct.calcsize(">" + self.format)
+        self.numpy = _numpy() if use_numpy is not False else None
+        if use_numpy and self.numpy is None:
+            raise CodecException("NumPy is not available.")
+        self.dtype = self.numpy.dtype(_dtype(layout)) \
+            if self.numpy is not None else None
+
+    def encode(self, records):
+        """
+        Encode an array.
+
+        :param records: Records to encode.
+        :return: Encoded data as a bytearray.
+        """
+        out = bytearray()
+        self.encode_into(records, out)
+        return out
+
+    def encode_into(self, records, out):
+        """
+        Append an encoded array to a bytearray.
+
+        :param records: Records to encode.
+        :param out: bytearray to append to.
+        """
+        if self.numpy is not None:
+            if not isinstance(records, self.numpy.ndarray):
+                records = self.numpy.array(records, dtype=self.dtype)
+            elif records.dtype != self.dtype:
+                records = records.astype(self.dtype)
+            data = records.tobytes()
+            out += _LENGTH.pack(len(data))
+            out += data
+            return
+        try:
+            columns = [records[name] for name in self.names]
+        except KeyError as e:
+            raise CodecException("Missing field {}.".format(e))
+        count = len(columns[0])
+        for column in columns:
+            if len(column) != count:
+                raise CodecException("Columns differ in length.")
+        out += _LENGTH.pack(count * self.size)
+        try:
+            out += struct.pack(">" + self.format * count,
+                               *chain.from_iterable(zip(*columns)))
+        except struct.error as e:
+            raise CodecException("Cannot encode value: {}".format(e))
+
+    def decode(self, data):
+        """
+        Decode an array.
+
+        :param data: Bytes-like object holding exactly one encoded array.
+        :return: Records. NumPy arrays share the memory of the data.
+        """
+        records, offset = self.decode_from(data, 0)
+        if offset != len(data):
+            raise CodecException("Trailing data.")
+        return records
+
+    def decode_from(self, data, offset):
+        """
+        Decode an array at an offset.
+
+        :param data: Bytes-like object.
+        :param offset: Offset of the array.
+        :return: Tuple of the records and the offset following the array.
+        """
+        buf = memoryview(data)
+        try:
+            length, = _LENGTH.unpack_from(buf, offset)
+        except struct.error:
+            raise CodecException("Truncated data.")
+        offset += 4
+        end = offset + length
+        if length % self.size:
+            raise CodecException("Invalid array length.")
+        _check_end(buf, end)
+        count = length // self.size
+        if self.numpy is not None:
+            return self.numpy.frombuffer(buf, dtype=self.dtype, count=count,
+                                         offset=offset), end
+        values = struct.unpack_from(">" + self.format * count, buf, offset)
+        width = len(self.names)
+        records = OrderedDict()
+        for index, name in enumerate(self.names):
+            records[name] = _column(self._codes[index],
+                                    values[index::width])
+        return records, end
@@ -0,0 +1,389 @@
+"""
+Franca model comparison.
+
+Compares two linked models, e.g. the previous and the current release of an
+API, and reports typed change records classified as compatible or breaking::
+
+    for change in diff(old_processor, new_processor):
+        print(change)
+
+Packages, namespaces and namespace members with equal structural
+fingerprints are skipped without being descended into, so once fingerprints
+are cached the cost of a comparison depends on the size of the change rather
+than on the size of the models.
+
+A change to a type is reported once, at the type. Elements that use the type,
+e.g. method arguments, are only reported if they switch to a different type.
+"""
+
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+
+
+class Change(object):
+    """
+    A difference between two models.
+    """
+
+    # Kinds of changes.
+    ADDED = "added"
+    REMOVED = "removed"
+    KIND_CHANGED = "kind changed"
+    TYPE_CHANGED = "type changed"
+    VALUE_CHANGED = "value changed"
+    REORDERED = "reordered"
+    FLAGS_CHANGED = "flags changed"
+    EXTENDS_CHANGED = "extends changed"
+    VERSION_CHANGED = "version changed"
+
+    # Compatibility classification.
+    COMPATIBLE = "compatible"
+    BREAKING = "breaking"
+
+    def __init__(self, kind, element, path, compatibility,
+                 old=None, new=None):
+        """
+        Constructor.
+
+        :param kind: Kind of change, e.g. Change.ADDED.
+        :param element: Kind of the changed element, e.g. "method".
+        :param path: Dotted path of the changed element, e.g. "P.I.M.in.x".
+        :param compatibility: Change.COMPATIBLE or Change.BREAKING.
+        :param old: Old value as a string, if applicable.
+        :param new: New value as a string, if applicable.
+        """
+        self.kind = kind
+        self.element = element
+        self.path = path
+        self.compatibility = compatibility
+        self.old = old
+        self.new = new
+
+    @property
+    def breaking(self):
+        return self.compatibility == Change.BREAKING
+
+    def __str__(self):
+        text = "{}: {} '{}' {}".format(self.compatibility, self.element,
+                                       self.path, self.kind)
+        if self.old is not None or self.new is not None:
+            text += " ({} -> {})".format(self.old, self.new)
+        return text
+
+    def __repr__(self):
+        return "Change({!r}, {!r}, {!r}, {!r})".format(
+            self.kind, self.element, self.path, self.compatibility)
+
+
+def _signature(node):
+    """
+    Get a string identifying a type, independent of its structure.
+    """
+    if isinstance(node, ast.Reference):
+        if node.reference is not None:
+            return qualified_name(node.reference)
+        return node.name
+    if isinstance(node, ast.Array) and node.name is None:
+        return _signature(node.type) + "[]"
+    if isinstance(node, (ast.PrimitiveType, ast.Value)):
+        return node.name
+    return qualified_name(node)
+
+
+def _flags(node):
+    return ", ".join(sorted(node.flags)) if node.flags else ""
+
+
+def _extends(node):
+    if node.reference is not None:
+        return qualified_name(node.reference)
+    return node.extends
+
+
+def _enumerator_values(node):
+    """
+    Get the effective values of the enumerators of an enumeration, counting
+    on from the enumerations it extends, or of a dictionary of enumerators.
+
+    :return: Dictionary of enumerator names and integer values.
+    """
+    if isinstance(node, ast.Enumeration):
+        chain = []
+        while node is not None and node not in chain:
+            chain.insert(0, node)
+            node = node.reference
+        groups = [item.enumerators for item in chain]
+    else:
+        groups = [node]
+    values = {}
+    value = 0
+    for enumerators in groups:
+        for name, enumerator in enumerators.items():
+            if enumerator.value is not None:
+                value = int(enumerator.value.value)
+            values[name] = value
+            value += 1
+    return values
+
+
+def _element(node):
+    """
+    Get the element name of a namespace or a namespace member.
+    """
+    if isinstance(node, ast.TypeCollection):
+        return "typeCollection"
+    return node.__class__.__name__.lower()
+
+
+def _namespace_members(namespace):
+    members = {}
+    for items in (namespace.typedefs, namespace.enumerations,
+                  namespace.structs, namespace.unions, namespace.arrays,
+                  namespace.maps, namespace.constants):
+        members.update(items)
+    if isinstance(namespace, ast.Interface):
+        for items in (namespace.attributes, namespace.methods,
+                      namespace.broadcasts):
+            members.update(items)
+    return members
+
+
+class Differ(object):
+    """
+    Compares two models.
+    """
+
+    def __init__(self):
+        self.changes = []
+
+    def _add(self, kind, element, path, compatibility, old=None, new=None):
+        self.changes.append(
+            Change(kind, element, path, compatibility, old, new))
+
+    @staticmethod
+    def _same(old, new):
+        return fingerprint(old) == fingerprint(new)
+
+    def _compare_dicts(self, old, new, path, compare, element,
+                       added=Change.COMPATIBLE):
+        """
+        Compare name-indexed collections of elements.
+
+        :param compare: Function comparing elements present in both.
+        :param element: Element name or function returning it for a node.
+        :param added: Compatibility of additions.
+        """
+        for name in old:
+            if name not in new:
+                what = element(old[name]) if callable(element) else element
+                self._add(Change.REMOVED, what, path + name, Change.BREAKING)
+        for name in new:
+            if name not in old:
+                what = element(new[name]) if callable(element) else element
+                self._add(Change.ADDED, what, path + name, added)
+            elif not self._same(old[name], new[name]):
+                compare(old[name], new[name], path + name)
+
+    def _compare_type(self, element, path, old, new):
+        old_type = _signature(old)
+        new_type = _signature(new)
+        if old_type != new_type:
+            self._add(Change.TYPE_CHANGED, element, path, Change.BREAKING,
+                      old_type, new_type)
+
+    def _compare_order(self, element, path, old, new):
+        """
+        Report a changed order of the elements present in both.
+        """
+        old_order = [name for name in old if name in new]
+        new_order = [name for name in new if name in old]
+        if old_order != new_order:
+            self._add(Change.REORDERED, element, path, Change.BREAKING,
+                      ", ".join(old_order), ", ".join(new_order))
+
+    def _compare_extends(self, element, path, old, new):
+        old_extends = _extends(old)
+        new_extends = _extends(new)
+        if old_extends != new_extends:
+            self._add(Change.EXTENDS_CHANGED, element, path,
+                      Change.BREAKING, old_extends, new_extends)
+
+    def _compare_flags(self, element, path, old, new):
+        if _flags(old) != _flags(new):
+            self._add(Change.FLAGS_CHANGED, element, path, Change.BREAKING,
+                      _flags(old), _flags(new))
+
+    def _compare_fields(self, old, new, path):
+        element = _element(old)
+        self._compare_extends(element, path, old, new)
+        self._compare_flags(element, path, old, new)
+        field = "field" if isinstance(old, ast.Struct) else "alternative"
+        # Struct fields are positional. New union alternatives do not affect
+        #   existing ones.
+        added = Change.COMPATIBLE if isinstance(old, ast.Union) \
+            else Change.BREAKING
+        self._compare_dicts(
+            old.fields, new.fields, path + ".",
+            lambda o, n, p: self._compare_type(field, p, o.type, n.type),
+            field, added)
+        self._compare_order(field + "s", path, old.fields, new.fields)
+
+    def _compare_enumerators(self, old, new, path, element="enumerator"):
+        """
+        Compare the effective values of enumerators, which change with
+        insertions before implicitly numbered ones but not with values
+        written out.
+
+        :param old: Enumeration or dictionary of enumerators.
+        :param new: Enumeration or dictionary of enumerators.
+        """
+        old_values = _enumerator_values(old)
+        new_values = _enumerator_values(new)
+        if isinstance(old, ast.Enumeration):
+            old = old.enumerators
+            new = new.enumerators
+        for name in old:
+            if name not in new:
+                self._add(Change.REMOVED, element, path + "." + name,
+                          Change.BREAKING)
+        for name in new:
+            if name not in old:
+                self._add(Change.ADDED, element, path + "." + name,
+                          Change.COMPATIBLE)
+            elif old_values[name] != new_values[name]:
+                self._add(Change.VALUE_CHANGED, element, path + "." + name,
+                          Change.BREAKING, old_values[name],
+                          new_values[name])
+
+    def _compare_enumeration(self, old, new, path):
+        self._compare_extends("enumeration", path, old, new)
+        self._compare_enumerators(old, new, path)
+
+    def _compare_arguments(self, old, new, path):
+        self._compare_dicts(
+            old, new, path + ".",
+            lambda o, n, p: self._compare_type("argument", p, o.type, n.type),
+            "argument", Change.BREAKING)
+        self._compare_order("arguments", path, old, new)
+
+    def _compare_errors(self, old, new, path):
+        if isinstance(old, ast.Reference) or isinstance(new, ast.Reference):
+            if not isinstance(old, ast.Reference) or \
+                    not isinstance(new, ast.Reference):
+                self._add(Change.TYPE_CHANGED, "errors", path,
+                          Change.BREAKING)
+            else:
+                self._compare_type("errors", path, old, new)
+        else:
+            self._compare_enumerators(old, new, path, "error")
+
+    def _compare_method(self, old, new, path):
+        self._compare_flags("method", path, old, new)
+        self._compare_arguments(old.in_args, new.in_args, path + ".in")
+        self._compare_arguments(old.out_args, new.out_args, path + ".out")
+        self._compare_errors(old.errors, new.errors, path + ".errors")
+
+    def _compare_broadcast(self, old, new, path):
+        self._compare_flags("broadcast", path, old, new)
+        self._compare_arguments(old.out_args, new.out_args, path + ".out")
+
+    def _compare_attribute(self, old, new, path):
+        self._compare_flags("attribute", path, old, new)
+        self._compare_type("attribute", path, old.type, new.type)
+
+    def _compare_typed(self, old, new, path):
+        self._compare_type(_element(old), path, old.type, new.type)
+
+    def _compare_map(self, old, new, path):
+        self._compare_type("map key", path, old.key_type, new.key_type)
+        self._compare_type("map value", path, old.value_type, new.value_type)
+
+    def _compare_constant(self, old, new, path):
+        self._compare_type("constant", path, old.type, new.type)
+        if old.value.value != new.value.value:
+            self._add(Change.VALUE_CHANGED, "constant", path,
+                      Change.BREAKING, old.value.value, new.value.value)
+
+    # Member comparison functions by AST class.
+    _MEMBERS = {
+        ast.Typedef: _compare_typed,
+        ast.Array: _compare_typed,
+        ast.Map: _compare_map,
+        ast.Constant: _compare_constant,
+        ast.Struct: _compare_fields,
+        ast.Union: _compare_fields,
+        ast.Enumeration: _compare_enumeration,
+        ast.Attribute: _compare_attribute,
+        ast.Method: _compare_method,
+        ast.Broadcast: _compare_broadcast,
+    }
+
+    def _compare_member(self, old, new, path):
+        if old.__class__ is not new.__class__:
+            self._add(Change.KIND_CHANGED, _element(new), path,
+                      Change.BREAKING, _element(old), _element(new))
+            return
+        self._MEMBERS[old.__class__](self, old, new, path)
+
+    def _compare_version(self, old, new, path):
+        if str(old.version) == str(new.version):
+            return
+        if old.version is None or new.version is None or \
+                new.version.major != old.version.major:
+            compatibility = Change.BREAKING
+        else:
+            compatibility = Change.COMPATIBLE
+        self._add(Change.VERSION_CHANGED, _element(new), path, compatibility,
+                  old.version and str(old.version),
+                  new.version and str(new.version))
+
+    def _compare_namespace(self, old, new, path):
+        if old.__class__ is not new.__class__:
+            self._add(Change.KIND_CHANGED, _element(new), path,
+                      Change.BREAKING, _element(old), _element(new))
+            return
+        self._compare_version(old, new, path)
+        if isinstance(old, ast.Interface):
+            self._compare_extends("interface", path, old, new)
+        self._compare_dicts(_namespace_members(old), _namespace_members(new),
+                            path + ".", self._compare_member, _element)
+
+    def _compare_package(self, old, new, path):
+        old_namespaces = dict(old.typecollections, **old.interfaces)
+        new_namespaces = dict(new.typecollections, **new.interfaces)
+        self._compare_dicts(old_namespaces, new_namespaces, path + ".",
+                            self._compare_namespace, _element)
+
+    def compare(self, old, new):
+        """
+        Compare two models.
+
+        :param old: Processor, or dictionary of packages, of the old model.
+        :param new: Processor, or dictionary of packages, of the new model.
+        :return: List of Change objects.
+        """
+        old_packages = getattr(old, "packages", old)
+        new_packages = getattr(new, "packages", new)
+        self.changes = []
+        self._compare_dicts(old_packages, new_packages, "",
+                            self._compare_package, "package")
+        return self.changes
+
+
+def diff(old, new):
+    """
+    Compare two models.
+
+    See Differ.compare().
+    """
+    return Differ().compare(old, new)
+
+
+def is_compatible(changes):
+    """
+    Check whether a list of changes contains no breaking changes.
+
+    :param changes: List of Change objects.
+    :return: True if all changes are compatible.
+    """
+    return not any(change.breaking for change in changes)
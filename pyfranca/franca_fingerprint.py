@@ -0,0 +1,284 @@
+"""
+Franca structural fingerprints.
+
+A fingerprint is a hash of the structure of an AST node computed bottom-up
+from the fingerprints of its children, Merkle-style. Two nodes with equal
+fingerprints are structurally identical, including everything they reference,
+so callers can detect changes or key caches without deep comparisons::
+
+    if fingerprint(old_interface) != fingerprint(new_interface):
+        regenerate(new_interface)
+
+Fingerprints cover names, types, values, flags, versions and the resolved
+targets of references and extensions. They do not depend on formatting,
+line numbers, number literal bases or, unless requested, on comments. The
+members of namespaces and packages are hashed in name order, as their
+declaration order carries no meaning; fields, arguments and enumerators are
+hashed in declaration order.
+
+Fingerprints are cached on the nodes. Package merges clear the cached
+fingerprint of the merged package. Models changed by other means must be
+invalidated with invalidate().
+"""
+
+import hashlib
+from pyfranca import franca_walker, ast
+
+
+def _flags(node):
+    return ",".join(sorted(node.flags)) if node.flags else ""
+
+
+def _sorted_members(members):
+    return [members[name] for name in sorted(members.keys())]
+
+
+def qualified_name(node):
+    """
+    Get the fully qualified name of a namespace or a namespace member.
+
+    :param node: Namespace or namespace member.
+    :return: Name string, e.g. "P.TC.Struct".
+    """
+    if isinstance(node, ast.Namespace):
+        package = node.package.name if node.package else ""
+        return "{}.{}".format(package, node.name)
+    if node.namespace is not None:
+        return "{}.{}".format(qualified_name(node.namespace), node.name)
+    return node.name
+
+
+def _extends(node):
+    """
+    Get the label and the dependencies describing an extension.
+    """
+    if node.reference is not None:
+        return qualified_name(node.reference), [node.reference]
+    return node.extends or "", []
+
+
+def _parts_package(node):
+    namespaces = {}
+    namespaces.update(node.typecollections)
+    namespaces.update(node.interfaces)
+    return [node.name], _sorted_members(namespaces)
+
+
+def _parts_namespace(node):
+    members = {}
+    for items in (node.typedefs, node.enumerations, node.structs,
+                  node.unions, node.arrays, node.maps, node.constants):
+        members.update(items)
+    if isinstance(node, ast.Interface):
+        for items in (node.attributes, node.methods, node.broadcasts):
+            members.update(items)
+        extends, dependencies = _extends(node)
+    else:
+        extends, dependencies = "", []
+    version = str(node.version) if node.version else ""
+    return [node.name, version, extends], \
+        _sorted_members(members) + dependencies
+
+
+def _parts_typed(node):
+    return [node.name or ""], [node.type]
+
+
+def _parts_attribute(node):
+    return [node.name, _flags(node)], [node.type]
+
+
+def _parts_map(node):
+    return [node.name], [node.key_type, node.value_type]
+
+
+def _parts_constant(node):
+    return [node.name], [node.type, node.value]
+
+
+def _parts_value(node):
+    return [str(node.value)], []
+
+
+def _parts_fields(node):
+    extends, dependencies = _extends(node)
+    fields = list(node.fields.values())
+    return [node.name, _flags(node), extends, str(len(fields))], \
+        fields + dependencies
+
+
+def _parts_enumeration(node):
+    extends, dependencies = _extends(node)
+    enumerators = list(node.enumerators.values())
+    return [node.name, extends, str(len(enumerators))], \
+        enumerators + dependencies
+
+
+def _parts_enumerator(node):
+    if isinstance(node.value, ast.Type):
+        return [node.name], [node.value]
+    return [node.name, "" if node.value is None else str(node.value)], []
+
+
+def _parts_method(node):
+    dependencies = list(node.in_args.values()) + \
+        list(node.out_args.values())
+    if isinstance(node.errors, ast.Reference):
+        errors = "reference"
+        dependencies.append(node.errors)
+    elif node.errors:
+        errors = str(len(node.errors))
+        dependencies.extend(node.errors.values())
+    else:
+        errors = ""
+    return [node.name, _flags(node), str(len(node.in_args)),
+            str(len(node.out_args)), errors], dependencies
+
+
+def _parts_broadcast(node):
+    return [node.name, _flags(node)], list(node.out_args.values())
+
+
+def _parts_reference(node):
+    if node.reference is not None:
+        return [qualified_name(node.reference)], [node.reference]
+    return [node.name], []
+
+
+def _parts_none(node):
+    return [], []
+
+
+# Fingerprint inputs by AST class. Subclasses not listed use the function of
+#   their nearest listed base class.
+_PARTS = {
+    ast.Package: _parts_package,
+    ast.Namespace: _parts_namespace,
+    ast.Typedef: _parts_typed,
+    ast.Array: _parts_typed,
+    ast.Map: _parts_map,
+    ast.Constant: _parts_constant,
+    ast.Value: _parts_value,
+    ast.Struct: _parts_fields,
+    ast.Union: _parts_fields,
+    ast.StructField: _parts_typed,
+    ast.UnionField: _parts_typed,
+    ast.Enumeration: _parts_enumeration,
+    ast.Enumerator: _parts_enumerator,
+    ast.Attribute: _parts_attribute,
+    ast.Method: _parts_method,
+    ast.Broadcast: _parts_broadcast,
+    ast.Argument: _parts_typed,
+    ast.Reference: _parts_reference,
+    ast.PrimitiveType: _parts_none,
+}
+
+
+def _parts_function(cls):
+    function = _PARTS.get(cls)
+    if function is None:
+        function = _parts_none
+        for base in cls.__mro__[1:]:
+            if base in _PARTS:
+                function = _PARTS[base]
+                break
+        _PARTS[cls] = function
+    return function
+
+
+def _label(node, comments):
+    """
+    Get the node's own fingerprint input and its dependencies.
+    """
+    parts, dependencies = _parts_function(node.__class__)(node)
+    label = [node.__class__.__name__] + parts
+    if comments and node.comments:
+        for key, value in node.comments.items():
+            label.extend((key, value))
+    return "\x1f".join(label), dependencies
+
+
+def fingerprint(node, comments=False):
+    """
+    Get the structural fingerprint of an AST node.
+
+    The fingerprints of all nodes the node depends on are computed and
+    cached as well. Nodes that depend on themselves over references are
+    hashed with the name of the recursive target at the point of recursion.
+    Nodes inside such a cycle, other than its entry point, are not cached, as
+    their fingerprint depends on where the computation started.
+
+    :param node: Package, namespace, type, field, argument or enumerator.
+    :param comments: Whether structured comments are part of the
+        fingerprint.
+    :return: Fingerprint as a hexadecimal string.
+    """
+    key = bool(comments)
+    cached = node.fingerprints.get(key)
+    if cached is not None:
+        return cached
+
+    # Fingerprints computed in this call, including uncacheable ones.
+    digests = {}
+    # Labels of the nodes being expanded.
+    active = {}
+    # Maps nodes that depend on nodes being expanded to the ids of these.
+    recursive = {}
+    stack = [(node, None)]
+    while stack:
+        current, dependencies = stack[-1]
+        if dependencies is None:
+            if id(current) in digests:
+                stack.pop()
+                continue
+            cached = current.fingerprints.get(key)
+            if cached is not None:
+                digests[id(current)] = cached
+                stack.pop()
+                continue
+            label, dependencies = _label(current, comments)
+            active[id(current)] = label
+            stack[-1] = (current, dependencies)
+            for dependency in reversed(dependencies):
+                if id(dependency) not in active and \
+                        id(dependency) not in digests:
+                    stack.append((dependency, None))
+            continue
+
+        stack.pop()
+        label = active.pop(id(current))
+        sha = hashlib.sha1(label.encode("utf-8"))
+        targets = set()
+        for dependency in dependencies:
+            if id(dependency) in active:
+                targets.add(id(dependency))
+                sha.update(b"\x1e<recursive>")
+                sha.update(active[id(dependency)].encode("utf-8"))
+            else:
+                targets.update(recursive.get(id(dependency), ()))
+                sha.update(b"\x1e")
+                sha.update(digests[id(dependency)].encode("ascii"))
+        targets.discard(id(current))
+        digest = sha.hexdigest()
+        digests[id(current)] = digest
+        if targets:
+            recursive[id(current)] = targets
+        else:
+            current.fingerprints[key] = digest
+    return digests[id(node)]
+
+
+def invalidate(root):
+    """
+    Clear cached fingerprints.
+
+    Nodes that reference an invalidated node from outside the root keep
+    their cached fingerprints and must be invalidated separately.
+
+    :param root: AST node, or a list, a tuple or a dictionary of AST nodes,
+        e.g. Processor.packages.
+    """
+    for node in franca_walker.walk(root):
+        fingerprints = getattr(node, "fingerprints", None)
+        if fingerprints:
+            fingerprints.clear()
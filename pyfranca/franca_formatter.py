@@ -0,0 +1,400 @@
+"""
+Franca IDL source formatter.
+
+Formats FIDL text from its token stream, without parsing or linking it, and
+keeps all comments::
+
+    text = format_fidl(text)
+
+    results = format_files(paths, check=True, jobs=4,
+                           cache=FormatCache(".fidl_format_cache"))
+    changed = [path for path, status, _ in results if status == REFORMATTED]
+
+The layout matches the output of franca_serializer: one declaration, field,
+argument or enumerator per line, blocks indented by one level and blank lines
+between top-level elements and between namespace members. Consecutive imports
+stay together. Comments following a token on the same line stay there, other
+comments start their own line. Member order is kept.
+
+Formatting changes whitespace only. The formatted text is checked to produce
+the same tokens as the original.
+"""
+
+import hashlib
+import json
+from pyfranca import __version__
+from pyfranca.franca_lexer import Lexer, LexerException
+
+
+class FormatterException(Exception):
+
+    def __init__(self, message):
+        super(FormatterException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Results of formatting a file.
+UNCHANGED = "unchanged"
+REFORMATTED = "reformatted"
+ERROR = "error"
+
+# Contexts of blocks.
+_TOP = "top"
+_NAMESPACE = "namespace"
+_ENUMERATORS = "enumerators"
+_FIELDS = "fields"
+_ARGUMENTS = "arguments"
+_MAP = "map"
+_INLINE = "inline"
+
+# Contexts of the blocks opened by statements, by keyword token.
+_BLOCKS = {
+    "TYPECOLLECTION": _NAMESPACE,
+    "INTERFACE": _NAMESPACE,
+    "VERSION": _INLINE,
+    "ENUMERATION": _ENUMERATORS,
+    "STRUCT": _FIELDS,
+    "UNION": _FIELDS,
+    "MAP": _MAP,
+    "METHOD": _ARGUMENTS,
+    "BROADCAST": _ARGUMENTS,
+    "IN": _FIELDS,
+    "OUT": _FIELDS,
+    "ERROR": _ENUMERATORS,
+}
+
+# Keyword tokens starting statements, by context.
+_STATEMENTS = {
+    _TOP: frozenset(["PACKAGE", "IMPORT", "TYPECOLLECTION", "INTERFACE"]),
+    _NAMESPACE: frozenset(["VERSION", "TYPEDEF", "ENUMERATION", "STRUCT",
+                           "UNION", "ARRAY", "MAP", "CONST", "ATTRIBUTE",
+                           "METHOD", "BROADCAST"]),
+    _ARGUMENTS: frozenset(["IN", "OUT", "ERROR"]),
+}
+
+_COMMENTS = frozenset(["LINE_COMMENT", "BLOCK_COMMENT"])
+
+# States of the field recognizer.
+_EXPECT_TYPE = 0
+_AFTER_TYPE = 1
+_AFTER_DOT = 2
+
+# Lexer keeping comments, created on first use.
+_lexer = None
+
+
+def tokenize(text):
+    """
+    Split FIDL text into tokens, including comments.
+
+    :param text: FIDL text.
+    :return: List of (token type, source text, line number) tuples.
+    """
+    global _lexer
+    if _lexer is None:
+        _lexer = Lexer(keep_comments=True).lexer
+    lexer = _lexer
+    lexer.input(text)
+    lexer.lineno = 1
+    tokens = []
+    while True:
+        token = lexer.token()
+        if token is None:
+            return tokens
+        tokens.append((token.type, text[token.lexpos:lexer.lexpos],
+                       token.lineno))
+
+
+class _Formatter(object):
+
+    def __init__(self, indent):
+        self._indent = indent
+        self._lines = []
+        self._line = []
+        self._line_level = 0
+        self._level = 0
+        self._contexts = [_TOP]
+        self._keyword = None
+        self._field = _EXPECT_TYPE
+        # The next token starts a new line.
+        self._break = False
+        # The current block has no lines yet.
+        self._first = True
+        # Comments opened the current statement.
+        self._group = False
+        self._last_statement = None
+        self._previous = None
+        self._end_line = 0
+
+    def run(self, tokens):
+        for token in tokens:
+            self._token(*token)
+        self._flush()
+        if len(self._contexts) > 1:
+            raise FormatterException("Reached unexpected end of file.")
+        return "".join(line + "\n" for line in self._lines)
+
+    def _flush(self):
+        if self._line:
+            self._lines.append(
+                self._indent * self._line_level + "".join(self._line))
+            self._line = []
+
+    def _start(self, blank=False):
+        """
+        Start a new line.
+        """
+        self._flush()
+        if blank and not self._first:
+            self._lines.append("")
+        self._line_level = self._level
+        self._first = False
+        self._break = False
+
+    def _append(self, text):
+        if self._line and self._previous != "." and \
+                text not in (".", "[", "]"):
+            self._line.append(" ")
+        self._line.append(text)
+
+    def _statement(self, comment=False):
+        """
+        Start a line beginning a statement or the comments preceding it.
+        """
+        if self._group:
+            self._start()
+        else:
+            self._start(blank=True)
+        self._group = comment
+
+    def _token(self, kind, text, lineno):
+        context = self._contexts[-1]
+        if kind in _COMMENTS or kind == "STRUCTURED_COMMENT":
+            if kind != "STRUCTURED_COMMENT" and self._line and \
+                    lineno == self._end_line:
+                # Trailing comment.
+                self._line.append(" ")
+                self._line.append(text)
+            elif context in (_TOP, _NAMESPACE):
+                self._statement(comment=True)
+                self._line.append(text)
+            else:
+                self._start()
+                self._line.append(text)
+            self._end_line = lineno + text.count("\n")
+            self._break = kind != "BLOCK_COMMENT"
+            return
+
+        if kind == "}":
+            if context == _INLINE:
+                self._append(text)
+            else:
+                self._flush()
+                self._level -= 1
+                self._start()
+                self._line.append(text)
+            if len(self._contexts) == 1:
+                raise FormatterException(
+                    "Unexpected '}}' at line {}.".format(lineno))
+            self._contexts.pop()
+            self._break = True
+            self._group = False
+        elif kind == "{":
+            block = _BLOCKS.get(self._keyword)
+            if block is None:
+                raise FormatterException(
+                    "Unexpected '{{' at line {}.".format(lineno))
+            self._append(text)
+            self._contexts.append(block)
+            self._keyword = None
+            self._field = _EXPECT_TYPE
+            if block != _INLINE:
+                self._level += 1
+                self._break = True
+                self._first = True
+        else:
+            if context in _STATEMENTS and kind in _STATEMENTS[context]:
+                self._keyword = kind
+                if context == _TOP:
+                    if kind == "IMPORT" and \
+                            self._last_statement == "IMPORT" and \
+                            not self._group:
+                        self._start()
+                    else:
+                        self._statement()
+                    self._last_statement = kind
+                elif context == _NAMESPACE:
+                    self._statement()
+                else:
+                    self._start()
+                self._group = False
+            elif context == _FIELDS:
+                if self._field == _EXPECT_TYPE:
+                    self._start()
+                    self._field = _AFTER_TYPE
+                elif self._field == _AFTER_DOT:
+                    self._field = _AFTER_TYPE
+                elif kind == ".":
+                    self._field = _AFTER_DOT
+                elif kind == "ID":
+                    self._field = _EXPECT_TYPE
+            elif context == _ENUMERATORS:
+                if kind == "ID" and self._previous != "=":
+                    self._start()
+            if self._break:
+                self._start()
+            self._append(text)
+        self._previous = text
+        self._end_line = lineno + text.count("\n")
+
+
+def format_fidl(text, indent="\t"):
+    """
+    Format FIDL text.
+
+    :param text: FIDL text.
+    :param indent: String written per indentation level.
+    :return: Formatted text.
+    """
+    try:
+        tokens = tokenize(text)
+    except LexerException as e:
+        raise FormatterException(e.message)
+    result = _Formatter(indent).run(tokens)
+    formatted = [token[:2] for token in tokenize(result)]
+    if formatted != [token[:2] for token in tokens]:
+        raise FormatterException("Formatting changed the tokens.")
+    return result
+
+
+def digest(data):
+    """
+    Get the digest of file content.
+
+    :param data: File content as bytes.
+    :return: Hex digest.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+class FormatCache(object):
+    """
+    Persistent set of digests of files known to be formatted.
+
+    The cache is discarded if it was written by another pyfranca version or
+    with another indentation.
+    """
+
+    def __init__(self, path, indent="\t"):
+        self.path = path
+        self.indent = indent
+        self.digests = set()
+        try:
+            with open(path, "r") as f:
+                content = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if isinstance(content, dict) and \
+                content.get("version") == __version__ and \
+                content.get("indent") == indent:
+            self.digests = set(content.get("digests", []))
+
+    def __contains__(self, item):
+        return item in self.digests
+
+    def add(self, item):
+        self.digests.add(item)
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump({"version": __version__, "indent": self.indent,
+                       "digests": sorted(self.digests)}, f)
+
+
+def format_file(path, check=False, indent="\t"):
+    """
+    Format a FIDL file.
+
+    :param path: File path.
+    :param check: Only check whether the file is formatted, do not rewrite
+        it.
+    :param indent: String written per indentation level.
+    :return: Tuple of the result, UNCHANGED or REFORMATTED, and the digest
+        of the formatted content.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise FormatterException(str(e))
+    result = format_fidl(text, indent)
+    if result == text:
+        return UNCHANGED, digest(data)
+    formatted = result.encode("utf-8")
+    if not check:
+        with open(path, "wb") as f:
+            f.write(formatted)
+    return REFORMATTED, digest(formatted)
+
+
+def _format_worker(arguments):
+    path, check, indent = arguments
+    try:
+        result, content_digest = format_file(path, check, indent)
+        return path, result, content_digest, None
+    except (FormatterException, IOError, OSError) as e:
+        return path, ERROR, None, str(e)
+
+
+def format_files(paths, check=False, jobs=1, cache=None, indent="\t"):
+    """
+    Format FIDL files.
+
+    Files whose digest is in the cache are not read further. Files that are
+    already formatted are not written.
+
+    :param paths: List of file paths.
+    :param check: Only check whether the files are formatted.
+    :param jobs: Number of worker processes.
+    :param cache: FormatCache object or None. Updated but not saved.
+    :param indent: String written per indentation level.
+    :return: List of (path, result, error message) tuples, in the order of
+        the paths. The result is UNCHANGED, REFORMATTED or ERROR.
+    """
+    results = {}
+    pending = []
+    for path in paths:
+        if cache is not None:
+            try:
+                with open(path, "rb") as f:
+                    if digest(f.read()) in cache:
+                        results[path] = (path, UNCHANGED, None)
+                        continue
+            except (IOError, OSError) as e:
+                results[path] = (path, ERROR, str(e))
+                continue
+        pending.append((path, check, indent))
+
+    if jobs > 1 and len(pending) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(min(jobs, len(pending)))
+        try:
+            outcomes = pool.map(_format_worker, pending,
+                                chunksize=max(1, len(pending) // (4 * jobs)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        outcomes = [_format_worker(item) for item in pending]
+
+    for path, result, content_digest, message in outcomes:
+        results[path] = (path, result, message)
+        # Checked files that need formatting are not formatted on disk.
+        if cache is not None and result != ERROR and \
+                not (check and result == REFORMATTED):
+            cache.add(content_digest)
+    return [results[path] for path in paths]
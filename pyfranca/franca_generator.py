@@ -0,0 +1,410 @@
+"""
+Franca payload generation.
+
+Generates random JSON-like values of linked Franca types, e.g. for load
+testing services::
+
+    generator = PayloadGenerator(seed=42, array_size=(0, 100))
+    sample = generator.value(types.structs["Sample"])
+    request, response = generator.method_arguments(interface.methods["Get"])
+
+    with open("load.ndjson", "w") as stream:
+        write_ndjson(stream, generator.interface_payloads(interface, 10000))
+
+Values follow the mapping of franca_validation and are JSON serializable:
+enumerations are enumerator names, unions dictionaries holding a single
+alternative and ByteBuffers Base64 encoded strings. Maps with String keys are
+dictionaries, other maps lists of key-value pairs.
+
+Equal seeds and settings produce equal values. A generator function is
+compiled once per type and cached; the random state and the size settings
+belong to the PayloadGenerator.
+"""
+
+import base64
+import json
+import random
+import string
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+
+
+class GeneratorException(Exception):
+
+    def __init__(self, message):
+        super(GeneratorException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Signedness and widths in bits of integer types.
+_INTEGERS = {
+    ast.Int8: (True, 8),
+    ast.Int16: (True, 16),
+    ast.Int32: (True, 32),
+    ast.Int64: (True, 64),
+    ast.UInt8: (False, 8),
+    ast.UInt16: (False, 16),
+    ast.UInt32: (False, 32),
+    ast.UInt64: (False, 64),
+}
+
+# Characters of generated strings.
+_ALPHABET = string.ascii_letters + string.digits + " "
+# Sizes of the pools strings and byte buffers are cut from.
+_POOL_SIZE = 4096
+
+# Maps (qualified name, fingerprint) of named types and classes of
+#   primitive types to generator functions. Generator functions take the
+#   PayloadGenerator and the nesting depth.
+_functions = {}
+
+
+def _resolve(node):
+    """
+    Follow references and typedefs to the defining type.
+    """
+    while True:
+        if isinstance(node, ast.Reference):
+            if node.reference is None:
+                raise GeneratorException(
+                    "Unresolved reference '{}'.".format(node.name))
+            node = node.reference
+        elif isinstance(node, ast.Typedef):
+            node = node.type
+        else:
+            return node
+
+
+def _extended(node):
+    extended = []
+    while node is not None:
+        if node in extended:
+            raise GeneratorException(
+                "Circular extension '{}'.".format(node.name))
+        extended.insert(0, node)
+        node = node.reference
+    return extended
+
+
+def _integer_function(signed, bits):
+    offset = 2 ** (bits - 1) if signed else 0
+
+    def generate(generator, depth):
+        return generator.getrandbits(bits) - offset
+
+    return generate
+
+
+def _float_function(generator, depth):
+    return generator.random() * 2e6 - 1e6
+
+
+def _boolean_function(generator, depth):
+    return generator.random() < 0.5
+
+
+def _string_function(generator, depth):
+    low, span = generator.string_size
+    size = low + int(generator.random() * span)
+    start = int(generator.random() * (_POOL_SIZE - size))
+    return generator.text_pool[start:start + size]
+
+
+def _bytebuffer_function(generator, depth):
+    low, span = generator.bytes_size
+    size = low + int(generator.random() * span)
+    start = int(generator.random() * (_POOL_SIZE - size))
+    return base64.b64encode(
+        generator.bytes_pool[start:start + size]).decode("ascii")
+
+
+def _enumeration_function(node):
+    names = tuple(name for item in _extended(node)
+                  for name in item.enumerators)
+    if not names:
+        raise GeneratorException(
+            "Enumeration '{}' has no enumerators.".format(node.name))
+
+    def generate(generator, depth):
+        return names[int(generator.random() * len(names))]
+
+    return generate
+
+
+def _struct_function(node):
+    fields = []
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            fields.append((name, _function(_resolve(field.type))))
+    return _fields_function(fields)
+
+
+def _fields_function(fields):
+    def generate(generator, depth):
+        depth += 1
+        return dict([(name, function(generator, depth))
+                     for name, function in fields])
+
+    return generate
+
+
+def _union_function(node):
+    alternatives = []
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            alternatives.append((name, _function(_resolve(field.type))))
+
+    def generate(generator, depth):
+        if not alternatives:
+            return {}
+        name, function = \
+            alternatives[int(generator.random() * len(alternatives))]
+        return {name: function(generator, depth + 1)}
+
+    return generate
+
+
+def _array_function(node):
+    element = _function(_resolve(node.type))
+
+    def generate(generator, depth):
+        if depth >= generator.max_depth:
+            return []
+        low, span = generator.array_size
+        depth += 1
+        return [element(generator, depth)
+                for _ in range(low + int(generator.random() * span))]
+
+    return generate
+
+
+def _map_function(node):
+    key_type = _resolve(node.key_type)
+    key = _function(key_type)
+    value = _function(_resolve(node.value_type))
+    # JSON objects only have string keys.
+    container = dict if isinstance(key_type, ast.String) else list
+
+    def generate(generator, depth):
+        if depth >= generator.max_depth:
+            return container()
+        low, span = generator.array_size
+        depth += 1
+        items = dict([(key(generator, depth), value(generator, depth))
+                      for _ in range(low + int(generator.random() * span))])
+        return items if container is dict else \
+            [list(item) for item in items.items()]
+
+    return generate
+
+
+def _primitive_function(node):
+    cls = node.__class__
+    if cls in _INTEGERS:
+        return _integer_function(*_INTEGERS[cls])
+    if cls in (ast.Float, ast.Double):
+        return _float_function
+    if cls is ast.Boolean:
+        return _boolean_function
+    if cls is ast.String:
+        return _string_function
+    if cls is ast.ByteBuffer:
+        return _bytebuffer_function
+    raise GeneratorException("Cannot generate '{}'.".format(node.name))
+
+
+def _function(node):
+    """
+    Get the generator function of a resolved type.
+    """
+    if isinstance(node, ast.PrimitiveType):
+        function = _functions.get(node.__class__)
+        if function is None:
+            function = _primitive_function(node)
+            _functions[node.__class__] = function
+        return function
+    if isinstance(node, ast.Array) and node.name is None:
+        return _array_function(node)
+
+    if isinstance(node, ast.Struct):
+        make = _struct_function
+    elif isinstance(node, ast.Union):
+        make = _union_function
+    elif isinstance(node, ast.Enumeration):
+        make = _enumeration_function
+    elif isinstance(node, ast.Array):
+        make = _array_function
+    elif isinstance(node, ast.Map):
+        make = _map_function
+    else:
+        raise GeneratorException(
+            "Cannot generate '{}'.".format(node.name))
+    key = (qualified_name(node), fingerprint(node))
+    function = _functions.get(key)
+    if function is None:
+        # Recursive types reach themselves while being compiled. Register
+        #   a forwarding function until the real one exists.
+        target = []
+        _functions[key] = \
+            lambda generator, depth: target[0](generator, depth)
+        try:
+            function = make(node)
+        except Exception:
+            del _functions[key]
+            raise
+        target.append(function)
+        _functions[key] = function
+    return function
+
+
+def _arguments_function(item, arguments, direction):
+    key = (qualified_name(item), fingerprint(item), direction)
+    function = _functions.get(key)
+    if function is None:
+        function = _fields_function(
+            [(name, _function(_resolve(argument.type)))
+             for name, argument in arguments.items()])
+        _functions[key] = function
+    return function
+
+
+class PayloadGenerator(object):
+    """
+    Seeded generator of random values of Franca types.
+    """
+
+    def __init__(self, seed=None, array_size=(0, 8), string_size=(0, 16),
+                 bytes_size=(0, 16), max_depth=8):
+        """
+        Constructor.
+
+        :param seed: Random seed, None for a random one.
+        :param array_size: Inclusive (minimum, maximum) number of array and
+            map elements.
+        :param string_size: Inclusive (minimum, maximum) length of strings.
+        :param bytes_size: Inclusive (minimum, maximum) length of byte
+            buffers before encoding.
+        :param max_depth: Nesting depth from which arrays and maps are
+            empty. Limits the size of values of recursive types.
+        """
+        for name, (low, high) in (("array_size", array_size),
+                                  ("string_size", string_size),
+                                  ("bytes_size", bytes_size)):
+            if not 0 <= low <= high:
+                raise GeneratorException(
+                    "Invalid {} {!r}.".format(name, (low, high)))
+        if string_size[1] > _POOL_SIZE or bytes_size[1] > _POOL_SIZE:
+            raise GeneratorException(
+                "Strings and byte buffers are limited to {} "
+                "characters.".format(_POOL_SIZE))
+        # Sizes are stored as (minimum, number of sizes) for scaling random
+        #   numbers, which is faster than calling randint().
+        self.array_size = (array_size[0], array_size[1] - array_size[0] + 1)
+        self.string_size = (string_size[0],
+                            string_size[1] - string_size[0] + 1)
+        self.bytes_size = (bytes_size[0], bytes_size[1] - bytes_size[0] + 1)
+        self.max_depth = max_depth
+        state = random.Random(seed)
+        self.random = state.random
+        self.getrandbits = state.getrandbits
+        # Strings and byte buffers are cut from random pools.
+        self.text_pool = "".join(
+            [state.choice(_ALPHABET) for _ in range(_POOL_SIZE)])
+        self.bytes_pool = bytes(bytearray(
+            state.getrandbits(8) for _ in range(_POOL_SIZE)))
+
+    def value(self, node):
+        """
+        Generate a value of a linked Franca type.
+
+        :param node: Type, typedef or reference.
+        :return: JSON-like value.
+        """
+        return _function(_resolve(node))(self, 0)
+
+    def values(self, node, count=None):
+        """
+        Generate values of a linked Franca type.
+
+        :param node: Type, typedef or reference.
+        :param count: Number of values, None for an endless stream.
+        :return: Iterator of values.
+        """
+        function = _function(_resolve(node))
+        if count is None:
+            while True:
+                yield function(self, 0)
+        for _ in range(count):
+            yield function(self, 0)
+
+    def method_arguments(self, method):
+        """
+        Generate the arguments of a method.
+
+        :param method: ast.Method object.
+        :return: Tuple of dictionaries of the in and the out arguments.
+        """
+        request = _arguments_function(method, method.in_args, "in")
+        response = _arguments_function(method, method.out_args, "out")
+        return request(self, 0), response(self, 0)
+
+    def broadcast_arguments(self, broadcast):
+        """
+        Generate the arguments of a broadcast.
+
+        :param broadcast: ast.Broadcast object.
+        :return: Dictionary of the arguments.
+        """
+        return _arguments_function(broadcast, broadcast.out_args, "out")(
+            self, 0)
+
+    def interface_payloads(self, interface, count=None):
+        """
+        Generate messages of all methods and broadcasts of an interface,
+        including the ones of the extended interfaces, in turn.
+
+        :param interface: ast.Interface object.
+        :param count: Number of messages, None for an endless stream.
+        :return: Iterator of dictionaries with the name of the method or
+            broadcast, the direction, "in" or "out", and the arguments.
+        """
+        messages = []
+        for item in _extended(interface):
+            for name, method in item.methods.items():
+                messages.append((name, "in", _arguments_function(
+                    method, method.in_args, "in")))
+                if "fireAndForget" not in method.flags:
+                    messages.append((name, "out", _arguments_function(
+                        method, method.out_args, "out")))
+            for name, broadcast in item.broadcasts.items():
+                messages.append((name, "out", _arguments_function(
+                    broadcast, broadcast.out_args, "out")))
+        if not messages:
+            return
+        index = 0
+        while count is None or index < count:
+            name, direction, function = messages[index % len(messages)]
+            yield {"name": name, "direction": direction,
+                   "arguments": function(self, 0)}
+            index += 1
+
+
+def write_ndjson(stream, values):
+    """
+    Write values as newline-delimited JSON.
+
+    :param stream: Text stream.
+    :param values: Iterable of JSON serializable values.
+    :return: Number of values written.
+    """
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    write = stream.write
+    count = 0
+    for value in values:
+        write(encode(value))
+        write("\n")
+        count += 1
+    return count
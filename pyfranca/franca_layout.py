@@ -0,0 +1,260 @@
+"""
+Franca wire layout analysis.
+
+Computes the serialized sizes of linked types, methods and broadcasts in the
+wire format of franca_codec, the natural alignment of types and the byte
+offsets of the fields of structs::
+
+    sizes = layout(types.structs["Sample"])
+    if sizes.fixed:
+        print(sizes.size, sizes.offsets)
+
+    request, response = method_layouts(interface.methods["Get"])
+    print(request.min_size, request.max_size)
+
+Strings, byte buffers, arrays and maps have no size limit in Franca, so types
+containing them are unbounded and their maximum size is None. The wire format
+has no padding; offsets are packed and the alignment is informational, e.g.
+for copying values into aligned memory.
+
+Layouts of named types are computed once per type and cached. Recursive
+types, e.g. a struct used by an alternative of a union, are unbounded.
+"""
+
+import struct
+import threading
+from collections import OrderedDict
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+from pyfranca.franca_codec import fixed_format
+
+
+class LayoutException(Exception):
+
+    def __init__(self, message):
+        super(LayoutException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class Layout(object):
+    """
+    Serialized size and alignment of a type or an argument list.
+    """
+
+    def __init__(self, min_size, max_size, alignment, offsets=None):
+        """
+        Constructor.
+
+        :param min_size: Minimum size in bytes.
+        :param max_size: Maximum size in bytes, None if unbounded.
+        :param alignment: Natural alignment in bytes.
+        :param offsets: OrderedDict mapping field or argument names to byte
+            offsets, for structs and argument lists. Offsets following a
+            field of variable size are None.
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.alignment = alignment
+        self.offsets = offsets
+
+    @property
+    def fixed(self):
+        return self.min_size == self.max_size
+
+    @property
+    def unbounded(self):
+        return self.max_size is None
+
+    @property
+    def size(self):
+        """
+        Size in bytes of a fixed-size layout, otherwise None.
+        """
+        return self.min_size if self.fixed else None
+
+    def __str__(self):
+        if self.fixed:
+            return "{} bytes".format(self.min_size)
+        return "{}..{} bytes".format(
+            self.min_size,
+            "unbounded" if self.unbounded else self.max_size)
+
+    def __repr__(self):
+        return "Layout({!r}, {!r}, {!r})".format(
+            self.min_size, self.max_size, self.alignment)
+
+
+# Layout of values prefixed with a UInt32 length and unbounded content.
+_VARIABLE = Layout(4, None, 4)
+
+# Lower bounds of the layouts of a struct and of a union used within
+#   themselves, e.g. by an alternative of a union, which nest without bound.
+_RECURSIVE_STRUCT = Layout(0, None, 1)
+_RECURSIVE_UNION = Layout(8, None, 4)
+
+# Layouts being computed by the current thread, to detect recursive types.
+_local = threading.local()
+
+# Maps (qualified name, fingerprint) of named types, and classes of
+#   primitive types, to Layout objects.
+_layouts = {}
+
+
+def _resolve(node):
+    """
+    Follow references and typedefs to the defining type.
+    """
+    while True:
+        if isinstance(node, ast.Reference):
+            if node.reference is None:
+                raise LayoutException(
+                    "Unresolved reference '{}'.".format(node.name))
+            node = node.reference
+        elif isinstance(node, ast.Typedef):
+            node = node.type
+        else:
+            return node
+
+
+def _extended(node):
+    extended = []
+    while node is not None:
+        if node in extended:
+            raise LayoutException(
+                "Circular extension '{}'.".format(node.name))
+        extended.insert(0, node)
+        node = node.reference
+    return extended
+
+
+def _sequence(items):
+    """
+    Get the layout of a sequence of named values.
+
+    :param items: List of (name, type) tuples.
+    """
+    min_size = 0
+    max_size = 0
+    alignment = 1
+    offsets = OrderedDict()
+    for name, item in items:
+        offsets[name] = max_size if max_size == min_size else None
+        item_layout = layout(item)
+        min_size += item_layout.min_size
+        if max_size is not None:
+            if item_layout.max_size is None:
+                max_size = None
+            else:
+                max_size += item_layout.max_size
+        alignment = max(alignment, item_layout.alignment)
+    return Layout(min_size, max_size, alignment, offsets)
+
+
+def _struct(node):
+    items = []
+    for item in _extended(node):
+        items.extend((name, field.type)
+                     for name, field in item.fields.items())
+    return _sequence(items)
+
+
+def _union(node):
+    max_size = 0
+    alignment = 4
+    for item in _extended(node):
+        for field in item.fields.values():
+            field_layout = layout(field.type)
+            if max_size is not None:
+                if field_layout.max_size is None:
+                    max_size = None
+                else:
+                    max_size = max(max_size, field_layout.max_size)
+            alignment = max(alignment, field_layout.alignment)
+    # Length and discriminator, followed by the selected alternative. A
+    #   union selecting no alternative (index 0) has no value, so the
+    #   alternatives do not add to the minimum size.
+    return Layout(8, None if max_size is None else 8 + max_size, alignment)
+
+
+def layout(node):
+    """
+    Get the layout of a linked type.
+
+    :param node: Type, typedef or reference.
+    :return: Layout object.
+    """
+    node = _resolve(node)
+    code = fixed_format(node)
+    if code is not None:
+        size = struct.calcsize(">" + code)
+        return Layout(size, size, size)
+    if isinstance(node, (ast.String, ast.ByteBuffer, ast.Array, ast.Map)):
+        # Array and map elements do not affect the layout. This also stops
+        #   the recursion of recursive types.
+        return _VARIABLE
+    if isinstance(node, ast.Struct):
+        make = _struct
+    elif isinstance(node, ast.Union):
+        make = _union
+    else:
+        raise LayoutException("Type '{}' has no layout.".format(node.name))
+    key = (qualified_name(node), fingerprint(node))
+    result = _layouts.get(key)
+    if result is not None:
+        return result
+    # List of [key, whether the layout depends on a lower bound] entries.
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    for index, entry in enumerate(stack):
+        if entry[0] == key:
+            # Layouts computed within this one depend on a lower bound
+            #   until it is complete.
+            for inner in stack[index + 1:]:
+                inner[1] = True
+            return _RECURSIVE_UNION if make is _union \
+                else _RECURSIVE_STRUCT
+    entry = [key, False]
+    stack.append(entry)
+    try:
+        result = make(node)
+    finally:
+        stack.pop()
+    if not entry[1]:
+        _layouts[key] = result
+    return result
+
+
+def arguments_layout(arguments):
+    """
+    Get the layout of an argument list.
+
+    :param arguments: OrderedDict of ast.Argument objects.
+    :return: Layout object.
+    """
+    return _sequence([(name, argument.type)
+                      for name, argument in arguments.items()])
+
+
+def method_layouts(method):
+    """
+    Get the layouts of the arguments of a method.
+
+    :param method: ast.Method object.
+    :return: Tuple of the layouts of the in and the out arguments.
+    """
+    return arguments_layout(method.in_args), \
+        arguments_layout(method.out_args)
+
+
+def broadcast_layout(broadcast):
+    """
+    Get the layout of the arguments of a broadcast.
+
+    :param broadcast: ast.Broadcast object.
+    :return: Layout object.
+    """
+    return arguments_layout(broadcast.out_args)
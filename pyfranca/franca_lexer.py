@@ -3,18 +3,64 @@ Franca lexer.
 """
 
 import ply.lex as lex
+from pyfranca import ast
 
 
 class LexerException(Exception):
 
-    def __init__(self, message):
+    def __init__(self, message, file_name=None, lineno=None, column=None,
+                 lexpos=None):
         super(LexerException, self).__init__()
         self.message = message
+        # Location of the error, if known.
+        self.file = file_name
+        self.lineno = lineno
+        self.column = column
+        self.lexpos = lexpos
 
     def __str__(self):
         return self.message
 
 
+class SourceError(object):
+    """
+    A lexical or syntax error, collected when parsing with error recovery.
+    """
+
+    def __init__(self, message, file_name=None, lineno=None, column=None,
+                 lexpos=None):
+        self.message = message
+        self.file = file_name
+        self.lineno = lineno
+        self.column = column
+        self.lexpos = lexpos
+
+    def __str__(self):
+        if self.file:
+            return "{}: {}".format(self.file, self.message)
+        return self.message
+
+    def __repr__(self):
+        return "SourceError({!r}, {!r}, {!r}, {!r}, {!r})".format(
+            self.message, self.file, self.lineno, self.column, self.lexpos)
+
+
+def position(lexer, lexpos):
+    """
+    Get the line and column numbers of an offset into the input of a PLY
+    lexer. The line starts are computed once per input.
+
+    :param lexer: PLY lexer.
+    :param lexpos: Offset into the input.
+    :return: Tuple of the line and column numbers, both starting at 1.
+    """
+    cached = getattr(lexer, "line_index", None)
+    if cached is None or cached[0] is not lexer.lexdata:
+        cached = (lexer.lexdata, ast.LineIndex(lexer.lexdata))
+        lexer.line_index = cached
+    return cached[1].position(lexpos)
+
+
 class Lexer(object):
     """
     Franca IDL PLY lexer.
@@ -83,6 +129,14 @@ class Lexer(object):
         "STRUCTURED_COMMENT"
     ]
 
+    # Tokens only produced by lexers keeping comments. The parser ignores
+    #   them.
+    comment_tokens = [
+        "LINE_COMMENT",
+        "BLOCK_COMMENT",
+    ]
+    tokens += comment_tokens
+
     # Ignored characters
     t_ignore = " \t"
 
@@ -109,6 +163,8 @@ class Lexer(object):
         # noinspection PySingleQuotedDocstring
         r"\/\/[^\r\n]*"
         t.lexer.lineno += t.value.count("\n")
+        if t.lexer.keep_comments:
+            return t
 
     # Block comments
     # noinspection PyPep8Naming,PyIncorrectDocstring
@@ -117,6 +173,8 @@ class Lexer(object):
         # noinspection PySingleQuotedDocstring
         r"/\*(.|\n)*?\*/"
         t.lexer.lineno += t.value.count("\n")
+        if t.lexer.keep_comments:
+            return t
 
     # Structured comments
     # noinspection PyPep8Naming,PyIncorrectDocstring
@@ -190,14 +248,45 @@ class Lexer(object):
 
     @staticmethod
     def t_error(t):
-        raise LexerException("Illegal character '{}' at line {}.".format(
-                             t.value[0], t.lineno))
-
-    def __init__(self, **kwargs):
+        message = "Illegal character '{}' at line {}.".format(
+            t.value[0], t.lineno)
+        lineno, column = position(t.lexer, t.lexpos)
+        errors = t.lexer.errors
+        if errors is None:
+            raise LexerException(message, lineno=lineno, column=column,
+                                 lexpos=t.lexpos)
+        # Error recovery, skip the character.
+        errors.append(SourceError(message, lineno=lineno, column=column,
+                                  lexpos=t.lexpos))
+        t.lexer.skip(1)
+        if len(errors) >= t.lexer.max_errors:
+            raise LexerException(message, lineno=lineno, column=column,
+                                 lexpos=t.lexpos)
+
+    def __init__(self, keep_comments=False, **kwargs):
         """
         Constructor.
+
+        :param keep_comments: Produce LINE_COMMENT and BLOCK_COMMENT tokens
+            for comments, which are discarded otherwise. Such a lexer cannot
+            be used by the parser.
         """
         self.lexer = lex.lex(module=self, **kwargs)
+        self.lexer.keep_comments = keep_comments
+        # List collecting SourceError objects instead of raising on illegal
+        #   characters, set by the parser in error recovery mode.
+        self.lexer.errors = None
+        self.lexer.max_errors = 0
+
+    def recorder(self, source_map):
+        """
+        Get a token source recording token and comment offsets, for parsing
+        in lossless mode.
+
+        :param source_map: ast.SourceMap to record the offsets in.
+        :return: TokenRecorder object.
+        """
+        return TokenRecorder(self.lexer, source_map)
 
     def tokenize(self, data):
         """
@@ -236,3 +325,48 @@ class Lexer(object):
         with open(fspec, "r") as f:
             data = f.read()
         return self.tokenize(data)
+
+
+class TokenRecorder(object):
+    """
+    Token source of the parser in lossless mode.
+
+    Passes the tokens of a PLY lexer on to the parser, except comments, and
+    records the offsets of tokens and comments in a SourceMap. Together they
+    describe all text between the whitespace.
+    """
+
+    def __init__(self, lexer, source_map):
+        self._lexer = lexer
+        self.source_map = source_map
+
+    @property
+    def lineno(self):
+        return self._lexer.lineno
+
+    @property
+    def lexpos(self):
+        return self._lexer.lexpos
+
+    def input(self, data):
+        self._lexer.input(data)
+
+    def token(self):
+        lexer = self._lexer
+        source_map = self.source_map
+        keep_comments = lexer.keep_comments
+        lexer.keep_comments = True
+        try:
+            while True:
+                token = lexer.token()
+                if token is None:
+                    return None
+                if token.type in Lexer.comment_tokens:
+                    source_map.comment_starts.append(token.lexpos)
+                    source_map.comment_ends.append(lexer.lexpos)
+                else:
+                    source_map.token_starts.append(token.lexpos)
+                    source_map.token_ends.append(lexer.lexpos)
+                    return token
+        finally:
+            lexer.keep_comments = keep_comments
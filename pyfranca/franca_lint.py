@@ -0,0 +1,326 @@
+"""
+Franca model linter.
+
+Lint rules declare the AST node kinds they are interested in. The linter
+dispatches every node of a linked model to the interested rules during a
+single traversal, so enabling more rules does not add more passes over the
+model. Packages can be linted in parallel worker processes.
+"""
+
+import re
+from collections import OrderedDict
+from pyfranca import franca_walker, ast
+
+
+class LintException(Exception):
+
+    def __init__(self, message):
+        super(LintException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class Diagnostic(object):
+    """
+    A problem reported by a lint rule.
+    """
+
+    ERROR = "error"
+    WARNING = "warning"
+
+    def __init__(self, rule, message, file_name=None, lineno=None,
+                 severity=WARNING):
+        self.rule = rule
+        self.message = message
+        self.file = file_name
+        self.lineno = lineno
+        self.severity = severity
+
+    def __str__(self):
+        location = self.file if self.file else "<unknown>"
+        if self.lineno:
+            location += ":{}".format(self.lineno)
+        return "{}: {}: [{}] {}".format(location, self.severity, self.rule,
+                                        self.message)
+
+    def __repr__(self):
+        return "Diagnostic({!r}, {!r}, {!r}, {!r})".format(
+            self.rule, self.message, self.file, self.lineno)
+
+
+class Rule(object):
+    """
+    Base class of lint rules.
+
+    Subclasses set `name`, `kinds` and implement check().
+    """
+
+    # Unique rule name used to enable or disable the rule.
+    name = None
+    # Short description of the rule.
+    description = ""
+    # AST classes the rule is interested in.
+    kinds = ()
+    severity = Diagnostic.WARNING
+
+    def check(self, node, context):
+        """
+        Check a single node.
+
+        :param node: AST node of one of the kinds of the rule.
+        :param context: LintContext object used to report problems.
+        """
+        raise NotImplementedError
+
+
+class LintContext(object):
+    """
+    Traversal state passed to the rules.
+    """
+
+    def __init__(self, processor, linter):
+        self.processor = processor
+        self.package = None
+        self.namespace = None
+        self.parent = None
+        self._linter = linter
+
+    def report(self, rule, node, message):
+        """
+        Report a problem with a node.
+
+        :param rule: Reporting Rule object.
+        :param node: Offending AST node.
+        :param message: Problem description.
+        """
+        file_name = None
+        if self.namespace is not None and self.namespace.file:
+            file_name = self.namespace.file
+        elif self.package is not None and self.package.files:
+            file_name = self.package.files[0]
+        self._linter.diagnostics.append(Diagnostic(
+            rule.name, message, file_name, getattr(node, "lineno", None),
+            rule.severity))
+
+
+class NamingRule(Rule):
+
+    name = "naming"
+    description = "Names must follow the naming conventions."
+    kinds = (ast.Namespace, ast.Typedef, ast.Enumeration, ast.Struct,
+             ast.Union, ast.Array, ast.Map, ast.Attribute, ast.Method,
+             ast.Broadcast, ast.StructField, ast.UnionField, ast.Argument,
+             ast.Enumerator, ast.Constant)
+
+    def __init__(self, type_pattern=r"^[A-Z][A-Za-z0-9]*$",
+                 member_pattern=r"^[a-z][A-Za-z0-9]*$",
+                 enumerator_pattern=r"^[A-Z][A-Z0-9_]*$",
+                 constant_pattern=r"^[A-Z][A-Za-z0-9_]*$"):
+        """
+        Constructor.
+
+        :param type_pattern: Pattern for namespaces and type names.
+        :param member_pattern: Pattern for interface members, fields and
+            arguments.
+        :param enumerator_pattern: Pattern for enumerators.
+        :param constant_pattern: Pattern for constants.
+        """
+        self._patterns = [
+            ((ast.Attribute, ast.Method, ast.Broadcast, ast.StructField,
+              ast.UnionField, ast.Argument), re.compile(member_pattern),
+             "member"),
+            ((ast.Enumerator,), re.compile(enumerator_pattern),
+             "enumerator"),
+            ((ast.Constant,), re.compile(constant_pattern), "constant"),
+            ((ast.Namespace, ast.Type), re.compile(type_pattern), "type"),
+        ]
+
+    def check(self, node, context):
+        if isinstance(node, ast.Array) and node.name is None:
+            # Implicit array.
+            return
+        for kinds, pattern, what in self._patterns:
+            if isinstance(node, kinds):
+                if not pattern.match(node.name):
+                    context.report(self, node, "Invalid {} name '{}'.".format(
+                        what, node.name))
+                return
+
+
+class DeprecatedReferenceRule(Rule):
+
+    name = "deprecated-reference"
+    description = "Deprecated types and interfaces should not be used."
+    kinds = (ast.Reference, ast.Struct, ast.Union, ast.Enumeration,
+             ast.Interface)
+
+    def check(self, node, context):
+        target = node.reference
+        if target is None or "@deprecated" not in target.comments:
+            return
+        if isinstance(target, ast.Namespace):
+            name = target.name
+        else:
+            name = "{}.{}".format(target.namespace.name, target.name)
+        reason = target.comments["@deprecated"]
+        if reason:
+            message = "Use of deprecated '{}': {}".format(name, reason)
+        else:
+            message = "Use of deprecated '{}'.".format(name)
+        context.report(self, node, message)
+
+
+class UnusedTypeRule(Rule):
+
+    name = "unused-type"
+    description = "Types defined in type collections should be used."
+    kinds = (ast.Typedef, ast.Enumeration, ast.Struct, ast.Union,
+             ast.Array, ast.Map)
+
+    def check(self, node, context):
+        if not isinstance(node.namespace, ast.TypeCollection) or \
+                node.name is None:
+            return
+        if not context.processor.usages.get(node):
+            context.report(self, node, "Unused type '{}'.".format(node.name))
+
+
+class MissingVersionRule(Rule):
+
+    name = "missing-version"
+    description = "Interfaces and type collections should have a version."
+    kinds = (ast.Namespace,)
+
+    def check(self, node, context):
+        if node.version is None:
+            context.report(self, node, "Missing version in '{}'.".format(
+                node.name))
+
+
+class EnumeratorValueRule(Rule):
+
+    name = "enumerator-value"
+    description = "Enumerators should have explicit values."
+    kinds = (ast.Enumeration,)
+
+    def check(self, node, context):
+        for enumerator in node.enumerators.values():
+            if enumerator.value is None:
+                context.report(self, enumerator,
+                               "Enumerator '{}.{}' has no value.".format(
+                                   node.name, enumerator.name))
+
+
+# Built-in rules in reporting order.
+RULES = OrderedDict((rule.name, rule) for rule in (
+    NamingRule,
+    DeprecatedReferenceRule,
+    UnusedTypeRule,
+    MissingVersionRule,
+    EnumeratorValueRule,
+))
+
+# Linter and processor used by worker processes, inherited on fork.
+_worker_state = None
+
+
+def _lint_worker(names):
+    linter, processor = _worker_state
+    return [(name, linter._lint_packages(processor,
+                                         [processor.packages[name]]))
+            for name in names]
+
+
+class Linter(object):
+    """
+    Runs lint rules over linked models.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Constructor.
+
+        :param rules: List of Rule objects. Defaults to all built-in rules.
+        """
+        if rules is None:
+            rules = [rule() for rule in RULES.values()]
+        self.rules = list(rules)
+        self.diagnostics = []
+        # Maps AST classes to lists of interested rules.
+        self._dispatch = {}
+
+    def _rules(self, cls):
+        rules = self._dispatch.get(cls)
+        if rules is None:
+            rules = [rule for rule in self.rules
+                     if issubclass(cls, rule.kinds)]
+            self._dispatch[cls] = rules
+        return rules
+
+    def _lint_packages(self, processor, packages):
+        self.diagnostics = []
+        context = LintContext(processor, self)
+        for node, parent in franca_walker.walk_with_parents(packages):
+            if isinstance(node, ast.Package):
+                context.package = node
+                context.namespace = None
+            elif isinstance(node, ast.Namespace):
+                context.namespace = node
+            rules = self._rules(node.__class__)
+            if rules:
+                context.parent = parent
+                for rule in rules:
+                    rule.check(node, context)
+        return self.diagnostics
+
+    def run(self, processor, packages=None, jobs=1):
+        """
+        Lint a linked model.
+
+        :param processor: Processor holding the linked model.
+        :param packages: Names of the packages to lint. Defaults to all.
+        :param jobs: Number of worker processes. Falls back to a single
+            process where forking is not available.
+        :return: List of Diagnostic objects, in package order.
+        """
+        names = list(packages) if packages is not None else \
+            list(processor.packages.keys())
+        for name in names:
+            if name not in processor.packages:
+                raise LintException("Unknown package '{}'.".format(name))
+        context = self._fork_context() if jobs > 1 and len(names) > 1 \
+            else None
+        if context is None:
+            return self._lint_packages(
+                processor, [processor.packages[name] for name in names])
+
+        global _worker_state
+        _worker_state = (self, processor)
+        try:
+            chunks = [names[i::jobs] for i in range(jobs)]
+            chunks = [chunk for chunk in chunks if chunk]
+            pool = context.Pool(len(chunks))
+            try:
+                results = pool.map(_lint_worker, chunks)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _worker_state = None
+        by_package = {}
+        for chunk in results:
+            by_package.update(chunk)
+        self.diagnostics = []
+        for name in names:
+            self.diagnostics.extend(by_package[name])
+        return self.diagnostics
+
+    @staticmethod
+    def _fork_context():
+        try:
+            import multiprocessing
+            return multiprocessing.get_context("fork")
+        except (ImportError, AttributeError, ValueError):
+            return None
@@ -0,0 +1,913 @@
+"""
+Franca language server.
+
+Implements a subset of the Language Server Protocol over stdio on top of the
+lexer, the parser and the processor:
+
+- diagnostics from lexer, parser and processor exceptions,
+- go to definition and hover through resolved references,
+- find references,
+- completion of FQNs.
+
+Every document is tokenized once per change into an in-memory index of
+declarations and name occurrences. Documents are linked lazily, only when a
+query needs it, and the linked processors are reused until one of the files
+they depend on changes. References are found in the usage index of one
+processor linking the whole workspace, which relinks only the changed
+documents and the documents importing them. Unchanged files are never parsed
+twice thanks to a shared parse cache.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+
+try:
+    from urllib.parse import unquote, quote, urlparse
+except ImportError:
+    from urllib import unquote, quote
+    from urlparse import urlparse
+
+from pyfranca import franca_lexer, franca_parser, franca_processor, \
+    franca_walker, ast
+
+
+# LSP constants.
+SEVERITY_ERROR = 1
+MESSAGE_TYPE_ERROR = 1
+PARSE_ERROR = -32700
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Syntax errors reported per document.
+MAX_ERRORS = 100
+SYNC_FULL = 1
+COMPLETION_KIND_CLASS = 7
+COMPLETION_KIND_MODULE = 9
+
+# Keywords followed by the name of a declared namespace member.
+_DECLARATION_KEYWORDS = {
+    "TYPEDEF": "typedef",
+    "ENUMERATION": "enumeration",
+    "STRUCT": "struct",
+    "UNION": "union",
+    "ARRAY": "array",
+    "MAP": "map",
+    "METHOD": "method",
+    "BROADCAST": "broadcast",
+}
+
+# Keywords followed by a type and then by the name of a declared member.
+_TYPED_DECLARATION_KEYWORDS = {
+    "ATTRIBUTE": "attribute",
+    "CONST": "const",
+}
+
+_PRIMITIVE_TOKENS = set(
+    keyword.upper() for keyword in franca_lexer.Lexer.keywords
+    if hasattr(ast, keyword) and
+    issubclass(getattr(ast, keyword), ast.PrimitiveType))
+
+# Exceptions of handlers reading missing or mistyped params.
+_PARAMS_ERRORS = (AttributeError, KeyError, TypeError, ValueError)
+
+_TOKEN_RE = re.compile(r"[\w.]+|\S")
+_REFERENCE_RE = re.compile(r"reference '([^']+)'")
+
+
+def uri_to_fspec(uri):
+    """
+    Convert a file URI into an absolute file specification.
+    """
+    return os.path.abspath(unquote(urlparse(uri).path))
+
+
+def fspec_to_uri(fspec):
+    """
+    Convert a file specification into a file URI.
+    """
+    return "file://" + quote(os.path.abspath(fspec).replace(os.sep, "/"))
+
+
+class Symbol(object):
+    """
+    A name occurrence or a declaration in a document.
+    """
+
+    def __init__(self, name, start, end, namespace=None, kind=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.namespace = namespace      # Enclosing namespace name or None.
+        self.kind = kind                # Declaration keyword or None.
+
+
+class Document(object):
+    """
+    Indexed text of a FIDL document.
+    """
+
+    def __init__(self, uri, text, version=None, lexer=None):
+        self.uri = uri
+        self.fspec = uri_to_fspec(uri)
+        self.text = text
+        self.version = version
+        self.package = None
+        # Namespace members and namespaces declared in the document.
+        self.declarations = []
+        # Dotted names referenced in the document.
+        self.occurrences = []
+        self.line_index = ast.LineIndex(text)
+        self._index(lexer if lexer else franca_lexer.Lexer())
+
+    def position(self, offset):
+        """
+        Convert a character offset into an LSP position.
+        """
+        line, column = self.line_index.position(offset)
+        return {"line": line - 1, "character": column - 1}
+
+    def offset(self, position):
+        """
+        Convert an LSP position into a character offset.
+        """
+        starts = self.line_index.starts
+        line = min(position["line"], len(starts) - 1)
+        return min(starts[line] + position["character"], len(self.text))
+
+    def range(self, start, end):
+        return {"start": self.position(start), "end": self.position(end)}
+
+    def symbol_at(self, offset):
+        """
+        Get the occurrence or the declaration at an offset.
+        """
+        for symbol in self.occurrences:
+            if symbol.start <= offset <= symbol.end:
+                return symbol
+        for symbol in self.declarations:
+            if symbol.start <= offset <= symbol.end:
+                return symbol
+        return None
+
+    def prefix_at(self, offset):
+        """
+        Get the dotted name left of an offset, used for completion.
+        """
+        start = offset
+        while start > 0 and (self.text[start - 1].isalnum() or
+                             self.text[start - 1] in "._"):
+            start -= 1
+        return self.text[start:offset]
+
+    def _tokens(self, lexer):
+        lexer.lexer.lineno = 1
+        lexer.lexer.input(self.text)
+        while True:
+            try:
+                tok = lexer.lexer.token()
+            except franca_lexer.LexerException:
+                # Index the document up to the illegal character.
+                return
+            if not tok:
+                return
+            if tok.type != "STRUCTURED_COMMENT":
+                yield tok
+
+    def _index(self, lexer):
+        tokens = list(self._tokens(lexer))
+        count = len(tokens)
+        namespace = None
+        header = None
+        depth = 0
+        i = 0
+        while i < count:
+            kind = tokens[i].type
+            if kind in ("PACKAGE", "IMPORT"):
+                name, i = self._dotted(tokens, i + 1)
+                if kind == "PACKAGE":
+                    self.package = name
+                continue
+            if kind == "ID":
+                i = self._occurrence(tokens, i, namespace)
+                continue
+            if kind in ("INTERFACE", "TYPECOLLECTION") and \
+                    i + 1 < count and tokens[i + 1].type == "ID":
+                namespace = tokens[i + 1].value
+                self._declare(tokens[i + 1], None, tokens[i].value)
+                header = kind
+                i += 2
+                continue
+            if kind in _DECLARATION_KEYWORDS and namespace and \
+                    i + 1 < count and tokens[i + 1].type == "ID":
+                self._declare(tokens[i + 1], namespace,
+                              _DECLARATION_KEYWORDS[kind])
+                header = kind
+                i += 2
+                continue
+            if kind in _TYPED_DECLARATION_KEYWORDS and namespace:
+                j = self._type(tokens, i + 1, namespace)
+                if j is not None and j < count and tokens[j].type == "ID":
+                    self._declare(tokens[j], namespace,
+                                  _TYPED_DECLARATION_KEYWORDS[kind])
+                    i = j + 1
+                    continue
+            if kind in ("IN", "OUT", "ERROR", "VERSION"):
+                header = kind
+            elif kind == "{":
+                if header in ("STRUCT", "UNION", "IN", "OUT"):
+                    i = self._fields(tokens, i + 1, namespace)
+                    header = None
+                    continue
+                if header in ("ENUMERATION", "ERROR", "VERSION"):
+                    # Enumerators and version numbers are not references.
+                    while i < count and tokens[i].type != "}":
+                        i += 1
+                    header = None
+                    i += 1
+                    continue
+                header = None
+                depth += 1
+            elif kind == "}":
+                header = None
+                depth -= 1
+                if depth <= 0:
+                    depth = 0
+                    namespace = None
+            i += 1
+
+    @staticmethod
+    def _dotted(tokens, i):
+        """
+        Collect a dotted name starting at a token index.
+
+        :return: Tuple - name or None, index of the following token.
+        """
+        count = len(tokens)
+        if i >= count or tokens[i].type not in ("ID", "*"):
+            return None, i
+        name = str(tokens[i].value)
+        i += 1
+        while i + 1 < count and tokens[i].type == "." and \
+                tokens[i + 1].type in ("ID", "*"):
+            name += "." + tokens[i + 1].value
+            i += 2
+        return name, i
+
+    def _occurrence(self, tokens, i, namespace):
+        name, j = self._dotted(tokens, i)
+        end = tokens[j - 1].lexpos + len(tokens[j - 1].value)
+        self.occurrences.append(
+            Symbol(name, tokens[i].lexpos, end, namespace))
+        return j
+
+    def _declare(self, tok, namespace, kind):
+        self.declarations.append(
+            Symbol(tok.value, tok.lexpos, tok.lexpos + len(tok.value),
+                   namespace, kind))
+
+    def _type(self, tokens, i, namespace):
+        """
+        Index a type at a token index.
+
+        :return: Index of the token following the type or None.
+        """
+        count = len(tokens)
+        if i >= count:
+            return None
+        if tokens[i].type in _PRIMITIVE_TOKENS:
+            i += 1
+        elif tokens[i].type == "ID":
+            i = self._occurrence(tokens, i, namespace)
+        else:
+            return None
+        if i + 1 < count and tokens[i].type == "[" and \
+                tokens[i + 1].type == "]":
+            i += 2
+        return i
+
+    def _fields(self, tokens, i, namespace):
+        """
+        Index a list of typed fields or arguments up to the closing brace.
+
+        :return: Index of the token following the closing brace.
+        """
+        count = len(tokens)
+        while i < count and tokens[i].type != "}":
+            j = self._type(tokens, i, namespace)
+            if j is None:
+                i += 1
+                continue
+            if j < count and tokens[j].type == "ID":
+                # Field name.
+                j += 1
+            i = j
+        return i + 1
+
+
+class Workspace(object):
+    """
+    In-memory indexes of the FIDL documents in a workspace.
+    """
+
+    def __init__(self):
+        self.lexer = franca_lexer.Lexer()
+        self.parser = franca_parser.Parser()
+        self.parse_cache = franca_processor.ParseCache()
+        self.package_paths = []
+        # Maps absolute file specifications to Document objects.
+        self.documents = {}
+        # File specifications of documents open in the editor.
+        self.open_documents = set()
+        # Maps FQNs to (file specification, declaration Symbol).
+        self.definitions = {}
+        # Maps file specifications to change counters.
+        self._generations = {}
+        # Maps file specifications to (generations, processor, error).
+        self._links = {}
+        # Tuple - generations, processor linking all documents, or None.
+        self._workspace_link = None
+        # File specifications of the documents failing to link in it.
+        self._unlinked = set()
+
+    def _generation(self, fspec):
+        return self._generations.get(fspec, 0)
+
+    def add_folder(self, path):
+        """
+        Index all FIDL files under a directory.
+        """
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.endswith(".fidl"):
+                    fspec = os.path.join(root, name)
+                    try:
+                        with open(fspec, "r") as f:
+                            text = f.read()
+                    except (IOError, OSError):
+                        continue
+                    self.update(fspec_to_uri(fspec), text)
+        if path not in self.package_paths:
+            self.package_paths.append(path)
+
+    def update(self, uri, text, version=None):
+        """
+        Replace the text of a document and re-index it.
+
+        :return: The new Document.
+        """
+        document = Document(uri, text, version, self.lexer)
+        fspec = document.fspec
+        old = self.documents.get(fspec)
+        if old is not None:
+            self._unregister(old)
+        self.documents[fspec] = document
+        self._register(document)
+        self._generations[fspec] = self._generation(fspec) + 1
+        return document
+
+    def remove(self, uri):
+        fspec = uri_to_fspec(uri)
+        document = self.documents.pop(fspec, None)
+        if document is not None:
+            self._unregister(document)
+            self._generations[fspec] = self._generation(fspec) + 1
+        self._links.pop(fspec, None)
+
+    def _fqn(self, document, symbol):
+        if symbol.namespace is None:
+            return "{}.{}".format(document.package, symbol.name)
+        return "{}.{}.{}".format(document.package, symbol.namespace,
+                                 symbol.name)
+
+    def _register(self, document):
+        for symbol in document.declarations:
+            self.definitions[self._fqn(document, symbol)] = \
+                (document.fspec, symbol)
+
+    def _unregister(self, document):
+        for symbol in document.declarations:
+            fqn = self._fqn(document, symbol)
+            if self.definitions.get(fqn, (None,))[0] == document.fspec:
+                del self.definitions[fqn]
+
+    def link(self, fspec):
+        """
+        Link a document with its imports.
+
+        The result is reused until the document or one of its imports
+        changes.
+
+        :return: Tuple - processor, exception or None.
+        """
+        entry = self._links.get(fspec)
+        if entry is not None:
+            generations, processor, error = entry
+            if all(self._generation(f) == g for f, g in generations.items()):
+                return processor, error
+        processor = self._processor()
+        error = None
+        try:
+            document = self.documents[fspec]
+            processor.import_string(fspec, document.text)
+        except (franca_lexer.LexerException,
+                franca_parser.ParserException,
+                franca_processor.ProcessorException) as e:
+            error = e
+        generations = dict((f, self._generation(f))
+                           for f in processor.file_digests)
+        generations[fspec] = self._generation(fspec)
+        self._links[fspec] = (generations, processor, error)
+        return processor, error
+
+    def _processor(self):
+        """
+        Create a processor reading the open documents from memory.
+        """
+        processor = franca_processor.Processor()
+        processor.parser = self.parser
+        processor.parse_cache = self.parse_cache
+        processor.max_errors = MAX_ERRORS
+        processor.package_paths.extend(self.package_paths)
+        for other in self.open_documents:
+            processor.register_string(other, self.documents[other].text)
+        return processor
+
+    def link_all(self):
+        """
+        Link all documents into one processor, whose usage index answers
+        reference queries. Documents failing to link are skipped.
+
+        When documents change, only they and the documents importing them
+        are linked again, the others stay linked.
+
+        :return: Processor object.
+        """
+        generations = dict(self._generations)
+        processor = None
+        if self._workspace_link is not None:
+            linked, processor = self._workspace_link
+            if linked == generations:
+                return processor
+            changed = [fspec for fspec in generations
+                       if linked.get(fspec) != generations[fspec]]
+            if all(fspec in self.documents for fspec in changed):
+                for fspec in changed:
+                    processor.register_string(fspec,
+                                              self.documents[fspec].text)
+                stale = processor.unload(changed) | set(changed) | \
+                    self._unlinked
+            else:
+                # Removed documents could still be imported from memory.
+                processor = None
+        if processor is None:
+            processor = self._processor()
+            stale = set(self.documents)
+        self._unlinked = set()
+        for fspec in sorted(stale & set(self.documents)):
+            try:
+                processor.import_string(fspec, self.documents[fspec].text)
+            except (franca_lexer.LexerException,
+                    franca_parser.ParserException,
+                    franca_processor.ProcessorException):
+                self._unlinked.add(fspec)
+        self._workspace_link = (generations, processor)
+        return processor
+
+    def diagnostics(self, fspec):
+        """
+        Get the LSP diagnostics of a document.
+        """
+        processor, error = self.link(fspec)
+        if error is None:
+            return []
+        document = self.documents[fspec]
+        errors = getattr(error, "errors", None) or [error]
+        return [OrderedDict([
+            ("range", self._error_range(document, item)),
+            ("severity", SEVERITY_ERROR),
+            ("source", "pyfranca"),
+            ("message", item.message),
+        ]) for item in errors]
+
+    @staticmethod
+    def _error_range(document, error):
+        """
+        Get the range of a located error in a document, or guess it from the
+        message of other errors.
+        """
+        text = document.text
+        if error.file in (None, os.path.abspath(document.fspec)):
+            if error.lexpos is not None:
+                start = min(error.lexpos, len(text))
+                match = _TOKEN_RE.match(text, start)
+                return document.range(start,
+                                      match.end() if match else start)
+            if error.lineno is not None:
+                starts = document.line_index.starts
+                start = starts[min(error.lineno - 1, len(starts) - 1)]
+                end = text.find("\n", start)
+                if end == -1:
+                    end = len(text)
+                return document.range(start, end)
+        match = _REFERENCE_RE.search(error.message)
+        if match:
+            for symbol in document.occurrences:
+                if symbol.name == match.group(1):
+                    return document.range(symbol.start, symbol.end)
+        return document.range(0, 0)
+
+    def _namespace(self, processor, document, name):
+        package = processor.files.get(document.fspec)
+        if package is None or name is None or name not in package:
+            return None
+        return package[name]
+
+    def target(self, fspec, offset):
+        """
+        Resolve the symbol at an offset to an AST object.
+
+        :return: Tuple - symbol, AST object or None.
+        """
+        document = self.documents.get(fspec)
+        if document is None:
+            return None, None
+        symbol = document.symbol_at(offset)
+        if symbol is None:
+            return None, None
+        processor, _ = self.link(fspec)
+        namespace = self._namespace(processor, document, symbol.namespace)
+        if symbol.kind is not None:
+            if namespace is None:
+                return symbol, self._namespace(processor, document,
+                                               symbol.name)
+            return symbol, namespace[symbol.name] \
+                if symbol.name in namespace else None
+        if namespace is None:
+            return symbol, None
+        try:
+            return symbol, franca_processor.Processor.resolve(
+                namespace, str(symbol.name))
+        except franca_processor.ProcessorException:
+            pass
+        # Interface extensions refer to namespaces.
+        try:
+            return symbol, franca_processor.Processor.resolve_namespace(
+                namespace.package, str(symbol.name))
+        except franca_processor.ProcessorException:
+            return symbol, None
+
+    @staticmethod
+    def fqn(item):
+        """
+        Get the FQN of a namespace or a namespace member.
+        """
+        if isinstance(item, ast.Namespace):
+            return "{}.{}".format(item.package.name, item.name)
+        return "{}.{}.{}".format(item.namespace.package.name,
+                                 item.namespace.name, item.name)
+
+    def location(self, item):
+        """
+        Get the LSP location of the declaration of an AST object.
+        """
+        entry = self.definitions.get(self.fqn(item))
+        if entry is None:
+            return None
+        fspec, symbol = entry
+        document = self.documents[fspec]
+        return OrderedDict([
+            ("uri", document.uri),
+            ("range", document.range(symbol.start, symbol.end)),
+        ])
+
+    @staticmethod
+    def _lookup(processor, item):
+        """
+        Get the object of a processor with the FQN of an AST object linked
+        by another processor.
+        """
+        namespace = item if isinstance(item, ast.Namespace) \
+            else item.namespace
+        package = processor.packages.get(namespace.package.name)
+        if package is None or namespace.name not in package:
+            return None
+        namespace = package[namespace.name]
+        if isinstance(item, ast.Namespace):
+            return namespace
+        return namespace[item.name] if item.name in namespace else None
+
+    @staticmethod
+    def _usage_spans(document, usage, target):
+        """
+        Get the offsets of the names referring to a target in a usage.
+        """
+        if usage.kind == franca_processor.Usage.EXTENDS:
+            # The extended name follows the declared one.
+            if usage.item.span is None:
+                return []
+            for symbol in document.occurrences:
+                if symbol.start >= usage.item.span[1] and \
+                        symbol.name.rsplit(".", 1)[-1] == target.name:
+                    return [(symbol.start, symbol.end)]
+            return []
+        return [node.span for node in franca_walker.walk(usage.item,
+                                                         ast.Reference)
+                if node.reference is target and node.span is not None]
+
+    def references(self, item):
+        """
+        Get the LSP locations of all uses of an AST object.
+        """
+        processor = self.link_all()
+        target = self._lookup(processor, item)
+        if target is None:
+            return []
+        spans = set()
+        for usage in processor.get_usages(target):
+            owner = usage.owner
+            if not isinstance(owner, ast.Namespace):
+                owner = owner.namespace
+            if owner.file in self.documents:
+                for span in self._usage_spans(self.documents[owner.file],
+                                              usage, target):
+                    spans.add((owner.file, span))
+        res = []
+        for fspec, (start, end) in sorted(spans):
+            document = self.documents[fspec]
+            res.append(OrderedDict([
+                ("uri", document.uri),
+                ("range", document.range(start, end)),
+            ]))
+        return res
+
+    def completions(self, prefix):
+        """
+        Get the LSP completion items for a name prefix.
+        """
+        items = []
+        for fqn, (_, symbol) in sorted(self.definitions.items()):
+            if prefix and not (fqn.startswith(prefix) or
+                               symbol.name.startswith(prefix)):
+                continue
+            items.append(OrderedDict([
+                ("label", fqn if "." in prefix else symbol.name),
+                ("kind", COMPLETION_KIND_MODULE if symbol.kind in
+                 ("interface", "typeCollection") else COMPLETION_KIND_CLASS),
+                ("detail", fqn),
+                ("insertText", fqn if "." in prefix else symbol.name),
+            ]))
+        return items
+
+
+def hover_text(item):
+    """
+    Render the hover text of an AST object from its structured comments.
+    """
+    lines = ["**{}** `{}`".format(item.__class__.__name__.lower(),
+                                  Workspace.fqn(item))]
+    base_type = getattr(item, "type", None)
+    if isinstance(base_type, ast.Type) and not isinstance(item, ast.Array):
+        lines.append("")
+        lines.append("is `{}`".format(base_type.name))
+    for key, value in item.comments.items():
+        lines.append("")
+        lines.append("*{}* {}".format(key, value).rstrip())
+    return "\n".join(lines)
+
+
+class LanguageServer(object):
+    """
+    Franca IDL language server.
+    """
+
+    def __init__(self, instream=None, outstream=None):
+        """
+        Constructor.
+
+        :param instream: Binary input stream. Defaults to stdin.
+        :param outstream: Binary output stream. Defaults to stdout.
+        """
+        self.instream = instream if instream else \
+            getattr(sys.stdin, "buffer", sys.stdin)
+        self.outstream = outstream if outstream else \
+            getattr(sys.stdout, "buffer", sys.stdout)
+        self.workspace = Workspace()
+        self.running = False
+        self._shutdown = False
+        self._handlers = {
+            "initialize": self._initialize,
+            "initialized": None,
+            "shutdown": self._on_shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didSave": None,
+            "textDocument/didClose": self._did_close,
+            "textDocument/definition": self._definition,
+            "textDocument/references": self._references,
+            "textDocument/hover": self._hover,
+            "textDocument/completion": self._completion,
+        }
+
+    def read_message(self):
+        """
+        Read a single JSON-RPC message.
+
+        :return: Message dictionary or None at the end of the input.
+        """
+        length = None
+        while True:
+            line = self.instream.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            key, _, value = line.decode("ascii").partition(":")
+            if key.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.instream.read(length).decode("utf-8"))
+
+    def write_message(self, message):
+        """
+        Write a single JSON-RPC message.
+        """
+        body = json.dumps(message).encode("utf-8")
+        self.outstream.write(
+            "Content-Length: {}\r\n\r\n".format(len(body)).encode("ascii"))
+        self.outstream.write(body)
+        self.outstream.flush()
+
+    def notify(self, method, params):
+        self.write_message(OrderedDict([
+            ("jsonrpc", "2.0"), ("method", method), ("params", params)]))
+
+    def handle(self, message):
+        """
+        Handle a single JSON-RPC message, writing any response.
+
+        A failing request is answered with an error and a failing
+        notification is logged, the server keeps serving.
+        """
+        method = message.get("method")
+        handler = self._handlers.get(method)
+        params = message.get("params") or {}
+        if "id" not in message:
+            # Notification.
+            if handler is not None:
+                try:
+                    handler(params)
+                except Exception as e:
+                    self.notify("window/logMessage", {
+                        "type": MESSAGE_TYPE_ERROR,
+                        "message": "Notification '{}' failed: {}".format(
+                            method, self._describe(e))})
+            return
+        response = OrderedDict([("jsonrpc", "2.0"), ("id", message["id"])])
+        if method not in self._handlers:
+            response["error"] = self._error(
+                METHOD_NOT_FOUND, "Unknown method '{}'.".format(method))
+        else:
+            try:
+                response["result"] = handler(params) if handler else None
+            except _PARAMS_ERRORS as e:
+                response["error"] = self._error(
+                    INVALID_PARAMS, "Invalid params of '{}': {}".format(
+                        method, self._describe(e)))
+            except Exception as e:
+                response["error"] = self._error(
+                    INTERNAL_ERROR, "Request '{}' failed: {}".format(
+                        method, self._describe(e)))
+        self.write_message(response)
+
+    @staticmethod
+    def _error(code, message):
+        return OrderedDict([("code", code), ("message", message)])
+
+    @staticmethod
+    def _describe(e):
+        return "{} {}".format(type(e).__name__, e)
+
+    def serve(self):
+        """
+        Serve messages until the exit notification or the end of the input.
+        """
+        self.running = True
+        while self.running:
+            try:
+                message = self.read_message()
+            except ValueError as e:
+                self.write_message(OrderedDict([
+                    ("jsonrpc", "2.0"), ("id", None),
+                    ("error", self._error(PARSE_ERROR, self._describe(e)))]))
+                continue
+            if message is None:
+                break
+            self.handle(message)
+        self.running = False
+
+    def _initialize(self, params):
+        root = params.get("rootUri")
+        if root:
+            self.workspace.add_folder(uri_to_fspec(root))
+        elif params.get("rootPath"):
+            self.workspace.add_folder(os.path.abspath(params["rootPath"]))
+        return {
+            "capabilities": {
+                "textDocumentSync": SYNC_FULL,
+                "definitionProvider": True,
+                "referencesProvider": True,
+                "hoverProvider": True,
+                "completionProvider": {"triggerCharacters": ["."]},
+            },
+            "serverInfo": {"name": "pyfranca"},
+        }
+
+    def _on_shutdown(self, params):
+        self._shutdown = True
+        return None
+
+    def _exit(self, params):
+        self.running = False
+
+    def _publish(self, fspec):
+        document = self.workspace.documents[fspec]
+        self.notify("textDocument/publishDiagnostics", {
+            "uri": document.uri,
+            "diagnostics": self.workspace.diagnostics(fspec),
+        })
+
+    def _did_open(self, params):
+        item = params["textDocument"]
+        document = self.workspace.update(item["uri"], item["text"],
+                                         item.get("version"))
+        self.workspace.open_documents.add(document.fspec)
+        self._publish(document.fspec)
+
+    def _did_change(self, params):
+        item = params["textDocument"]
+        changes = params.get("contentChanges") or []
+        if not changes:
+            return
+        document = self.workspace.update(item["uri"], changes[-1]["text"],
+                                         item.get("version"))
+        self._publish(document.fspec)
+
+    def _did_close(self, params):
+        uri = params["textDocument"]["uri"]
+        fspec = uri_to_fspec(uri)
+        self.workspace.open_documents.discard(fspec)
+        try:
+            with open(fspec, "r") as f:
+                self.workspace.update(uri, f.read())
+        except (IOError, OSError):
+            self.workspace.remove(uri)
+        self.notify("textDocument/publishDiagnostics",
+                    {"uri": uri, "diagnostics": []})
+
+    def _target(self, params):
+        fspec = uri_to_fspec(params["textDocument"]["uri"])
+        document = self.workspace.documents.get(fspec)
+        if document is None:
+            return None
+        _, item = self.workspace.target(
+            fspec, document.offset(params["position"]))
+        return item
+
+    def _definition(self, params):
+        item = self._target(params)
+        if item is None:
+            return None
+        return self.workspace.location(item)
+
+    def _references(self, params):
+        item = self._target(params)
+        if item is None:
+            return []
+        res = self.workspace.references(item)
+        context = params.get("context") or {}
+        if context.get("includeDeclaration"):
+            location = self.workspace.location(item)
+            if location:
+                res.insert(0, location)
+        return res
+
+    def _hover(self, params):
+        item = self._target(params)
+        if item is None:
+            return None
+        return {"contents": {"kind": "markdown", "value": hover_text(item)}}
+
+    def _completion(self, params):
+        fspec = uri_to_fspec(params["textDocument"]["uri"])
+        document = self.workspace.documents.get(fspec)
+        if document is None:
+            return []
+        prefix = document.prefix_at(document.offset(params["position"]))
+        return {"isIncomplete": False,
+                "items": self.workspace.completions(prefix)}
@@ -32,19 +32,68 @@ class ErrorArgumentGroup(ArgumentGroup):
 
 class ParserException(Exception):
 
-    def __init__(self, message):
+    def __init__(self, message, errors=None, file_name=None, lineno=None,
+                 column=None, lexpos=None):
         super(ParserException, self).__init__()
         self.message = message
+        # SourceError objects, when parsing with error recovery.
+        self.errors = errors if errors else []
+        # Location of the (first) error, if known.
+        self.file = file_name
+        self.lineno = lineno
+        self.column = column
+        self.lexpos = lexpos
 
     def __str__(self):
         return self.message
 
 
+class _RecoveringLexer(object):
+    """
+    Token source of the parser in error recovery mode, allowing tokens read
+    ahead while synchronizing to be pushed back.
+    """
+
+    def __init__(self, lexer):
+        self._lexer = lexer
+        self._pending = []
+        self.source_map = getattr(lexer, "source_map", None)
+
+    @property
+    def lineno(self):
+        return self._lexer.lineno
+
+    @property
+    def lexpos(self):
+        return self._lexer.lexpos
+
+    def input(self, data):
+        self._lexer.input(data)
+
+    def token(self):
+        if self._pending:
+            return self._pending.pop()
+        return self._lexer.token()
+
+    def push(self, token):
+        self._pending.append(token)
+
+
 class Parser(object):
     """
     Franca IDL PLY parser.
     """
 
+    # Tokens parsing resumes at after a syntax error, by the number of
+    #   blocks open: top-level definitions and namespace members.
+    _SYNC_TOKENS = (
+        frozenset(["IMPORT", "TYPECOLLECTION", "INTERFACE",
+                   "STRUCTURED_COMMENT"]),
+        frozenset(["VERSION", "TYPEDEF", "ENUMERATION", "STRUCT", "UNION",
+                   "ARRAY", "MAP", "CONST", "ATTRIBUTE", "METHOD",
+                   "BROADCAST", "STRUCTURED_COMMENT", "}"]),
+    )
+
     @staticmethod
     def _package_def(members):
         imports = []
@@ -62,6 +111,62 @@ class Parser(object):
                     raise ParserException("Unexpected package member type.")
         return imports, interfaces, typecollections
 
+    @staticmethod
+    def _track(p, node=None, symbol=None):
+        """
+        Record the source span of a node when parsing in lossless mode.
+
+        :param p: Production.
+        :param node: Node, p[0] by default.
+        :param symbol: Index of the symbol spanned by the node, by default
+            the node spans the production.
+        """
+        source_map = getattr(p.lexer, "source_map", None)
+        if source_map is None:
+            return
+        if symbol is None:
+            # Empty productions, e.g. missing structured comments, have no
+            #   meaningful position.
+            symbols = [item for item in p.slice[1:] if item.value is not None]
+            first = symbols[0]
+            last = symbols[-1]
+        else:
+            first = last = p.slice[symbol]
+        source_map.add(
+            p[0] if node is None else node, first.lexpos,
+            source_map.token_end(getattr(last, "endlexpos", last.lexpos)))
+
+    @staticmethod
+    def _replace(p, old, new):
+        """
+        Pass the recorded source span of a node on to its replacement when
+        parsing in lossless mode.
+        """
+        source_map = getattr(p.lexer, "source_map", None)
+        if source_map is not None:
+            source_map.replace(old, new)
+
+    @staticmethod
+    def _locate(p, node, symbol, last=None):
+        """
+        Record the line and the offsets of the symbols naming a node.
+
+        :param p: Production.
+        :param node: Node.
+        :param symbol: Index of the first symbol, an identifier, a keyword
+            or an FQN.
+        :param last: Index of the last symbol, the first one by default.
+        """
+        node.lineno = p.lineno(symbol)
+        item = p.slice[symbol if last is None else last]
+        end = getattr(item, "endoffset", None)
+        if end is None:
+            end = item.lexpos + len(item.value)
+            if item.type == "STRING_VAL":
+                # The value does not include the quotes.
+                end += 2
+        node.span = (p.lexpos(symbol), end)
+
     @staticmethod
     def parse_structured_comment(comment):
         """
@@ -109,6 +214,9 @@ class Parser(object):
                            interfaces=interfaces,
                            typecollections=typecollections,
                            comments=p[1])
+        Parser._locate(p, p[0], 3)
+        p[0].lineno = p.lineno(2)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -133,7 +241,9 @@ class Parser(object):
         defs : defs def
         """
         p[0] = p[1]
-        p[0].append(p[2])
+        # Definitions skipped by error recovery are None.
+        if p[2] is not None:
+            p[0].append(p[2])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -141,7 +251,7 @@ class Parser(object):
         """
         defs : def
         """
-        p[0] = [p[1]]
+        p[0] = [p[1]] if p[1] is not None else []
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -157,6 +267,9 @@ class Parser(object):
         fqn : ID '.' fqn
         """
         p[0] = "{}.{}".format(p[1], p[3])
+        p.set_lineno(0, p.lineno(1))
+        p.set_lexpos(0, p.lexpos(1))
+        p.slice[0].endoffset = p.slice[3].endoffset
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -165,6 +278,9 @@ class Parser(object):
         fqn : ID
         """
         p[0] = p[1]
+        p.set_lineno(0, p.lineno(1))
+        p.set_lexpos(0, p.lexpos(1))
+        p.slice[0].endoffset = p.lexpos(1) + len(p[1])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -173,6 +289,9 @@ class Parser(object):
         fqn : '*'
         """
         p[0] = p[1]
+        p.set_lineno(0, p.lineno(1))
+        p.set_lexpos(0, p.lexpos(1))
+        p.slice[0].endoffset = p.lexpos(1) + len(p[1])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -181,6 +300,8 @@ class Parser(object):
         def : IMPORT fqn FROM STRING_VAL
         """
         p[0] = ast.Import(file_name=p[4], namespace=p[2])
+        Parser._locate(p, p[0], 1, 4)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -189,6 +310,17 @@ class Parser(object):
         def : IMPORT MODEL STRING_VAL
         """
         p[0] = ast.Import(file_name=p[3])
+        Parser._locate(p, p[0], 1, 3)
+        Parser._track(p)
+
+    # noinspection PyIncorrectDocstring
+    @staticmethod
+    def p_def_error(p):
+        """
+        def : error
+        """
+        p[0] = None
+        p.parser.errok()
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -198,6 +330,8 @@ class Parser(object):
         """
         try:
             p[0] = ast.TypeCollection(name=p[3], flags=None, members=p[5], comments=p[1])
+            Parser._locate(p, p[0], 3)
+            Parser._track(p)
         except ast.ASTException as e:
             raise ParserException(e.message)
 
@@ -208,7 +342,9 @@ class Parser(object):
         typecollection_members : typecollection_members typecollection_member
         """
         p[0] = p[1]
-        p[0].append(p[2])
+        # Definitions skipped by error recovery are None.
+        if p[2] is not None:
+            p[0].append(p[2])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -216,7 +352,7 @@ class Parser(object):
         """
         typecollection_members : typecollection_member
         """
-        p[0] = [p[1]]
+        p[0] = [p[1]] if p[1] is not None else []
 
     # noinspection PyUnusedLocal, PyIncorrectDocstring
     @staticmethod
@@ -241,6 +377,15 @@ class Parser(object):
         """
         p[0] = p[1]
 
+    # noinspection PyIncorrectDocstring
+    @staticmethod
+    def p_typecollection_member_error(p):
+        """
+        typecollection_member : error
+        """
+        p[0] = None
+        p.parser.errok()
+
     # noinspection PyIncorrectDocstring
     @staticmethod
     def p_version_def(p):
@@ -248,6 +393,7 @@ class Parser(object):
         version_def : VERSION '{' MAJOR INTEGER_VAL MINOR INTEGER_VAL '}'
         """
         p[0] = ast.Version(major=p[4], minor=p[6])
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -256,6 +402,8 @@ class Parser(object):
         type_def : structured_comment TYPEDEF ID IS type
         """
         p[0] = ast.Typedef(name=p[3], base_type=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -266,6 +414,8 @@ class Parser(object):
         try:
             p[0] = ast.Interface(name=p[3], flags=None, members=p[5],
                                  extends=None, comments=p[1])
+            Parser._locate(p, p[0], 3)
+            Parser._track(p)
         except ast.ASTException as e:
             raise ParserException(e.message)
 
@@ -278,6 +428,8 @@ class Parser(object):
         try:
             p[0] = ast.Interface(name=p[3], flags=None, members=p[7],
                                  extends=p[5], comments=p[1])
+            Parser._locate(p, p[0], 3)
+            Parser._track(p)
         except ast.ASTException as e:
             raise ParserException(e.message)
 
@@ -288,7 +440,9 @@ class Parser(object):
         interface_members : interface_members interface_member
         """
         p[0] = p[1]
-        p[0].append(p[2])
+        # Definitions skipped by error recovery are None.
+        if p[2] is not None:
+            p[0].append(p[2])
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -296,7 +450,7 @@ class Parser(object):
         """
         interface_members : interface_member
         """
-        p[0] = [p[1]]
+        p[0] = [p[1]] if p[1] is not None else []
 
     # noinspection PyUnusedLocal, PyIncorrectDocstring
     @staticmethod
@@ -324,6 +478,15 @@ class Parser(object):
         """
         p[0] = p[1]
 
+    # noinspection PyIncorrectDocstring
+    @staticmethod
+    def p_interface_member_error(p):
+        """
+        interface_member : error
+        """
+        p[0] = None
+        p.parser.errok()
+
     # noinspection PyIncorrectDocstring
     @staticmethod
     def p_attribute_def(p):
@@ -331,6 +494,8 @@ class Parser(object):
         attribute_def : structured_comment ATTRIBUTE type ID flag_defs
         """
         p[0] = ast.Attribute(name=p[4], attr_type=p[3], flags=p[5], comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
 
     @staticmethod
     def _method_def(arg_groups):
@@ -371,6 +536,8 @@ class Parser(object):
         in_args, out_args, errors = Parser._method_def(p[6])
         p[0] = ast.Method(name=p[3], flags=p[4],
                           in_args=in_args, out_args=out_args, errors=errors, comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -477,6 +644,8 @@ class Parser(object):
             raise ParserException("In arguments and errors cannot be part "
                                   "of a broadcast definition.")
         p[0] = ast.Broadcast(name=p[3], flags=p[4], out_args=out_args, comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -506,6 +675,8 @@ class Parser(object):
         arg_def : structured_comment type ID
         """
         p[0] = ast.Argument(name=p[3], arg_type=p[2], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -514,6 +685,8 @@ class Parser(object):
         enumeration_def : structured_comment ENUMERATION ID '{' enumerators '}'
         """
         p[0] = ast.Enumeration(name=p[3], enumerators=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -522,6 +695,8 @@ class Parser(object):
         enumeration_def : structured_comment ENUMERATION ID EXTENDS fqn '{' enumerators '}'
         """
         p[0] = ast.Enumeration(name=p[3], enumerators=p[7], extends=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -560,6 +735,8 @@ class Parser(object):
         enumerator : structured_comment ID
         """
         p[0] = ast.Enumerator(name=p[2], comments=p[1])
+        Parser._locate(p, p[0], 2)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -568,6 +745,8 @@ class Parser(object):
         enumerator : structured_comment ID '=' integer_val
         """
         p[0] = ast.Enumerator(name=p[2], value=p[4], comments=p[1])
+        Parser._locate(p, p[0], 2)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -576,6 +755,8 @@ class Parser(object):
         struct_def : structured_comment STRUCT ID flag_defs '{' struct_fields '}'
         """
         p[0] = ast.Struct(name=p[3], fields=p[6], flags=p[4], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -584,6 +765,8 @@ class Parser(object):
         struct_def : structured_comment STRUCT ID EXTENDS fqn '{' struct_fields '}'
         """
         p[0] = ast.Struct(name=p[3], fields=p[7], extends=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -622,6 +805,8 @@ class Parser(object):
         struct_field : structured_comment type ID
         """
         p[0] = ast.StructField(name=p[3], field_type=p[2], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -630,6 +815,8 @@ class Parser(object):
         union_def : structured_comment UNION ID '{' union_fields '}'
         """
         p[0] = ast.Union(name=p[3], fields=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -638,6 +825,8 @@ class Parser(object):
         union_def : structured_comment UNION ID EXTENDS fqn '{' union_fields '}'
         """
         p[0] = ast.Union(name=p[3], fields=p[7], extends=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -676,6 +865,8 @@ class Parser(object):
         union_field : structured_comment type ID
         """
         p[0] = ast.UnionField(name=p[3], field_type=p[2], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -684,6 +875,8 @@ class Parser(object):
         array_def : structured_comment ARRAY ID OF type
         """
         p[0] = ast.Array(name=p[3], element_type=p[5], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -692,6 +885,8 @@ class Parser(object):
         map_def : structured_comment MAP ID '{' type TO type '}'
         """
         p[0] = ast.Map(name=p[3], key_type=p[5], value_type=p[7], comments=p[1])
+        Parser._locate(p, p[0], 3)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -709,6 +904,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.IntegerValue(p[6].value, p[6].base)
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -734,6 +933,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.IntegerValue(int(p[6].value))
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -746,6 +949,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.FloatValue(float(p[6].value))
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -758,6 +965,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.DoubleValue(float(p[6].value))
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -768,6 +979,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.BooleanValue(bool(p[6].value))
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -778,6 +993,10 @@ class Parser(object):
         type_class = getattr(ast, p[3])
         value = ast.StringValue(str(p[6].value))
         p[0] = ast.Constant(name=p[4], element_type=type_class(), element_value=value, comments=p[1])
+        Parser._locate(p, p[0], 4)
+        Parser._track(p)
+        Parser._track(p, p[0].type, 3)
+        Parser._replace(p, p[6], value)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -786,6 +1005,7 @@ class Parser(object):
         boolean_val : BOOLEAN_VAL
         """
         p[0] = ast.BooleanValue(p[1])
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -794,6 +1014,7 @@ class Parser(object):
         integer_val : INTEGER_VAL
         """
         p[0] = ast.IntegerValue(p[1])
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -802,6 +1023,7 @@ class Parser(object):
         integer_val : HEXADECIMAL_VAL
         """
         p[0] = ast.IntegerValue(p[1], ast.IntegerValue.HEXADECIMAL)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -810,6 +1032,7 @@ class Parser(object):
         integer_val : BINARY_VAL
         """
         p[0] = ast.IntegerValue(p[1], ast.IntegerValue.BINARY)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -823,6 +1046,7 @@ class Parser(object):
             p[0] = ast.FloatValue(float(p[1][:-1]))
         else:
             p[0] = ast.DoubleValue(float(p[1]))
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -831,6 +1055,7 @@ class Parser(object):
         string_val : STRING_VAL
         """
         p[0] = ast.StringValue(p[1])
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -863,6 +1088,7 @@ class Parser(object):
         """
         type_class = getattr(ast, p[1])
         p[0] = type_class()
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -884,6 +1110,8 @@ class Parser(object):
         """
         type_class = getattr(ast, p[1])
         p[0] = ast.Array(name=None, element_type=type_class())
+        Parser._track(p)
+        Parser._track(p, p[0].type, 1)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -892,6 +1120,8 @@ class Parser(object):
         type : fqn
         """
         p[0] = ast.Reference(name=p[1])
+        Parser._locate(p, p[0], 1)
+        Parser._track(p)
 
     # noinspection PyIncorrectDocstring
     @staticmethod
@@ -900,7 +1130,10 @@ class Parser(object):
         type : fqn '[' ']'
         """
         element_type = ast.Reference(name=p[1])
+        Parser._locate(p, element_type, 1)
+        Parser._track(p, element_type, 1)
         p[0] = ast.Array(name=None, element_type=element_type)
+        Parser._track(p)
 
     # noinspection PyUnusedLocal, PyIncorrectDocstring
     @staticmethod
@@ -911,13 +1144,61 @@ class Parser(object):
         pass
 
     # noinspection PyIncorrectDocstring
-    @staticmethod
-    def p_error(p):
+    def p_error(self, p):
         if p:
-            raise ParserException("Syntax error at line {} near '{}'.".format(
-                                  p.lineno, p.value))
+            message = "Syntax error at line {} near '{}'.".format(
+                p.lineno, p.value)
+            error = self._error(message, p.lexpos)
         else:
-            raise ParserException("Reached unexpected end of file.")
+            message = "Reached unexpected end of file."
+            error = self._error(message, self._lexer.lexer.lexpos)
+        errors = self._errors
+        if errors is None:
+            raise error
+        errors.append(franca_lexer.SourceError(
+            message, lineno=error.lineno, column=error.column,
+            lexpos=error.lexpos))
+        if len(errors) >= self._max_errors:
+            raise error
+        if p:
+            self._synchronize(p)
+
+    def _error(self, message, lexpos):
+        """
+        Create an exception located at an offset of the current input.
+        """
+        lineno, column = franca_lexer.position(self._lexer.lexer, lexpos)
+        return ParserException(message, lineno=lineno, column=column,
+                               lexpos=lexpos)
+
+    def _synchronize(self, token):
+        """
+        Skip tokens after a syntax error up to the next namespace member or
+        top-level definition, on the block level the error occurred in or
+        an enclosing one. The error productions of the grammar resume
+        parsing there.
+
+        :param token: Token the error occurred at.
+        """
+        level = sum(1 for symbol in self._parser.symstack
+                    if symbol.type == "{")
+        current = token
+        while current is not None:
+            kind = current.type
+            if level < len(self._SYNC_TOKENS) and \
+                    kind in self._SYNC_TOKENS[level]:
+                break
+            if kind == "{":
+                level += 1
+            elif kind == "}" and level > 0:
+                level -= 1
+            if current is token:
+                # The parser reads the token again after the error, make
+                #   sure it is discarded.
+                token.type = "$skipped"
+            current = self._source.token()
+        if current is not None and current is not token:
+            self._source.push(current)
 
     def __init__(self, the_lexer=None, **kwargs):
         """
@@ -928,34 +1209,118 @@ class Parser(object):
         if not the_lexer:
             the_lexer = franca_lexer.Lexer()
         self._lexer = the_lexer
-        self.tokens = self._lexer.tokens
+        self.tokens = [token for token in self._lexer.tokens
+                       if token not in self._lexer.comment_tokens]
         # Disable debugging, by default.
         if "debug" not in kwargs:
             kwargs["debug"] = False
         if "write_tables" not in kwargs:
             kwargs["write_tables"] = False
         self._parser = yacc.yacc(module=self, **kwargs)
+        # Error recovery state of the current parse.
+        self._errors = None
+        self._max_errors = 0
+        self._source = None
 
-    def parse(self, fidl):
+    def parse(self, fidl, lossless=False, max_errors=None):
         """
         Parse input text
 
         :param fidl: Input text to parse.
+        :param lossless: Record the offsets of all nodes, tokens and
+            comments in an ast.SourceMap, stored in the source_maps of the
+            package.
+        :param max_errors: Recover from illegal characters and syntax
+            errors, collecting up to this number of errors, instead of
+            stopping at the first one. Errors raised by semantic checks
+            end the parse.
         :return: AST representation of the input.
+        :raises ParserException: With the collected franca_lexer.SourceError
+            objects in its errors attribute, if errors were found with error
+            recovery.
+        """
+        # Reset the line counter, the lexer may be reused across inputs.
+        self._lexer.lexer.lineno = 1
+        source_map = None
+        lexer = self._lexer.lexer
+        if lossless:
+            source_map = ast.SourceMap(fidl)
+            lexer = self._lexer.recorder(source_map)
+        try:
+            if max_errors is None:
+                try:
+                    package = self._parser.parse(fidl, lexer=lexer,
+                                                 tracking=lossless)
+                except ParserException as e:
+                    if e.lineno is None:
+                        # Errors of semantic checks, located at the last
+                        #   token read.
+                        raise self._error(e.message,
+                                          self._lexer.lexer.lexpos)
+                    raise
+            else:
+                package = self._recover(fidl, lexer, lossless, max_errors)
+        finally:
+            # The parser stacks would keep the last model alive.
+            self._parser.statestack = None
+            self._parser.symstack = None
+        if package and lossless:
+            package.source_maps = (source_map,)
+        return package
+
+    def _recover(self, fidl, lexer, lossless, max_errors):
+        """
+        Parse input text with error recovery.
         """
-        package = self._parser.parse(fidl)
+        errors = []
+        self._errors = errors
+        self._max_errors = max(max_errors, 1)
+        self._source = _RecoveringLexer(lexer)
+        self._lexer.lexer.errors = errors
+        self._lexer.lexer.max_errors = self._max_errors
+        try:
+            package = self._parser.parse(fidl, lexer=self._source,
+                                         tracking=lossless)
+        except (franca_lexer.LexerException, ParserException) as e:
+            # Errors of semantic checks have not been collected yet.
+            if len(errors) < self._max_errors:
+                error = self._error(e.message, self._lexer.lexer.lexpos)
+                errors.append(franca_lexer.SourceError(
+                    e.message, lineno=error.lineno, column=error.column,
+                    lexpos=error.lexpos))
+            package = None
+        finally:
+            self._errors = None
+            self._source = None
+            self._lexer.lexer.errors = None
+        if errors:
+            first = errors[0]
+            raise ParserException(
+                "\n".join(error.message for error in errors), errors,
+                lineno=first.lineno, column=first.column,
+                lexpos=first.lexpos)
         return package
 
-    def parse_file(self, fspec):
+    def parse_file(self, fspec, lossless=False, max_errors=None):
         """
         Parse input file
 
         :param fspec: Specification of a fidl to parse.
+        :param lossless: See parse().
+        :param max_errors: See parse().
         :return: AST representation of the input.
         """
         with open(fspec, "r") as f:
             fidl = f.read()
-        package = self.parse(fidl)
+        try:
+            package = self.parse(fidl, lossless, max_errors)
+        except (franca_lexer.LexerException, ParserException) as e:
+            e.file = fspec
+            for error in getattr(e, "errors", ()):
+                error.file = fspec
+            raise
         if package:
             package.files = [fspec]
+            for source_map in package.source_maps:
+                source_map.file = fspec
         return package
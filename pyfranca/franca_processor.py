@@ -1,22 +1,317 @@
 
 import os
-from collections import OrderedDict
-from pyfranca import franca_parser, ast
+import copy
+import gc
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from io import BytesIO
+import pyfranca
+from pyfranca import franca_lexer, franca_parser, franca_walker, ast
 
 
 class ProcessorException(Exception):
 
-    def __init__(self, message):
+    def __init__(self, message, file_name=None, lineno=None, column=None,
+                 lexpos=None):
         super(ProcessorException, self).__init__()
         self.message = message
+        # Location of the error, if known.
+        self.file = file_name
+        self.lineno = lineno
+        self.column = column
+        self.lexpos = lexpos
 
     def __str__(self):
         return self.message
 
 
+class ParseCache(object):
+    """
+    Cache of parsed, not yet linked packages keyed by file content.
+
+    The processor resolves references in place, so the cache keeps pickled
+    copies of the packages as they were returned by the parser. A cache can
+    be shared by several processors, e.g. by a long-running server.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # Maps absolute file specifications to (digest, pickled package).
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(data):
+        """
+        Compute the content digest of a model.
+
+        :param data: Model text.
+        :return: Hexadecimal digest string.
+        """
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        return hashlib.sha1(data).hexdigest()
+
+    def get(self, fspec, digest):
+        """
+        Get a fresh copy of a cached package.
+
+        :param fspec: Absolute file specification.
+        :param digest: Digest of the current file content.
+        :return: ast.Package object or None if not cached or outdated.
+        """
+        entry = self._entries.get(fspec)
+        if entry is None or entry[0] != digest:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(entry[1])
+
+    def put(self, fspec, digest, package):
+        """
+        Store a parsed package. Must be called before the package is linked.
+
+        :param fspec: Absolute file specification.
+        :param digest: Digest of the file content.
+        :param package: ast.Package object.
+        """
+        self._entries[fspec] = (
+            digest, pickle.dumps(package, pickle.HIGHEST_PROTOCOL))
+
+    def discard(self, fspec):
+        """
+        Remove a file from the cache.
+
+        :param fspec: Absolute file specification.
+        """
+        self._entries.pop(fspec, None)
+
+    def __contains__(self, fspec):
+        return fspec in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Usage(object):
+    """
+    A use of a type or an interface by another model element.
+    """
+
+    FIELD = "field"
+    ARGUMENT = "argument"
+    ATTRIBUTE = "attribute"
+    TYPEDEF = "typedef"
+    ELEMENT = "element"
+    KEY = "key"
+    VALUE = "value"
+    CONSTANT = "constant"
+    EXTENDS = "extends"
+    ERROR = "error"
+
+    def __init__(self, item, owner, kind):
+        """
+        Constructor.
+
+        :param item: Element holding the reference, e.g. an ast.StructField.
+        :param owner: Namespace member or namespace declaring the item,
+            e.g. the ast.Struct of a field.
+        :param kind: Kind of use.
+        """
+        self.item = item
+        self.owner = owner
+        self.kind = kind
+
+    def __repr__(self):
+        return "Usage({}, {}, {})".format(
+            self.item.name, self.owner.name, self.kind)
+
+
+class ReadWriteLock(object):
+    """
+    Lock shared by readers and held exclusively by a single writer.
+
+    Waiting writers take precedence over new readers. Read locks are
+    re-entrant, and a thread holding the write lock may also read.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def held(self):
+        """
+        Check whether the current thread holds the lock.
+        """
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def reading(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._condition:
+                while self._writing or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        # Reads of the writer do not wait for the lock.
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class _CollectorPause(object):
+    """
+    Suspension of the automatic garbage collection, shared by nested and
+    concurrent bulk loads of all processors.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self._enabled = False
+
+    def enter(self):
+        with self._lock:
+            if not self._count:
+                self._enabled = gc.isenabled()
+                gc.disable()
+            self._count += 1
+
+    def exit(self):
+        """
+        :return: Whether the last bulk load exited.
+        """
+        with self._lock:
+            self._count -= 1
+            if self._count:
+                return False
+            if self._enabled:
+                gc.enable()
+            return True
+
+
+_collector_pause = _CollectorPause()
+
+
+# Version of the model artifact layout written by Processor.save().
+_ARTIFACT_FORMAT = 1
+
+
+class _ArtifactPickler(pickle.Pickler):
+    """
+    Pickler of a group of packages, writing the nodes of other packages as
+    (package name, export index) persistent IDs.
+    """
+
+    def __init__(self, group, owners, exports, indexes):
+        """
+        :param group: Names of the pickled packages.
+        :param owners: Maps node IDs to package names.
+        :param exports: Maps package names to lists of their nodes referred
+            to by other packages, extended by the pickler.
+        :param indexes: Maps IDs of exported nodes to export indexes,
+            extended by the pickler.
+        """
+        self.stream = BytesIO()
+        pickle.Pickler.__init__(self, self.stream, pickle.HIGHEST_PROTOCOL)
+        self.group = group
+        self._owners = owners
+        self._exports = exports
+        self._indexes = indexes
+        # Names of the other packages referred to.
+        self.dependencies = set()
+
+    def persistent_id(self, obj):
+        name = self._owners.get(id(obj))
+        if name is None or name in self.group:
+            return None
+        index = self._indexes.get(id(obj))
+        if index is None:
+            exported = self._exports.setdefault(name, [])
+            index = self._indexes[id(obj)] = len(exported)
+            exported.append(obj)
+        self.dependencies.add(name)
+        return name, index
+
+
+class _ArtifactUnpickler(pickle.Unpickler):
+    """
+    Unpickler of a group of packages, loading the packages referred to from
+    the artifact of the processor first.
+    """
+
+    def __init__(self, stream, processor):
+        pickle.Unpickler.__init__(self, stream)
+        self._processor = processor
+
+    def persistent_load(self, pid):
+        name, index = pid
+        return self._processor._artifact_node(name, index)
+
+
 class Processor(object):
     """
     Franca IDL processor.
+
+    Imports may run in one thread while others query the processor.
+    Imports are serialized. Packages are parsed and linked without blocking
+    readers, and published to files, packages and usages under a short
+    write lock, so readers holding processor.reading() never see a
+    partially linked package. The query methods take the read lock
+    themselves, direct access to the processor attributes and to the
+    packages must be wrapped::
+
+        with processor.reading():
+            package = processor.packages.get("org.example")
+
+    Long-running services may bound the number of loaded packages with
+    max_packages. Least recently used packages not imported by another
+    loaded package are then evicted after each import, and loaded again
+    by get_package() or import_file(), from the parse cache if set. Only
+    loading an evicted package makes get_package() wait for an import in
+    progress.
+
+    The linked state may be saved to a model artifact and loaded into
+    another processor without parsing or linking, e.g. to start code
+    generators from a model built once::
+
+        processor.save("model.pfa")
+        processor = Processor()
+        processor.load("model.pfa")
     """
 
     def __init__(self):
@@ -29,8 +324,150 @@ class Processor(object):
         self.files = {}
         # Maps package names to package AST objects.
         self.packages = {}
-        # List of imported string file specifications
-        self._string_files = []
+        # Maps string file specifications to model text.
+        self._string_files = {}
+        # Maps absolute file specifications to content digests.
+        self.file_digests = {}
+        # Maps absolute file specifications to ast.LineIndex objects, for
+        #   locating errors.
+        self.line_indexes = {}
+        # Parser shared by all imports. Created on first use.
+        self.parser = None
+        # Lock serializing the use of the parser, shared with forks.
+        self._parser_lock = threading.Lock()
+        # Optional ParseCache to reuse packages of unchanged files.
+        self.parse_cache = None
+        # Parse in lossless mode, recording source offsets.
+        self.lossless = False
+        # Recover from syntax errors, collecting up to this number of errors
+        #   per file. Stop at the first error if None.
+        self.max_errors = None
+        # Maps types and interfaces to lists of Usage objects.
+        self.usages = {}
+        # Usages found while linking a package, committed on registration.
+        self._new_usages = None
+        # Maps (type or interface, member kind) to flattened member views.
+        self._views = {}
+        # Targets of usage lists and names of packages owned by this
+        #   processor, None if all are. The other ones are shared with forks
+        #   and copied before being modified.
+        self._owned_usages = None
+        self._owned_packages = None
+        # Maps names of packages copied from a fork to the original package
+        #   objects, which the shared namespaces still refer to.
+        self._original_packages = {}
+        # Store the references of linked nodes to nodes they do not own as
+        #   weak references, see ast.weaken().
+        self.weak_references = False
+        # Evict the least recently used packages not imported by another
+        #   package when more are loaded. Unbounded if None.
+        self.max_packages = None
+        # Package names in order of use, least recent first.
+        self._recent = OrderedDict()
+        # Maps package names to the names of the packages importing them.
+        self._importers = {}
+        # Maps names of evicted packages and of packages of the model
+        #   artifact not loaded yet to their files not loaded.
+        self._evicted = {}
+        # Model artifact loaded by load(), see save().
+        self._artifact = None
+        # Maps names of packages loaded from the model artifact to their
+        #   nodes referred to by other packages of the artifact.
+        self._artifact_nodes = {}
+        # Numbers of file imports finding the file loaded or not, and of
+        #   evicted packages.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Lock protecting the use order and the hits counter, updated by
+        #   concurrent readers of get_package().
+        self._recent_lock = threading.Lock()
+        # Lock protecting the published state from concurrent readers.
+        self.lock = ReadWriteLock()
+        # Lock serializing imports.
+        self._import_lock = threading.RLock()
+
+    def reading(self):
+        """
+        Get a context manager holding the read lock, deferring the
+        publication of imported packages.
+
+        Holders of the read lock must not import, see get_package().
+        """
+        return self.lock.reading()
+
+    @contextmanager
+    def bulk_load(self, freeze=True):
+        """
+        Get a context manager suspending the automatic garbage collection
+        while importing, e.g. a large model::
+
+            with processor.bulk_load():
+                processor.import_file("model.fidl")
+
+        When the last bulk load exits, garbage is collected once. With
+        freeze, all objects tracked by the collector, including the loaded
+        models, are then moved to the permanent generation, which later
+        collections skip (Python 3.7 or later). Frozen models with reference
+        cycles are not freed when dropped unless gc.unfreeze() is called,
+        unlike models linked with weak_references.
+
+        :param freeze: Whether to freeze the loaded models.
+        """
+        _collector_pause.enter()
+        try:
+            yield self
+        finally:
+            if _collector_pause.exit():
+                gc.collect()
+                if freeze and hasattr(gc, "freeze"):
+                    gc.freeze()
+
+    def fork(self):
+        """
+        Create a processor sharing the imported packages of this one, e.g.
+        to import different overlay files into a common base model.
+
+        Nothing is parsed or linked again. Both processors refer to the same
+        AST objects, and a package or a usage list is copied only when an
+        import into either processor modifies it, so the cost of a fork
+        grows with the files imported into it. Namespaces of a shared
+        package keep referring to the package object they were imported
+        into, which may be a copy in the other processor.
+
+        :return: Processor object.
+        """
+        with self._import_lock:
+            fork = Processor()
+            fork.package_paths = list(self.package_paths)
+            fork.files = dict(self.files)
+            fork.packages = dict(self.packages)
+            fork._string_files = dict(self._string_files)
+            fork.file_digests = dict(self.file_digests)
+            fork.line_indexes = dict(self.line_indexes)
+            fork.parser = self.parser
+            fork._parser_lock = self._parser_lock
+            fork.parse_cache = self.parse_cache
+            fork.lossless = self.lossless
+            fork.max_errors = self.max_errors
+            fork.weak_references = self.weak_references
+            fork._original_packages = dict(self._original_packages)
+            fork.usages = dict(self.usages)
+            fork._views = dict(self._views)
+            fork.max_packages = self.max_packages
+            with self._recent_lock:
+                fork._recent = OrderedDict(self._recent)
+            fork._importers = dict((name, set(importers)) for
+                                   name, importers in self._importers.items())
+            fork._evicted = dict((name, list(files)) for
+                                 name, files in self._evicted.items())
+            fork._artifact = self._artifact
+            fork._artifact_nodes = dict(self._artifact_nodes)
+            # Everything published so far is shared now.
+            for processor in (self, fork):
+                processor._owned_usages = set()
+                processor._owned_packages = set()
+        return fork
 
     @staticmethod
     def basename(namespace):
@@ -168,11 +605,12 @@ class Processor(object):
         raise ProcessorException(
             "Unresolved namespace reference '{}'.".format(fqn))
 
-    def _update_complextype_references(self, name):
+    def _update_complextype_references(self, name, usage=None):
         """
         Update type references in a complex type.
 
         :param name: ast.ComplexType object.
+        :param usage: Usage of the types referenced by an implicit array.
         """
         if isinstance(name, ast.Enumeration):
             if name.extends:
@@ -181,50 +619,68 @@ class Processor(object):
                     raise ProcessorException(
                         "Invalid enumeration reference '{}'.".format(
                             name.extends))
+                self._add_usage(name.reference,
+                                Usage(name, name, Usage.EXTENDS))
         elif isinstance(name, ast.Struct):
             for field in name.fields.values():
-                self._update_type_references(name.namespace, field.type)
+                self._update_type_references(name.namespace, field.type,
+                                             Usage(field, name, Usage.FIELD))
             if name.extends:
                 name.reference = self.resolve(name.namespace, name.extends)
                 if not isinstance(name.reference, ast.Struct):
                     raise ProcessorException(
                         "Invalid struct reference '{}'.".format(
                             name.extends))
+                self._add_usage(name.reference,
+                                Usage(name, name, Usage.EXTENDS))
         elif isinstance(name, ast.Union):
             for field in name.fields.values():
-                self._update_type_references(name.namespace, field.type)
+                self._update_type_references(name.namespace, field.type,
+                                             Usage(field, name, Usage.FIELD))
             if name.extends:
                 name.reference = self.resolve(name.namespace, name.extends)
                 if not isinstance(name.reference, ast.Union):
                     raise ProcessorException(
                         "Invalid union reference '{}'.".format(
                             name.extends))
+                self._add_usage(name.reference,
+                                Usage(name, name, Usage.EXTENDS))
         elif isinstance(name, ast.Array):
-            self._update_type_references(name.namespace, name.type)
+            if name.name is not None:
+                usage = Usage(name, name, Usage.ELEMENT)
+            self._update_type_references(name.namespace, name.type, usage)
         elif isinstance(name, ast.Map):
-            self._update_type_references(name.namespace, name.key_type)
-            self._update_type_references(name.namespace, name.value_type)
+            self._update_type_references(name.namespace, name.key_type,
+                                         Usage(name, name, Usage.KEY))
+            self._update_type_references(name.namespace, name.value_type,
+                                         Usage(name, name, Usage.VALUE))
         elif isinstance(name, ast.Constant):
-            self._update_type_references(name.namespace, name.type)
+            self._update_type_references(name.namespace, name.type,
+                                         Usage(name, name, Usage.CONSTANT))
         else:
             assert False
 
-    def _update_type_references(self, namespace, name):
+    def _update_type_references(self, namespace, name, usage=None):
         """
         Update type references in a type.
 
         :param namespace: ast.Namespace context.
         :param name: ast.Type object.
+        :param usage: Usage of the type, recorded for resolved references.
         """
         if isinstance(name, ast.Typedef):
-            self._update_type_references(name.namespace, name.type)
+            self._update_type_references(name.namespace, name.type,
+                                         Usage(name, name, Usage.TYPEDEF))
         elif isinstance(name, ast.PrimitiveType):
             pass
         elif isinstance(name, ast.ComplexType):
-            self._update_complextype_references(name)
+            self._update_complextype_references(name, usage)
         elif isinstance(name, ast.Reference):
             if not name.reference:
-                resolved_name = self.resolve(namespace, name.name)
+                try:
+                    resolved_name = self.resolve(namespace, name.name)
+                except ProcessorException as e:
+                    raise self._locate(e, name, namespace.file)
                 name.reference = resolved_name
                 name.namespace = resolved_name.namespace
 
@@ -232,18 +688,26 @@ class Processor(object):
                 # it is not necessary anymore -> information is preserved in the reference
                 pkg, ns, type_name = Processor.split_fqn(name.name)
                 name.name = type_name
+                if usage is not None:
+                    self._add_usage(resolved_name, usage)
         elif isinstance(name, ast.Attribute):
-            self._update_type_references(name.namespace, name.type)
+            self._update_type_references(name.namespace, name.type,
+                                         Usage(name, name, Usage.ATTRIBUTE))
         elif isinstance(name, ast.Method):
             for arg in name.in_args.values():
-                self._update_type_references(name.namespace, arg.type)
+                self._update_type_references(
+                    name.namespace, arg.type,
+                    Usage(arg, name, Usage.ARGUMENT))
             for arg in name.out_args.values():
-                self._update_type_references(name.namespace, arg.type)
+                self._update_type_references(
+                    name.namespace, arg.type,
+                    Usage(arg, name, Usage.ARGUMENT))
             if isinstance(name.errors, OrderedDict):
                 pass
             elif isinstance(name.errors, ast.Reference):
                 # Errors can be a reference to an enumeration
-                self._update_type_references(name.namespace, name.errors)
+                self._update_type_references(name.namespace, name.errors,
+                                             Usage(name, name, Usage.ERROR))
                 if not isinstance(name.errors.reference, ast.Enumeration):
                     raise ProcessorException(
                         "Invalid error reference '{}'.".format(
@@ -252,10 +716,24 @@ class Processor(object):
                 assert False
         elif isinstance(name, ast.Broadcast):
             for arg in name.out_args.values():
-                self._update_type_references(name.namespace, arg.type)
+                self._update_type_references(
+                    name.namespace, arg.type,
+                    Usage(arg, name, Usage.ARGUMENT))
         else:
             assert False
 
+    def _update_member_references(self, namespace, name):
+        """
+        Update type references in a namespace member.
+
+        :param namespace: ast.Namespace object.
+        :param name: ast.Type object.
+        """
+        try:
+            self._update_type_references(namespace, name)
+        except ProcessorException as e:
+            raise self._locate(e, name, namespace.file)
+
     def _update_namespace_references(self, namespace):
         """
         Update type references in a namespace.
@@ -263,19 +741,19 @@ class Processor(object):
         :param namespace: ast.Namespace object.
         """
         for name in namespace.typedefs.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.enumerations.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.structs.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.unions.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.arrays.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.maps.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.constants.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
 
     def _update_interface_references(self, namespace):
         """
@@ -285,18 +763,23 @@ class Processor(object):
         """
         self._update_namespace_references(namespace)
         for name in namespace.attributes.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.methods.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         for name in namespace.broadcasts.values():
-            self._update_type_references(namespace, name)
+            self._update_member_references(namespace, name)
         if namespace.extends:
-            namespace.reference = self.resolve_namespace(
-                namespace.package, namespace.extends)
+            try:
+                namespace.reference = self.resolve_namespace(
+                    namespace.package, namespace.extends)
+            except ProcessorException as e:
+                raise self._locate(e, namespace, namespace.file)
             if not isinstance(namespace.reference, ast.Interface):
-                raise ProcessorException(
+                raise self._locate(ProcessorException(
                     "Invalid interface reference '{}'.".format(
-                        namespace.extends))
+                        namespace.extends)), namespace, namespace.file)
+            self._add_usage(namespace.reference,
+                            Usage(namespace, namespace, Usage.EXTENDS))
 
     def _update_imported_namespaces_references(self, package, imported_namespace):
         for package_namespace in package.typecollections.values():
@@ -393,6 +876,15 @@ class Processor(object):
         :param package: ast.Package object.
         :param references: A list of package references.
         """
+        with self._import_lock:
+            self._import_package(fspec, package, references)
+            if not references:
+                self._evict(package.name)
+
+    def _import_package(self, fspec, package, references):
+        """
+        Link a package and register it, see import_package().
+        """
         # Check whether package is already imported
         abs_fspec = os.path.abspath(fspec)
 
@@ -409,34 +901,526 @@ class Processor(object):
         # in order to determine which fspec is already processed.
         fspec_dir = os.path.dirname(abs_fspec)
         for package_import in package.imports:
-            imported_package = self.import_file(
-                package_import.file, references + [abs_fspec], fspec_dir)
-            self._update_package_references(package, imported_package, package_import)
+            try:
+                imported_package = self.import_file(
+                    package_import.file, references + [abs_fspec], fspec_dir)
+                self._update_package_references(package, imported_package, package_import)
+            except ProcessorException as e:
+                raise self._locate(e, package_import, abs_fspec)
+
+        for namespace in list(package.typecollections.values()) + \
+                list(package.interfaces.values()):
+            namespace.file = abs_fspec
 
         self._update_namespaces_references(package)
 
-        for namespace in package.typecollections:
-            self._update_namespace_references(
-                package.typecollections[namespace])
-        for namespace in package.interfaces:
-            self._update_interface_references(
-                package.interfaces[namespace])
+        new_usages = []
+        self._new_usages = new_usages
+        try:
+            for namespace in package.typecollections:
+                self._update_namespace_references(
+                    package.typecollections[namespace])
+            for namespace in package.interfaces:
+                self._update_interface_references(
+                    package.interfaces[namespace])
+            self._update_inheritance(package)
+        finally:
+            self._new_usages = None
+
+        with self.lock.writing():
+            self._register_package(abs_fspec, package, new_usages)
+
+    def _register_package(self, abs_fspec, package, new_usages):
+        """
+        Publish a linked package and its usages to readers.
 
+        :param abs_fspec: Absolute file specification of the package.
+        :param package: Linked ast.Package object.
+        :param new_usages: List of (target, Usage) tuples.
+        """
+        linked = package
         if package.name in self.packages:
             if abs_fspec not in self.packages[package.name].files:
                 # Merge the new package into the already existing one.
-                self.packages[package.name] += package
+                existing = self._own_package(package.name)
+                self._invalidate_inheritance(existing)
+                existing += package
                 # Register the package file in the processor.
-                self.files[abs_fspec] = self.packages[package.name]
-                package = self.packages[package.name]
+                self.files[abs_fspec] = existing
+                package = existing
             else:
                 return
         else:
             # Register the package in the processor.
             self.packages[package.name] = package
+            if self._owned_packages is not None:
+                self._owned_packages.add(package.name)
             # Register the package file in the processor.
             self.files[abs_fspec] = package
 
+        for target, usage in new_usages:
+            self._append_usage(target, usage)
+
+        self._track_imports(package)
+        evicted = self._evicted.get(package.name)
+        if evicted is not None:
+            if abs_fspec in evicted:
+                evicted.remove(abs_fspec)
+            if not evicted:
+                del self._evicted[package.name]
+        self._touch(package.name)
+        if self.weak_references:
+            self._weaken(linked)
+
+    def _track_imports(self, package):
+        """
+        Record a registered package as importer of the packages it imports.
+
+        :param package: Registered ast.Package object.
+        """
+        for package_import in package.imports:
+            imported = package_import.package_reference
+            if imported is not None and imported.name != package.name:
+                self._importers.setdefault(imported.name, set()).add(
+                    package.name)
+
+    def _weaken(self, package):
+        """
+        Turn the references of the nodes of a linked package to nodes they
+        do not own into weak references.
+
+        :param package: Registered ast.Package object, or the package of a
+            file merged into it.
+        """
+        refs = {}
+        for node in franca_walker.walk(package):
+            if isinstance(node, ast.Import):
+                imported = node.package_reference
+                ast.weaken(node, refs)
+                if imported is not None and \
+                        self.packages.get(imported.name) is not imported:
+                    # Packages merged into others or not registered because
+                    #   of a circular import are only referenced here.
+                    node.package_reference = imported
+            else:
+                ast.weaken(node, refs)
+
+    def _touch(self, name):
+        """
+        Mark a package as most recently used.
+
+        :param name: Package name.
+        """
+        with self._recent_lock:
+            self._recent.pop(name, None)
+            self._recent[name] = None
+
+    def _evict(self, keep):
+        """
+        Evict least recently used packages until at most max_packages are
+        loaded. Packages imported by other loaded packages are kept, so the
+        bound may be exceeded.
+
+        :param keep: Name of a package not to evict.
+        """
+        if self.max_packages is None:
+            return
+        with self.lock.writing():
+            while len(self.packages) > self.max_packages:
+                for name in self._recent:
+                    if name != keep and not self._importers.get(name):
+                        self._evict_package(name)
+                        break
+                else:
+                    break
+
+    def _evict_package(self, name):
+        """
+        Unregister a package not imported by any other loaded package,
+        loading it again on demand, see get_package().
+
+        :param name: Package name.
+        """
+        package = self._unregister_package(name)
+        self._evicted.setdefault(name, []).extend(package.files)
+        self.evictions += 1
+
+    def _unregister_package(self, name):
+        """
+        Unregister a package not imported by any other loaded package.
+
+        The AST objects stay valid for holders of references, but are no
+        longer indexed by the processor.
+
+        :param name: Package name.
+        :return: The unregistered ast.Package object.
+        """
+        package = self.packages.pop(name)
+        self._recent.pop(name, None)
+        self._original_packages.pop(name, None)
+        self._importers.pop(name, None)
+        self._artifact_nodes.pop(name, None)
+        self._invalidate_inheritance(package)
+        kinds = (ast.Type, ast.Interface)
+        for item in franca_walker.walk(package, kinds):
+            self.usages.pop(item, None)
+        # Drop the usages of imported packages by the evicted package.
+        imported = set(package_import.package_reference.name for
+                       package_import in package.imports if
+                       package_import.package_reference is not None)
+        imported.discard(name)
+        for imported_name in imported:
+            importers = self._importers.get(imported_name)
+            if importers is not None:
+                importers.discard(name)
+            if imported_name not in self.packages:
+                # Unregistered before, within an import cycle.
+                continue
+            for item in franca_walker.walk(self.packages[imported_name],
+                                           kinds):
+                usages = self.usages.get(item)
+                if usages:
+                    self.usages[item] = [
+                        usage for usage in usages
+                        if self._usage_package(usage) != name]
+                    if self._owned_usages is not None:
+                        self._owned_usages.add(item)
+        for fspec in package.files:
+            self.files.pop(fspec, None)
+            self.file_digests.pop(fspec, None)
+            self.line_indexes.pop(fspec, None)
+        return package
+
+    def unload(self, fspecs):
+        """
+        Unregister the packages of files and, transitively, the packages
+        importing them, e.g. to import changed files again while keeping
+        the other packages linked.
+
+        :param fspecs: File specifications.
+        :return: Set of the absolute file specifications of the unloaded
+            packages.
+        """
+        with self._import_lock:
+            names = set()
+            pending = [self.files[fspec].name for fspec in
+                       (os.path.abspath(fspec) for fspec in fspecs)
+                       if fspec in self.files]
+            while pending:
+                name = pending.pop()
+                if name not in names:
+                    names.add(name)
+                    pending.extend(self._importers.get(name, ()))
+            unloaded = set()
+            with self.lock.writing():
+                while names:
+                    # Unregister importers before the packages they import.
+                    name = min(names, key=lambda n: (
+                        bool(self._importers.get(n)), n))
+                    names.remove(name)
+                    unloaded.update(self._unregister_package(name).files)
+            return unloaded
+
+    @staticmethod
+    def _usage_package(usage):
+        """
+        Get the name of the package a usage belongs to.
+
+        :param usage: Usage object.
+        :return: Package name.
+        """
+        owner = usage.owner
+        if not isinstance(owner, ast.Namespace):
+            owner = owner.namespace
+        return owner.package.name
+
+    def get_package(self, name):
+        """
+        Get a package by name, loading the files of an evicted package
+        again. Loaded packages are returned under the read lock, only
+        loading waits for an import in progress.
+
+        Loading publishes the package under the write lock, so an evicted
+        or lazily loaded package cannot be loaded by a thread holding the
+        lock, e.g. within reading(). Get the packages before reading.
+
+        :param name: Package name.
+        :return: ast.Package object or None if the package is not known.
+        :raises ProcessorException: If the package must be loaded while the
+            current thread holds the lock.
+        """
+        with self.lock.reading():
+            package = self.packages.get(name)
+            if package is not None and name not in self._evicted:
+                with self._recent_lock:
+                    self.hits += 1
+                self._touch(name)
+                return package
+            if name not in self._evicted:
+                return None
+        if self.lock.held():
+            raise ProcessorException(
+                "Package '{}' cannot be loaded while holding the processor "
+                "lock.".format(name))
+        with self._import_lock:
+            if name not in self._evicted:
+                # Loaded by a concurrent import.
+                return self.packages.get(name)
+            for fspec in list(self._evicted[name]):
+                self.import_file(fspec)
+            return self.packages[name]
+
+    def _own_package(self, name):
+        """
+        Get a registered package for modification, copying it if it is
+        shared with a fork.
+
+        :param name: Package name.
+        :return: ast.Package object owned by this processor.
+        """
+        package = self.packages[name]
+        if self._owned_packages is None or name in self._owned_packages:
+            return package
+        self._original_packages.setdefault(name, package)
+        package = copy.copy(package)
+        package.files = list(package.files)
+        package.imports = list(package.imports)
+        package.interfaces = OrderedDict(package.interfaces)
+        package.typecollections = OrderedDict(package.typecollections)
+        package.fingerprints = {}
+        self.packages[name] = package
+        for fspec in package.files:
+            self.files[fspec] = package
+        self._owned_packages.add(name)
+        return package
+
+    def _append_usage(self, target, usage):
+        """
+        Append a usage to the list of a target, copying the list if it is
+        shared with a fork.
+
+        :param target: Referenced ast.Type or ast.Interface object.
+        :param usage: Usage object.
+        """
+        usages = self.usages.get(target)
+        if usages is None or (self._owned_usages is not None and
+                              target not in self._owned_usages):
+            usages = list(usages) if usages else []
+            self.usages[target] = usages
+            if self._owned_usages is not None:
+                self._owned_usages.add(target)
+        usages.append(usage)
+
+    def _locate(self, error, node, fspec):
+        """
+        Add the location of a node to an exception, unless it is located
+        already.
+
+        :param error: ProcessorException object.
+        :param node: AST node the error was found at.
+        :param fspec: Absolute file specification of the node.
+        :return: The exception.
+        """
+        if error.file is None:
+            error.file = fspec
+            error.lineno = getattr(node, "lineno", None)
+            span = getattr(node, "span", None)
+            line_index = self.line_indexes.get(fspec)
+            if span is not None and line_index is not None:
+                error.lexpos = span[0]
+                error.lineno, error.column = line_index.position(span[0])
+        return error
+
+    def _add_usage(self, target, usage):
+        """
+        Record the use of a type or an interface.
+
+        :param target: Referenced ast.Type or ast.Interface object.
+        :param usage: Usage object.
+        """
+        if self._new_usages is not None:
+            self._new_usages.append((target, usage))
+        else:
+            self._append_usage(target, usage)
+
+    # Members inherited through "extends" for each extensible AST class.
+    _INHERITED_MEMBERS = (
+        (ast.Struct, ("fields",)),
+        (ast.Union, ("fields",)),
+        (ast.Enumeration, ("enumerators",)),
+        (ast.Interface, ("attributes", "methods", "broadcasts")),
+    )
+
+    def _flatten(self, item, members, visiting=None):
+        """
+        Get the members of an item including the inherited ones.
+
+        :param item: ast.Struct, ast.Union, ast.Enumeration or ast.Interface.
+        :param members: Name of the member dictionary attribute.
+        :param visiting: Set of items on the current extension chain.
+        :return: OrderedDict of members, base members first.
+        """
+        key = (item, members)
+        view = self._views.get(key)
+        if view is None:
+            if visiting is None:
+                visiting = set()
+            elif item in visiting:
+                raise ProcessorException(
+                    "Circular {} extension '{}'.".format(
+                        item.__class__.__name__.lower(), item.name))
+            visiting.add(item)
+            view = OrderedDict()
+            if item.reference is not None:
+                view.update(self._flatten(item.reference, members, visiting))
+            view.update(getattr(item, members))
+            visiting.discard(item)
+            self._views[key] = view
+        return view
+
+    def _update_inheritance(self, package):
+        """
+        Compute the flattened member views of a package and check for
+        circular extensions.
+
+        :param package: Linked ast.Package object.
+        """
+        kinds = tuple(cls for cls, _ in self._INHERITED_MEMBERS)
+        for item in franca_walker.walk(package, kinds):
+            for cls, members in self._INHERITED_MEMBERS:
+                if isinstance(item, cls):
+                    try:
+                        for member in members:
+                            self._flatten(item, member)
+                    except ProcessorException as e:
+                        if isinstance(item, ast.Namespace):
+                            raise self._locate(e, item, item.file)
+                        raise self._locate(e, item, item.namespace.file)
+
+    def _invalidate_inheritance(self, package):
+        """
+        Drop the flattened member views of a package and of all types and
+        interfaces extending it. The views are recomputed on next access.
+
+        :param package: ast.Package object.
+        """
+        kinds = tuple(cls for cls, _ in self._INHERITED_MEMBERS)
+        stack = list(franca_walker.walk(package, kinds))
+        visited = set()
+        while stack:
+            item = stack.pop()
+            if item in visited:
+                continue
+            visited.add(item)
+            for _, members in self._INHERITED_MEMBERS:
+                for member in members:
+                    self._views.pop((item, member), None)
+            for usage in self.usages.get(item, ()):
+                if usage.kind == Usage.EXTENDS:
+                    stack.append(usage.item)
+
+    def all_fields(self, item):
+        """
+        Get the fields of a struct or a union including inherited ones.
+
+        :param item: Linked ast.Struct or ast.Union object.
+        :return: OrderedDict of fields, base fields first. Must not be
+            modified.
+        """
+        if not isinstance(item, (ast.Struct, ast.Union)):
+            raise ValueError("Expected ast.Struct or ast.Union.")
+        with self.lock.reading():
+            return self._flatten(item, "fields")
+
+    def all_enumerators(self, item):
+        """
+        Get the enumerators of an enumeration including inherited ones.
+
+        :param item: Linked ast.Enumeration object.
+        :return: OrderedDict of enumerators, base enumerators first. Must
+            not be modified.
+        """
+        if not isinstance(item, ast.Enumeration):
+            raise ValueError("Expected ast.Enumeration.")
+        with self.lock.reading():
+            return self._flatten(item, "enumerators")
+
+    def all_attributes(self, item):
+        """
+        Get the attributes of an interface including inherited ones.
+
+        :param item: Linked ast.Interface object.
+        :return: OrderedDict of attributes. Must not be modified.
+        """
+        if not isinstance(item, ast.Interface):
+            raise ValueError("Expected ast.Interface.")
+        with self.lock.reading():
+            return self._flatten(item, "attributes")
+
+    def all_methods(self, item):
+        """
+        Get the methods of an interface including inherited ones.
+
+        :param item: Linked ast.Interface object.
+        :return: OrderedDict of methods. Must not be modified.
+        """
+        if not isinstance(item, ast.Interface):
+            raise ValueError("Expected ast.Interface.")
+        with self.lock.reading():
+            return self._flatten(item, "methods")
+
+    def all_broadcasts(self, item):
+        """
+        Get the broadcasts of an interface including inherited ones.
+
+        :param item: Linked ast.Interface object.
+        :return: OrderedDict of broadcasts. Must not be modified.
+        """
+        if not isinstance(item, ast.Interface):
+            raise ValueError("Expected ast.Interface.")
+        with self.lock.reading():
+            return self._flatten(item, "broadcasts")
+
+    def get_usages(self, item):
+        """
+        Get the direct uses of a type or an interface.
+
+        :param item: ast.Type or ast.Interface object.
+        :return: List of Usage objects.
+        """
+        with self.lock.reading():
+            return list(self.usages.get(item, ()))
+
+    def impact(self, item):
+        """
+        Get all model elements affected by a change of a type or an
+        interface, following uses transitively.
+
+        Namespace members are reported together with their namespaces. The
+        cost is proportional to the number of affected elements.
+
+        :param item: ast.Type or ast.Interface object.
+        :return: List of affected namespace members and namespaces, nearest
+            first.
+        """
+        with self.lock.reading():
+            affected = []
+            visited = set([item])
+            queue = deque([item])
+            while queue:
+                current = queue.popleft()
+                dependents = [usage.owner for usage in
+                              self.usages.get(current, ())]
+                if not isinstance(current, ast.Namespace) and \
+                        current is not item and current.namespace is not None:
+                    dependents.append(current.namespace)
+                for dependent in dependents:
+                    if dependent not in visited:
+                        visited.add(dependent)
+                        affected.append(dependent)
+                        queue.append(dependent)
+            return affected
+
 
     def _exists(self, fspec):
         """
@@ -452,6 +1436,51 @@ class Processor(object):
             exists = os.path.exists(fspec)
         return exists
 
+    def _parse_file(self, fspec):
+        """
+        Parse a model file, reusing the parse cache if possible.
+
+        :param fspec: Absolute file specification.
+        :return: The parsed, not yet linked ast.Package.
+        """
+        if fspec in self._string_files:
+            fidl = self._string_files[fspec]
+        else:
+            try:
+                with open(fspec, "r") as f:
+                    fidl = f.read()
+            except (IOError, OSError, UnicodeDecodeError) as e:
+                raise ProcessorException(
+                    "Model file '{}' cannot be read: {}.".format(fspec, e),
+                    file_name=fspec)
+        digest = ParseCache.digest(fidl)
+        self.file_digests[fspec] = digest
+        self.line_indexes[fspec] = ast.LineIndex(fidl)
+        if self.parse_cache is not None:
+            package = self.parse_cache.get(fspec, digest)
+            if package is not None and \
+                    (package.source_maps or not self.lossless):
+                return package
+        if self.parser is None:
+            self.parser = franca_parser.Parser()
+        try:
+            with self._parser_lock:
+                package = self.parser.parse(fidl, self.lossless,
+                                            self.max_errors)
+        except (franca_lexer.LexerException,
+                franca_parser.ParserException) as e:
+            e.file = fspec
+            for error in getattr(e, "errors", ()):
+                error.file = fspec
+            raise
+        if package:
+            package.files = [fspec]
+            for source_map in package.source_maps:
+                source_map.file = fspec
+            if self.parse_cache is not None:
+                self.parse_cache.put(fspec, digest, package)
+        return package
+
     def import_file(self, fspec, references=None, package_path=None):
         """
         Parse an FIDL file and import it into the processor as package.
@@ -463,6 +1492,16 @@ class Processor(object):
         :param package_path: Additional model path to search for imports.
         :return: The parsed ast.Package.
         """
+        with self._import_lock:
+            package = self._import_file(fspec, references, package_path)
+            if not references:
+                self._evict(package.name)
+            return package
+
+    def _import_file(self, fspec, references, package_path):
+        """
+        Find, parse and import a file, see import_file().
+        """
         abs_fspec = os.path.abspath(fspec)
         if not self._exists(abs_fspec):
             if os.path.isabs(fspec):
@@ -486,11 +1525,276 @@ class Processor(object):
 
         if abs_fspec in self.files:
             # File already loaded.
-            return self.files[abs_fspec]
+            with self._recent_lock:
+                self.hits += 1
+            package = self.files[abs_fspec]
+            self._touch(package.name)
+            return package
+        self.misses += 1
+        if self._artifact is not None:
+            name = self._artifact["files"].get(abs_fspec)
+            if name is not None:
+                return self._load_artifact_package(name)
 
         # Parse the file.
-        parser = franca_parser.Parser()
-        package = parser.parse_file(abs_fspec)
+        package = self._parse_file(abs_fspec)
+        if self._artifact is not None and package is not None and \
+                package.name in self._artifact["packages"]:
+            # Merge the file into the saved package rather than replacing it.
+            self._load_artifact_package(package.name)
         # Import the package in the processor.
-        self.import_package(abs_fspec, package, references)
+        self._import_package(abs_fspec, package, references)
         return package
+
+    def register_string(self, fspec, fidl):
+        """
+        Provide the model text of a file specification.
+
+        Imports of the file specification will use the text instead of the
+        file system, e.g. for unsaved editor buffers.
+
+        :param fspec: File specification.
+        :param fidl: Model text.
+        """
+        with self._import_lock:
+            self._string_files[os.path.abspath(fspec)] = fidl
+
+    def import_string(self, fspec, fidl, references=None):
+        """
+        Parse a FIDL string and import it into the processor as package.
+
+        :param fspec: File specification of the package.
+        :param fidl: Model text.
+        :param references: A list of package references.
+        :return: The parsed ast.Package.
+        """
+        self.register_string(fspec, fidl)
+        return self.import_file(os.path.abspath(fspec), references)
+
+    def save(self, fspec):
+        """
+        Save the linked state of the processor to a model artifact, see
+        load().
+
+        The loaded packages are saved with their files, references and
+        usages. Each package is pickled separately, referring to the nodes of
+        the packages it depends on, so that it can be loaded on its own.
+        Packages depending on each other are pickled together.
+
+        :param fspec: File specification of the model artifact.
+        """
+        with self._import_lock:
+            names = list(self.packages)
+            owners = {}
+            for name in names:
+                for node in franca_walker.walk(self.packages[name]):
+                    owners[id(node)] = name
+            # Each package carries the usages by its own nodes.
+            usages = dict((name, []) for name in names)
+            for target, target_usages in self.usages.items():
+                for usage in target_usages:
+                    usages[self._usage_package(usage)].append(
+                        (target, usage))
+            exports = {}
+            indexes = {}
+            picklers = {}
+            for name in names:
+                picklers[name] = self._pickle_packages(
+                    [name], usages, owners, exports, indexes)
+            dependencies = dict((name, picklers[name].dependencies)
+                                for name in names)
+            reachable = dict((name, self._reachable(name, dependencies))
+                             for name in names)
+            packages = OrderedDict()
+            groups = []
+            for name in names:
+                if name in packages:
+                    continue
+                group = [other for other in names if other == name or
+                         (other in reachable[name] and
+                          name in reachable[other])]
+                if len(group) > 1:
+                    picklers[name] = self._pickle_packages(
+                        group, usages, owners, exports, indexes)
+                groups.append(picklers[name])
+                for other in group:
+                    packages[other] = len(groups) - 1
+            # The exported nodes follow each group, pickled by reference
+            #   once all groups are pickled.
+            for index, pickler in enumerate(groups):
+                pickler.dump([exports.get(name, []) for name in
+                              packages if packages[name] == index])
+                groups[index] = pickler.stream.getvalue()
+            files = dict((file_fspec, package.name) for
+                         file_fspec, package in self.files.items())
+            artifact = {
+                "format": _ARTIFACT_FORMAT,
+                "version": pyfranca.__version__,
+                "packages": packages,
+                "groups": groups,
+                "files": files,
+                "digests": dict((file_fspec, self.file_digests[file_fspec])
+                                for file_fspec in files),
+                "strings": dict((file_fspec, self._string_files[file_fspec])
+                                for file_fspec in files
+                                if file_fspec in self._string_files),
+                "weak_references": self.weak_references,
+            }
+        with open(fspec, "wb") as f:
+            pickle.dump(artifact, f, pickle.HIGHEST_PROTOCOL)
+
+    def _pickle_packages(self, group, usages, owners, exports, indexes):
+        """
+        Pickle a group of packages with their usages.
+
+        :param group: List of package names.
+        :param usages: Maps package names to lists of (target, Usage)
+            tuples.
+        :return: _ArtifactPickler object, see there for the other
+            parameters.
+        """
+        pickler = _ArtifactPickler(group, owners, exports, indexes)
+        pickler.dump([(self.packages[name], usages[name]) for name in group])
+        return pickler
+
+    @staticmethod
+    def _reachable(name, dependencies):
+        """
+        Get the names of the packages a package depends on, directly or not.
+
+        :param name: Package name.
+        :param dependencies: Maps package names to sets of package names.
+        :return: Set of package names.
+        """
+        reachable = set()
+        pending = [name]
+        while pending:
+            for other in dependencies[pending.pop()]:
+                if other not in reachable:
+                    reachable.add(other)
+                    pending.append(other)
+        return reachable
+
+    def load(self, fspec, lazy=False):
+        """
+        Load a model artifact saved by save() into an empty processor.
+
+        The packages are restored as saved, including nodes shared between
+        packages. With lazy, a package is loaded on first use by
+        get_package() or import_file(), together with the packages it
+        depends on.
+
+        :param fspec: File specification of the model artifact.
+        :param lazy: Whether to load the packages on first use.
+        :raises ProcessorException: If the artifact was saved by another
+            pyfranca version or a model file changed since.
+        """
+        with self._import_lock:
+            if self.files or self._artifact is not None:
+                raise ProcessorException(
+                    "Model artifact '{}' loaded into a processor that is "
+                    "not empty.".format(fspec))
+            try:
+                with open(fspec, "rb") as f:
+                    artifact = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                artifact = None
+            if not isinstance(artifact, dict) or \
+                    artifact.get("format") != _ARTIFACT_FORMAT:
+                raise ProcessorException(
+                    "Invalid model artifact '{}'.".format(fspec))
+            if artifact["version"] != pyfranca.__version__:
+                raise ProcessorException(
+                    "Model artifact '{}' saved by pyfranca {}.".format(
+                        fspec, artifact["version"]))
+            strings = artifact["strings"]
+            for file_fspec, digest in artifact["digests"].items():
+                fidl = strings.get(file_fspec)
+                if fidl is None:
+                    try:
+                        with open(file_fspec, "r") as f:
+                            fidl = f.read()
+                    except (IOError, OSError):
+                        pass
+                if fidl is None or ParseCache.digest(fidl) != digest:
+                    raise ProcessorException(
+                        "Model artifact '{}' outdated, '{}' changed.".format(
+                            fspec, file_fspec))
+            self._string_files.update(strings)
+            self.weak_references = artifact["weak_references"]
+            self._artifact = artifact
+            for file_fspec, name in artifact["files"].items():
+                self._evicted.setdefault(name, []).append(file_fspec)
+            if not lazy:
+                for name in artifact["packages"]:
+                    self._load_artifact_package(name)
+
+    def _load_artifact_package(self, name):
+        """
+        Load a package from the model artifact, after the packages it
+        depends on.
+
+        :param name: Package name.
+        :return: ast.Package object.
+        """
+        if name not in self.packages:
+            artifact = self._artifact
+            stream = BytesIO(artifact["groups"][artifact["packages"][name]])
+            unpickler = _ArtifactUnpickler(stream, self)
+            _collector_pause.enter()
+            try:
+                entries = unpickler.load()
+                exports = unpickler.load()
+            finally:
+                _collector_pause.exit()
+            with self.lock.writing():
+                for (package, usages), exported in zip(entries, exports):
+                    if package.name not in self.packages:
+                        self._register_loaded(package, usages)
+                        self._artifact_nodes[package.name] = exported
+            # Keep the artifact while packages may be evicted and loaded
+            #   again.
+            if self.max_packages is None and \
+                    all(other in self.packages
+                        for other in artifact["packages"]):
+                self._artifact = None
+                self._artifact_nodes = {}
+        return self.packages[name]
+
+    def _register_loaded(self, package, usages):
+        """
+        Publish a package loaded from the model artifact to readers.
+
+        :param package: Linked ast.Package object.
+        :param usages: List of (target, Usage) tuples.
+        """
+        name = package.name
+        self.packages[name] = package
+        if self._owned_packages is not None:
+            self._owned_packages.add(name)
+        for fspec in package.files:
+            self.files[fspec] = package
+            self.file_digests[fspec] = self._artifact["digests"][fspec]
+        for target, usage in usages:
+            self._append_usage(target, usage)
+        self._track_imports(package)
+        for namespace in list(package.typecollections.values()) + \
+                list(package.interfaces.values()):
+            if namespace.package is not package:
+                # Namespaces shared with a fork when saved.
+                self._original_packages.setdefault(name, namespace.package)
+        self._evicted.pop(name, None)
+        self._touch(name)
+
+    def _artifact_node(self, name, index):
+        """
+        Get a node of a package of the model artifact referred to by other
+        packages, loading the package first.
+
+        :param name: Package name.
+        :param index: Export index of the node.
+        :return: AST node.
+        """
+        if name not in self._artifact_nodes:
+            self._load_artifact_package(name)
+        return self._artifact_nodes[name][index]
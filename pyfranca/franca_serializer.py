@@ -0,0 +1,372 @@
+"""
+Franca IDL serializer.
+
+Writes packages, namespaces and their members as canonical FIDL text::
+
+    with open("merged.fidl", "w") as stream:
+        Serializer(stream).write(package)
+
+    text = dumps(processor.packages["P"]["Types"].structs["Sample"])
+
+The output parses back to an equal model. References of linked models are
+qualified as far as needed to resolve to the same types. Integer literals
+keep their base and structured comments are preserved; other comments and
+the original formatting are not. Namespace members are written grouped by
+kind, in the order of the model.
+
+Output is written line by line to the stream, so the time is linear and the
+memory use independent of the size of the model. Use a buffered stream, as
+returned by open(), for large models.
+"""
+
+from pyfranca import ast
+from pyfranca.franca_processor import Processor, ProcessorException
+
+try:
+    # noinspection PyUnresolvedReferences
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class SerializerException(Exception):
+
+    def __init__(self, message):
+        super(SerializerException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Methods writing namespace members, by class.
+_MEMBERS = {
+    ast.Typedef: "_typedef",
+    ast.Enumeration: "_enumeration",
+    ast.Struct: "_struct",
+    ast.Union: "_union",
+    ast.Array: "_array",
+    ast.Map: "_map",
+    ast.Constant: "_constant",
+    ast.Attribute: "_attribute",
+    ast.Method: "_method",
+    ast.Broadcast: "_broadcast",
+}
+
+
+class Serializer(object):
+    """
+    Writer of FIDL text to a text stream.
+    """
+
+    def __init__(self, stream, indent="\t"):
+        """
+        Constructor.
+
+        :param stream: Text stream to write to.
+        :param indent: String written per indentation level.
+        """
+        self._write = stream.write
+        self._indent = indent
+        self._level = 0
+        self._prefix = ""
+        # Namespace resolving the references written.
+        self._context = None
+
+    def write(self, node):
+        """
+        Write a model element.
+
+        :param node: ast.Package, ast.Namespace or namespace member.
+        """
+        if isinstance(node, ast.Package):
+            self._package(node)
+        elif isinstance(node, ast.Namespace):
+            self._namespace(node)
+        else:
+            self._member(node)
+
+    def _line(self, *parts):
+        """
+        Write an indented line. Only the parts of a line are joined, the
+        output is never accumulated.
+        """
+        self._write("".join((self._prefix,) + parts + ("\n",)))
+
+    def _indent_by(self, levels):
+        self._level += levels
+        self._prefix = self._indent * self._level
+
+    def _open(self, *parts):
+        self._line(*(parts + (" {",)))
+        self._indent_by(1)
+
+    def _close(self):
+        self._indent_by(-1)
+        self._line("}")
+
+    def _comments(self, node):
+        comments = node.comments
+        if not comments:
+            return
+        tags = list(comments)
+        for tag in tags:
+            if "**>" in comments[tag]:
+                raise SerializerException(
+                    "Comment of '{}' contains '**>'.".format(node.name))
+        if len(tags) == 1:
+            tag = tags[0]
+            if comments[tag]:
+                self._line("<** ", tag, ": ", comments[tag], " **>")
+            else:
+                self._line("<** ", tag, " **>")
+            return
+        self._line("<**")
+        self._indent_by(1)
+        for tag in tags:
+            if comments[tag]:
+                self._line(tag, ": ", comments[tag])
+            else:
+                self._line(tag)
+        self._indent_by(-1)
+        self._line("**>")
+
+    def _package(self, package):
+        self._comments(package)
+        self._line("package ", package.name)
+        if package.imports:
+            self._write("\n")
+            for item in package.imports:
+                if item.namespace is None:
+                    self._line("import model \"", item.file, "\"")
+                else:
+                    self._line("import ", item.namespace, " from \"",
+                               item.file, "\"")
+        for namespace in package.typecollections.values():
+            self._write("\n")
+            self._namespace(namespace)
+        for namespace in package.interfaces.values():
+            self._write("\n")
+            self._namespace(namespace)
+
+    def _namespace(self, namespace):
+        self._context = namespace
+        self._comments(namespace)
+        if isinstance(namespace, ast.Interface):
+            if namespace.extends:
+                self._open("interface ", namespace.name, " extends ",
+                           namespace.extends)
+            else:
+                self._open("interface ", namespace.name)
+            groups = (namespace.attributes, namespace.methods,
+                      namespace.broadcasts)
+        else:
+            self._open("typeCollection ", namespace.name)
+            groups = ()
+        first = True
+        if namespace.version:
+            self._line("version { major ", str(namespace.version.major),
+                       " minor ", str(namespace.version.minor), " }")
+            first = False
+        groups += (namespace.typedefs, namespace.enumerations,
+                   namespace.structs, namespace.unions, namespace.arrays,
+                   namespace.maps, namespace.constants)
+        for members in groups:
+            for member in members.values():
+                if not first:
+                    self._write("\n")
+                first = False
+                self._member(member)
+        self._close()
+
+    def _member(self, node):
+        self._context = getattr(node, "namespace", None) or self._context
+        for cls in type(node).__mro__:
+            method = _MEMBERS.get(cls)
+            if method is not None:
+                self._comments(node)
+                getattr(self, method)(node)
+                return
+        raise SerializerException(
+            "Cannot serialize '{}'.".format(getattr(node, "name", node)))
+
+    def _type(self, node):
+        """
+        Get the FIDL notation of a type used by a declaration.
+        """
+        if isinstance(node, ast.Array) and node.name is None:
+            return self._type(node.type) + "[]"
+        if isinstance(node, ast.Reference):
+            return self._reference(node)
+        if isinstance(node, ast.PrimitiveType):
+            return node.name
+        # Named types are used by reference.
+        if node.name is None:
+            raise SerializerException("Cannot serialize an anonymous type.")
+        return node.name
+
+    def _reference(self, node):
+        """
+        Get the shortest name of a resolved reference that resolves to the
+        same type from the namespace written. Linking strips the qualifiers
+        of reference names, which may be needed to tell types apart.
+        """
+        target = node.reference
+        namespace = self._context
+        if target is None or namespace is None or target.namespace is None:
+            return node.name
+        names = [target.name, target.namespace.name + "." + target.name]
+        package = target.namespace.package
+        if package is not None:
+            names.append(package.name + "." + names[-1])
+        for name in names:
+            try:
+                if Processor.resolve(namespace, name) is target:
+                    return name
+            except ProcessorException:
+                pass
+        return names[-1]
+
+    @staticmethod
+    def _flags(node):
+        return "".join(" " + flag for flag in node.flags)
+
+    def _typedef(self, node):
+        self._line("typedef ", node.name, " is ", self._type(node.type))
+
+    def _enumerators(self, enumerators):
+        for enumerator in enumerators.values():
+            self._comments(enumerator)
+            if enumerator.value is None:
+                self._line(enumerator.name)
+            else:
+                self._line(enumerator.name, " = ",
+                           self._value(enumerator.value))
+
+    def _enumeration(self, node):
+        if node.extends:
+            self._open("enumeration ", node.name, " extends ", node.extends)
+        else:
+            self._open("enumeration ", node.name)
+        self._enumerators(node.enumerators)
+        self._close()
+
+    def _fields(self, fields):
+        for field in fields.values():
+            self._comments(field)
+            self._line(self._type(field.type), " ", field.name)
+
+    def _struct(self, node):
+        if node.extends:
+            if node.flags:
+                raise SerializerException(
+                    "Struct '{}' cannot have flags and extend another "
+                    "struct.".format(node.name))
+            self._open("struct ", node.name, " extends ", node.extends)
+        else:
+            self._open("struct ", node.name, self._flags(node))
+        self._fields(node.fields)
+        self._close()
+
+    def _union(self, node):
+        if node.extends:
+            self._open("union ", node.name, " extends ", node.extends)
+        else:
+            self._open("union ", node.name)
+        self._fields(node.fields)
+        self._close()
+
+    def _array(self, node):
+        self._line("array ", node.name, " of ", self._type(node.type))
+
+    def _map(self, node):
+        self._open("map ", node.name)
+        self._line(self._type(node.key_type), " to ",
+                   self._type(node.value_type))
+        self._close()
+
+    def _constant(self, node):
+        self._line("const ", self._type(node.type), " ", node.name, " = ",
+                   self._value(node.value))
+
+    @staticmethod
+    def _value(node):
+        """
+        Get the FIDL notation of a literal.
+        """
+        value = node.value
+        if isinstance(node, ast.IntegerValue):
+            if value >= 0 and node.base == ast.IntegerValue.HEXADECIMAL:
+                return "0x{:X}".format(value)
+            if value >= 0 and node.base == ast.IntegerValue.BINARY:
+                return "0b{:b}".format(value)
+            return str(value)
+        if isinstance(node, ast.BooleanValue):
+            return "true" if value else "false"
+        if isinstance(node, (ast.FloatValue, ast.DoubleValue)):
+            if value != value or value in (float("inf"), float("-inf")):
+                raise SerializerException(
+                    "Cannot serialize the value {!r}.".format(value))
+            text = repr(float(value))
+            return text + ("f" if isinstance(node, ast.FloatValue) else "d")
+        if isinstance(node, ast.StringValue):
+            if "\"" in value:
+                raise SerializerException(
+                    "Cannot serialize the string {!r}.".format(value))
+            return "\"" + value + "\""
+        raise SerializerException(
+            "Cannot serialize the value {!r}.".format(value))
+
+    def _attribute(self, node):
+        self._line("attribute ", self._type(node.type), " ", node.name,
+                   self._flags(node))
+
+    def _arguments(self, direction, arguments):
+        if not arguments:
+            return
+        self._open(direction)
+        for argument in arguments.values():
+            self._comments(argument)
+            self._line(self._type(argument.type), " ", argument.name)
+        self._close()
+
+    def _method(self, node):
+        self._open("method ", node.name, self._flags(node))
+        self._arguments("in", node.in_args)
+        self._arguments("out", node.out_args)
+        if isinstance(node.errors, ast.Type):
+            self._line("error ", self._type(node.errors))
+        elif node.errors:
+            self._open("error")
+            self._enumerators(node.errors)
+            self._close()
+        self._close()
+
+    def _broadcast(self, node):
+        self._open("broadcast ", node.name, self._flags(node))
+        self._arguments("out", node.out_args)
+        self._close()
+
+
+def dump(node, stream, indent="\t"):
+    """
+    Write a model element as FIDL text.
+
+    :param node: ast.Package, ast.Namespace or namespace member.
+    :param stream: Text stream to write to.
+    :param indent: String written per indentation level.
+    """
+    Serializer(stream, indent).write(node)
+
+
+def dumps(node, indent="\t"):
+    """
+    Get the FIDL text of a model element.
+
+    :param node: ast.Package, ast.Namespace or namespace member.
+    :param indent: String written per indentation level.
+    :return: FIDL text.
+    """
+    stream = StringIO()
+    Serializer(stream, indent).write(node)
+    return stream.getvalue()
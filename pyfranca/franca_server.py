@@ -0,0 +1,369 @@
+"""
+Franca model processing server.
+
+The server keeps a warm parser and a parse cache between requests, so that
+repeated validation of a model only re-parses files whose content changed.
+Requests and responses are newline-delimited JSON objects (NDJSON)
+exchanged over a stream (e.g. stdin/stdout) or a local Unix socket::
+
+    {"id": 1, "method": "validate", "params": {"files": ["model.fidl"]}}
+    {"id": 1, "result": {"valid": true, "files": [...], "cached": false}}
+
+Supported methods are ``validate``, ``dump``, ``resolve``, ``stats``,
+``ping`` and ``shutdown``.
+"""
+
+import json
+import os
+import socket
+from collections import OrderedDict
+from pyfranca import franca_lexer, franca_parser, franca_processor, ast
+
+try:
+    # noinspection PyUnresolvedReferences
+    _STRINGS = (str, unicode)
+except NameError:
+    _STRINGS = (str,)
+
+
+class ServerException(Exception):
+
+    def __init__(self, message):
+        super(ServerException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class Server(object):
+    """
+    Franca IDL processing server.
+    """
+
+    def __init__(self, package_paths=None):
+        """
+        Constructor.
+
+        :param package_paths: Default model import directories.
+        """
+        self.package_paths = list(package_paths) if package_paths else []
+        self.parser = franca_parser.Parser()
+        self.parse_cache = franca_processor.ParseCache()
+        # Maps build keys to (file digests, processor, error) of the last
+        #   build with the same inputs.
+        self._builds = {}
+        self.running = False
+        self._methods = {
+            "validate": self._validate,
+            "dump": self._dump,
+            "resolve": self._resolve,
+            "stats": self._stats,
+            "ping": self._ping,
+            "shutdown": self._shutdown,
+        }
+
+    @staticmethod
+    def _digest_file(fspec):
+        try:
+            with open(fspec, "r") as f:
+                return franca_processor.ParseCache.digest(f.read())
+        except (IOError, OSError):
+            return None
+
+    def _is_current(self, digests):
+        for fspec, digest in digests.items():
+            if self._digest_file(fspec) != digest:
+                return False
+        return True
+
+    def build(self, files, import_dirs=None):
+        """
+        Import a model, reusing the previous build if no file changed.
+
+        :param files: List of model file specifications.
+        :param import_dirs: Additional model import directories.
+        :return: Tuple - ast processor, exception or None, cache flag.
+        """
+        files = [os.path.abspath(fspec) for fspec in files]
+        import_dirs = list(import_dirs) if import_dirs else []
+        key = (tuple(files), tuple(import_dirs))
+        if key in self._builds:
+            digests, processor, error = self._builds[key]
+            if self._is_current(digests):
+                return processor, error, True
+
+        processor = franca_processor.Processor()
+        processor.package_paths.extend(import_dirs)
+        processor.package_paths.extend(self.package_paths)
+        processor.parser = self.parser
+        processor.parse_cache = self.parse_cache
+        error = None
+        try:
+            for fspec in files:
+                processor.import_file(fspec)
+        except (franca_lexer.LexerException,
+                franca_parser.ParserException,
+                franca_processor.ProcessorException) as e:
+            error = e
+        digests = dict(processor.file_digests)
+        if error is not None:
+            # Failed imports do not record the missing or broken file.
+            for fspec in files:
+                if fspec not in digests:
+                    digests[fspec] = self._digest_file(fspec)
+        self._builds[key] = (digests, processor, error)
+        return processor, error, False
+
+    @staticmethod
+    def _error(e):
+        error = OrderedDict([
+            ("type", e.__class__.__name__),
+            ("message", str(e)),
+        ])
+        # Location of model errors, if known.
+        for key, attribute in (("file", "file"), ("line", "lineno"),
+                               ("column", "column")):
+            value = getattr(e, attribute, None)
+            if value is not None:
+                error[key] = value
+        return error
+
+    @staticmethod
+    def _strings(params, name):
+        """
+        Get a parameter holding a list of strings.
+
+        :return: List of strings or None if the parameter is missing.
+        """
+        value = params.get(name)
+        if value is not None and (
+                not isinstance(value, list) or
+                not all(isinstance(item, _STRINGS) for item in value)):
+            raise ServerException(
+                "Invalid '{}' parameter, expected a list of strings.".format(
+                    name))
+        return value
+
+    def _build(self, params):
+        """
+        Build the model of the files and import directories of a request.
+        """
+        return self.build(self._strings(params, "files") or [],
+                          self._strings(params, "import_dirs"))
+
+    def _validate(self, params):
+        processor, error, cached = self._build(params)
+        result = OrderedDict()
+        result["valid"] = error is None
+        if error is not None:
+            result["error"] = self._error(error)
+        result["files"] = sorted(processor.files.keys())
+        result["cached"] = cached
+        return result
+
+    @staticmethod
+    def _dump_namespace(namespace):
+        res = OrderedDict()
+        res["name"] = namespace.name
+        res["version"] = str(namespace.version) if namespace.version else None
+        for kind in ("typedefs", "enumerations", "structs", "unions",
+                     "arrays", "maps", "constants", "attributes", "methods",
+                     "broadcasts"):
+            members = getattr(namespace, kind, None)
+            if members:
+                res[kind] = list(members.keys())
+        return res
+
+    def _dump(self, params):
+        processor, error, cached = self._build(params)
+        if error is not None:
+            raise error
+        packages = []
+        for package in processor.packages.values():
+            item = OrderedDict()
+            item["name"] = package.name
+            item["files"] = list(package.files)
+            item["interfaces"] = [self._dump_namespace(namespace) for
+                                  namespace in package.interfaces.values()]
+            item["typecollections"] = [
+                self._dump_namespace(namespace) for
+                namespace in package.typecollections.values()]
+            packages.append(item)
+        return OrderedDict([("packages", packages), ("cached", cached)])
+
+    def _resolve(self, params):
+        processor, error, cached = self._build(params)
+        if error is not None:
+            raise error
+        fqn = params.get("fqn")
+        if not fqn:
+            raise ServerException("Missing 'fqn' parameter.")
+        pkg, ns, name = franca_processor.Processor.split_fqn(fqn)
+        package = processor.packages.get(pkg)
+        if package is None or ns not in package:
+            raise ServerException("Unresolved reference '{}'.".format(fqn))
+        namespace = package[ns]
+        if name not in namespace:
+            raise ServerException("Unresolved reference '{}'.".format(fqn))
+        item = namespace[name]
+        result = OrderedDict()
+        result["fqn"] = fqn
+        result["kind"] = item.__class__.__name__
+        result["namespace"] = "{}.{}".format(package.name, namespace.name)
+        result["files"] = list(package.files)
+        base_type = getattr(item, "type", None)
+        if isinstance(base_type, ast.Reference) and base_type.reference:
+            target = base_type.reference
+            result["type"] = "{}.{}.{}".format(
+                target.namespace.package.name, target.namespace.name,
+                target.name)
+        elif isinstance(base_type, ast.Type):
+            result["type"] = base_type.name
+        result["comments"] = dict(item.comments)
+        return result
+
+    def _stats(self, params):
+        return OrderedDict([
+            ("builds", len(self._builds)),
+            ("cached_files", len(self.parse_cache)),
+            ("cache_hits", self.parse_cache.hits),
+            ("cache_misses", self.parse_cache.misses),
+        ])
+
+    @staticmethod
+    def _ping(params):
+        return "pong"
+
+    def _shutdown(self, params):
+        self.running = False
+        return None
+
+    def handle(self, request):
+        """
+        Handle a single request.
+
+        :param request: Request dictionary with "method" and "params".
+        :return: Response dictionary.
+        """
+        response = OrderedDict()
+        response["id"] = request.get("id")
+        try:
+            method = self._methods.get(request.get("method"))
+            if method is None:
+                raise ServerException("Unknown method '{}'.".format(
+                    request.get("method")))
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise ServerException(
+                    "Invalid 'params', expected an object.")
+            response["result"] = method(params)
+        except (ServerException,
+                franca_lexer.LexerException,
+                franca_parser.ParserException,
+                franca_processor.ProcessorException) as e:
+            response["error"] = self._error(e)
+        except Exception as e:
+            # A failing request must not end the server.
+            response["error"] = self._error(e)
+        return response
+
+    def handle_line(self, line):
+        """
+        Handle a single NDJSON request line.
+
+        :param line: Request JSON string.
+        :return: Response JSON string without the trailing newline.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object.")
+        except ValueError as e:
+            response = OrderedDict([
+                ("id", None),
+                ("error", OrderedDict([("type", "ServerException"),
+                                       ("message", str(e))]))])
+        else:
+            response = self.handle(request)
+        return json.dumps(response)
+
+    def serve_stream(self, instream, outstream):
+        """
+        Serve requests from a stream until it is closed or the server is shut
+        down.
+
+        :param instream: Input text stream, e.g. sys.stdin.
+        :param outstream: Output text stream, e.g. sys.stdout.
+        """
+        self.running = True
+        self._serve(instream, outstream)
+        self.running = False
+
+    def _serve(self, instream, outstream):
+        while self.running:
+            line = instream.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            outstream.write(self.handle_line(line) + "\n")
+            outstream.flush()
+
+    def serve_unix(self, path):
+        """
+        Serve requests on a Unix domain socket until the server is shut
+        down. Connections are handled one at a time.
+
+        :param path: Socket file specification.
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(path)
+            listener.listen(5)
+            self.running = True
+            while self.running:
+                conn, _ = listener.accept()
+                stream = conn.makefile("rw")
+                try:
+                    self._serve(stream, stream)
+                except (IOError, OSError, socket.error):
+                    # The client went away, serve the next one.
+                    pass
+                finally:
+                    stream.close()
+                    conn.close()
+        finally:
+            listener.close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def request(path, method, params=None, request_id=1):
+    """
+    Send a single request to a server listening on a Unix socket.
+
+    :param path: Socket file specification.
+    :param method: Request method name.
+    :param params: Request parameters dictionary.
+    :param request_id: Request identifier.
+    :return: Response dictionary.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+        stream = conn.makefile("rw")
+        try:
+            stream.write(json.dumps({"id": request_id, "method": method,
+                                     "params": params or {}}) + "\n")
+            stream.flush()
+            line = stream.readline()
+        finally:
+            stream.close()
+    finally:
+        conn.close()
+    if not line:
+        raise ServerException("Connection closed by the server.")
+    return json.loads(line)
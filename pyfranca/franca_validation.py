@@ -0,0 +1,435 @@
+"""
+Franca payload validation.
+
+Checks JSON-like values, e.g. decoded JSON payloads, against linked Franca
+types::
+
+    validator, _ = method_validators(interface.methods["Set"])
+    error = validator.validate(json.loads(payload))
+    if error is not None:
+        reject(error)           # e.g. "$.config.mode: Unknown enumerator 7."
+
+Values are mapped to types as follows:
+
+- Integers are int objects within the range of their width.
+- Float and Double values are int or float objects, Boolean values bool.
+- String values are strings. ByteBuffer values are bytes, bytearray or
+  strings, e.g. Base64 encoded.
+- Enumeration values are enumerator names or values.
+- Structs, and the arguments of methods and broadcasts, are dictionaries
+  holding exactly the fields, including inherited ones.
+- Unions are dictionaries holding exactly one of the alternatives.
+- Arrays are lists. Maps are dictionaries or lists of key-value pairs.
+
+A validator is compiled once per type and cached. Validation stops at the
+first error.
+"""
+
+from pyfranca import ast
+from pyfranca.franca_fingerprint import fingerprint, qualified_name
+
+try:
+    # noinspection PyUnresolvedReferences
+    _INTEGERS = (int, long)
+    # noinspection PyUnresolvedReferences
+    _STRINGS = (str, unicode)
+except NameError:
+    _INTEGERS = (int,)
+    _STRINGS = (str,)
+
+_NUMBERS = _INTEGERS + (float,)
+_FLOAT_MAX = 3.4028234663852886e+38
+
+
+class ValidationException(Exception):
+
+    def __init__(self, message):
+        super(ValidationException, self).__init__()
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Value ranges of integer types.
+_RANGES = {
+    ast.Int8: (-2 ** 7, 2 ** 7 - 1),
+    ast.Int16: (-2 ** 15, 2 ** 15 - 1),
+    ast.Int32: (-2 ** 31, 2 ** 31 - 1),
+    ast.Int64: (-2 ** 63, 2 ** 63 - 1),
+    ast.UInt8: (0, 2 ** 8 - 1),
+    ast.UInt16: (0, 2 ** 16 - 1),
+    ast.UInt32: (0, 2 ** 32 - 1),
+    ast.UInt64: (0, 2 ** 64 - 1),
+}
+
+# Maps (qualified name, fingerprint) of named types and classes of
+#   primitive types to check functions.
+_checks = {}
+# Maps (qualified name, fingerprint[, direction]) to Validator objects.
+_validators = {}
+
+
+def _resolve(node):
+    """
+    Follow references and typedefs to the defining type.
+    """
+    while True:
+        if isinstance(node, ast.Reference):
+            if node.reference is None:
+                raise ValidationException(
+                    "Unresolved reference '{}'.".format(node.name))
+            node = node.reference
+        elif isinstance(node, ast.Typedef):
+            node = node.type
+        else:
+            return node
+
+
+def _extended(node):
+    extended = []
+    while node is not None:
+        if node in extended:
+            raise ValidationException(
+                "Circular extension '{}'.".format(node.name))
+        extended.insert(0, node)
+        node = node.reference
+    return extended
+
+
+def _type_name(value):
+    return value.__class__.__name__
+
+
+# Check functions return None for valid values and otherwise an error
+#   message prefixed with the path of the invalid value.
+
+
+def _integer_check(name, low, high):
+    def check(value):
+        if value.__class__ is int and low <= value <= high:
+            return None
+        if isinstance(value, bool) or not isinstance(value, _INTEGERS):
+            return ": Expected {}, got {}.".format(name, _type_name(value))
+        if not low <= value <= high:
+            return ": {} is out of the range of {}.".format(value, name)
+        return None
+
+    return check
+
+
+def _float_check(name, limit):
+    def check(value):
+        if value.__class__ is float or \
+                isinstance(value, _NUMBERS) and not isinstance(value, bool):
+            if limit is not None and abs(value) > limit:
+                return ": {} is out of the range of {}.".format(value, name)
+            return None
+        return ": Expected {}, got {}.".format(name, _type_name(value))
+
+    return check
+
+
+def _boolean_check(value):
+    if value is True or value is False:
+        return None
+    return ": Expected Boolean, got {}.".format(_type_name(value))
+
+
+def _string_check(value):
+    if isinstance(value, _STRINGS):
+        return None
+    return ": Expected String, got {}.".format(_type_name(value))
+
+
+def _bytebuffer_check(value):
+    if isinstance(value, (bytes, bytearray) + _STRINGS):
+        return None
+    return ": Expected ByteBuffer, got {}.".format(_type_name(value))
+
+
+def _enumeration_check(node):
+    values = set()
+    value = 0
+    for item in _extended(node):
+        for name, enumerator in item.enumerators.items():
+            if enumerator.value is not None:
+                value = int(enumerator.value.value)
+            values.add(name)
+            values.add(value)
+            value += 1
+    values = frozenset(values)
+
+    def check(value):
+        if isinstance(value, bool) or value.__class__ not in (int, str) and \
+                not isinstance(value, _INTEGERS + _STRINGS):
+            return ": Expected {}, got {}.".format(node.name,
+                                                   _type_name(value))
+        if value not in values:
+            return ": Unknown enumerator {!r}.".format(value)
+        return None
+
+    return check
+
+
+def _struct_check(node):
+    fields = []
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            fields.append((name, _check(_resolve(field.type))))
+    return _fields_check(fields, node.name)
+
+
+def _fields_check(fields, type_name):
+    names = frozenset(name for name, _ in fields)
+    count = len(fields)
+
+    def check(value):
+        if not isinstance(value, dict):
+            return ": Expected {}, got {}.".format(type_name,
+                                                   _type_name(value))
+        for name, field_check in fields:
+            try:
+                item = value[name]
+            except KeyError:
+                return ": Missing field '{}'.".format(name)
+            error = field_check(item)
+            if error is not None:
+                return "." + name + error
+        if len(value) != count:
+            unknown = sorted(str(key) for key in value if key not in names)
+            return ": Unknown field '{}'.".format(unknown[0])
+        return None
+
+    return check
+
+
+def _union_check(node):
+    alternatives = {}
+    for item in _extended(node):
+        for name, field in item.fields.items():
+            alternatives[name] = _check(_resolve(field.type))
+
+    def check(value):
+        if not isinstance(value, dict):
+            return ": Expected {}, got {}.".format(node.name,
+                                                   _type_name(value))
+        if len(value) != 1:
+            return ": Expected one alternative of {}, got {}.".format(
+                node.name, len(value))
+        for name, item in value.items():
+            alternative_check = alternatives.get(name)
+            if alternative_check is None:
+                return ": Unknown alternative '{}'.".format(name)
+            error = alternative_check(item)
+            if error is not None:
+                return "." + name + error
+        return None
+
+    return check
+
+
+def _array_check(node):
+    element_check = _check(_resolve(node.type))
+    type_name = node.name or "array"
+
+    def check(value):
+        if not isinstance(value, list):
+            return ": Expected {}, got {}.".format(type_name,
+                                                   _type_name(value))
+        for index, item in enumerate(value):
+            error = element_check(item)
+            if error is not None:
+                return "[{}]".format(index) + error
+        return None
+
+    return check
+
+
+def _map_check(node):
+    key_check = _check(_resolve(node.key_type))
+    value_check = _check(_resolve(node.value_type))
+
+    def check(value):
+        if isinstance(value, dict):
+            items = value.items()
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if not isinstance(item, (list, tuple)) or len(item) != 2:
+                    return "[{}]: Expected a key-value pair.".format(index)
+            items = value
+        else:
+            return ": Expected {}, got {}.".format(node.name,
+                                                   _type_name(value))
+        for key, item in items:
+            error = key_check(key)
+            if error is not None:
+                return "[{!r}] (key)".format(key) + error
+            error = value_check(item)
+            if error is not None:
+                return "[{!r}]".format(key) + error
+        return None
+
+    return check
+
+
+def _primitive_check(node):
+    cls = node.__class__
+    if cls in _RANGES:
+        return _integer_check(node.name, *_RANGES[cls])
+    if cls is ast.Float:
+        return _float_check(node.name, _FLOAT_MAX)
+    if cls is ast.Double:
+        return _float_check(node.name, None)
+    if cls is ast.Boolean:
+        return _boolean_check
+    if cls is ast.String:
+        return _string_check
+    if cls is ast.ByteBuffer:
+        return _bytebuffer_check
+    raise ValidationException("Cannot validate '{}'.".format(node.name))
+
+
+def _check(node):
+    """
+    Get the check function of a resolved type.
+    """
+    if isinstance(node, ast.PrimitiveType):
+        check = _checks.get(node.__class__)
+        if check is None:
+            check = _primitive_check(node)
+            _checks[node.__class__] = check
+        return check
+    if isinstance(node, ast.Array) and node.name is None:
+        return _array_check(node)
+
+    if isinstance(node, ast.Struct):
+        make = _struct_check
+    elif isinstance(node, ast.Union):
+        make = _union_check
+    elif isinstance(node, ast.Enumeration):
+        make = _enumeration_check
+    elif isinstance(node, ast.Array):
+        make = _array_check
+    elif isinstance(node, ast.Map):
+        make = _map_check
+    else:
+        raise ValidationException(
+            "Cannot validate '{}'.".format(node.name))
+    key = (qualified_name(node), fingerprint(node))
+    check = _checks.get(key)
+    if check is None:
+        # Recursive types reach themselves while being compiled. Register
+        #   a forwarding function until the real one exists.
+        target = []
+        _checks[key] = lambda value: target[0](value)
+        try:
+            check = make(node)
+        except Exception:
+            del _checks[key]
+            raise
+        target.append(check)
+        _checks[key] = check
+    return check
+
+
+class Validator(object):
+    """
+    Validator of values of a type or of argument lists.
+    """
+
+    def __init__(self, check):
+        self._check = check
+
+    def validate(self, value):
+        """
+        Validate a value.
+
+        :param value: Value to validate.
+        :return: None if the value is valid, otherwise an error message
+            starting with the path of the invalid value, e.g.
+            "$.samples[3].time: Expected UInt64, got str."
+        """
+        error = self._check(value)
+        return None if error is None else "$" + error
+
+    def is_valid(self, value):
+        """
+        Check whether a value is valid.
+        """
+        return self._check(value) is None
+
+    def check(self, value):
+        """
+        Validate a value and raise ValidationException if it is invalid.
+        """
+        error = self._check(value)
+        if error is not None:
+            raise ValidationException("$" + error)
+
+    def validate_batch(self, values):
+        """
+        Validate a list of values.
+
+        :param values: Iterable of values.
+        :return: List of (index, error message) tuples of invalid values.
+        """
+        check = self._check
+        errors = []
+        for index, value in enumerate(values):
+            error = check(value)
+            if error is not None:
+                errors.append((index, "$" + error))
+        return errors
+
+
+def type_validator(node):
+    """
+    Get the validator of a linked Franca type.
+
+    :param node: Type, typedef or reference.
+    :return: Validator object.
+    """
+    node = _resolve(node)
+    if isinstance(node, ast.PrimitiveType) or node.name is None:
+        return Validator(_check(node))
+    key = (qualified_name(node), fingerprint(node))
+    validator = _validators.get(key)
+    if validator is None:
+        validator = Validator(_check(node))
+        _validators[key] = validator
+    return validator
+
+
+def _arguments_validator(item, arguments, direction):
+    key = (qualified_name(item), fingerprint(item), direction)
+    validator = _validators.get(key)
+    if validator is None:
+        fields = [(name, _check(_resolve(argument.type)))
+                  for name, argument in arguments.items()]
+        validator = Validator(_fields_check(fields, "arguments"))
+        _validators[key] = validator
+    return validator
+
+
+def method_validators(method):
+    """
+    Get the validators of the arguments of a method.
+
+    Argument values are dictionaries mapping argument names to values.
+
+    :param method: ast.Method object.
+    :return: Tuple of the validators of the in and the out arguments.
+    """
+    return (_arguments_validator(method, method.in_args, "in"),
+            _arguments_validator(method, method.out_args, "out"))
+
+
+def broadcast_validator(broadcast):
+    """
+    Get the validator of the arguments of a broadcast.
+
+    :param broadcast: ast.Broadcast object.
+    :return: Validator object.
+    """
+    return _arguments_validator(broadcast, broadcast.out_args, "out")
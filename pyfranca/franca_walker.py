@@ -0,0 +1,247 @@
+"""
+Franca AST traversal.
+
+The walker visits AST nodes iteratively with an explicit stack, so the depth
+of a model never hits the interpreter recursion limit, and yields them from
+a generator, so consumers can stop early or filter by node kind::
+
+    for struct in walk(processor.packages, kinds=ast.Struct):
+        ...
+
+Several analyses can share a single pass over the tree with a
+MultiVisitor::
+
+    MultiVisitor([NamingChecker(), UsageCounter()]).run(processor.packages)
+"""
+
+from collections import OrderedDict
+from pyfranca import ast
+
+
+def _values(members):
+    return list(members.values()) if members else []
+
+
+def _children_package(node):
+    return list(node.imports) + _values(node.interfaces) + \
+        _values(node.typecollections)
+
+
+def _children_namespace(node):
+    children = [node.version] if node.version else []
+    for members in (node.typedefs, node.enumerations, node.structs,
+                    node.unions, node.arrays, node.maps, node.constants):
+        children.extend(members.values())
+    return children
+
+
+def _children_interface(node):
+    return _children_namespace(node) + _values(node.attributes) + \
+        _values(node.methods) + _values(node.broadcasts)
+
+
+def _children_type(node):
+    return [node.type] if node.type is not None else []
+
+
+def _children_map(node):
+    return [node.key_type, node.value_type]
+
+
+def _children_constant(node):
+    return [node.type, node.value]
+
+
+def _children_fields(node):
+    return _values(node.fields)
+
+
+def _children_enumeration(node):
+    return _values(node.enumerators)
+
+
+def _children_enumerator(node):
+    return [node.value] if isinstance(node.value, ast.Type) else []
+
+
+def _children_method(node):
+    children = _values(node.in_args) + _values(node.out_args)
+    if isinstance(node.errors, OrderedDict):
+        children.extend(node.errors.values())
+    elif node.errors is not None:
+        children.append(node.errors)
+    return children
+
+
+def _children_broadcast(node):
+    return _values(node.out_args)
+
+
+def _children_none(node):
+    return []
+
+
+# Child accessors by AST class. Subclasses not listed use the accessor of
+#   their nearest listed base class.
+_CHILDREN = {
+    ast.Package: _children_package,
+    ast.TypeCollection: _children_namespace,
+    ast.Interface: _children_interface,
+    ast.Namespace: _children_namespace,
+    ast.Typedef: _children_type,
+    ast.Array: _children_type,
+    ast.Map: _children_map,
+    ast.Constant: _children_constant,
+    ast.Struct: _children_fields,
+    ast.Union: _children_fields,
+    ast.StructField: _children_type,
+    ast.UnionField: _children_type,
+    ast.Enumeration: _children_enumeration,
+    ast.Enumerator: _children_enumerator,
+    ast.Attribute: _children_type,
+    ast.Method: _children_method,
+    ast.Broadcast: _children_broadcast,
+    ast.Argument: _children_type,
+}
+
+
+def _accessor(cls):
+    accessor = _CHILDREN.get(cls)
+    if accessor is None:
+        accessor = _children_none
+        for base in cls.__mro__[1:]:
+            if base in _CHILDREN:
+                accessor = _CHILDREN[base]
+                break
+        _CHILDREN[cls] = accessor
+    return accessor
+
+
+def children(node):
+    """
+    Get the child nodes of an AST node in declaration order.
+
+    References are not followed.
+
+    :param node: AST node.
+    :return: List of child nodes.
+    """
+    return _accessor(node.__class__)(node)
+
+
+def _roots(root):
+    if isinstance(root, dict):
+        return list(root.values())
+    if isinstance(root, (list, tuple)):
+        return list(root)
+    return [root]
+
+
+def _targets(node):
+    """
+    Get the nodes a resolved reference or an extension points to.
+    """
+    if isinstance(node, ast.Reference):
+        return [node.reference] if node.reference is not None else []
+    reference = getattr(node, "reference", None)
+    if reference is not None and \
+            isinstance(node, (ast.Struct, ast.Union, ast.Enumeration,
+                              ast.Interface)):
+        return [reference]
+    return []
+
+
+def walk_with_parents(root, kinds=None, follow_references=False):
+    """
+    Traverse AST nodes depth-first in declaration order.
+
+    :param root: AST node, or a list, a tuple or a dictionary of AST nodes,
+        e.g. Processor.packages.
+    :param kinds: AST class or tuple of AST classes to yield. All nodes are
+        traversed, but only matching ones are yielded.
+    :param follow_references: Whether to continue into the targets of
+        resolved references and extensions. Each node is then visited
+        once, even if it is reachable over several paths.
+    :return: Generator of (node, parent) tuples. The parent of a node reached
+        over a reference is the referencing node.
+    """
+    stack = [(node, None) for node in reversed(_roots(root))]
+    visited = set() if follow_references else None
+    while stack:
+        node, parent = stack.pop()
+        if visited is not None:
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+        if kinds is None or isinstance(node, kinds):
+            yield node, parent
+        nodes = children(node)
+        if follow_references:
+            nodes = nodes + _targets(node)
+        for child in reversed(nodes):
+            stack.append((child, node))
+
+
+def walk(root, kinds=None, follow_references=False):
+    """
+    Traverse AST nodes depth-first in declaration order.
+
+    See walk_with_parents() for the parameters.
+
+    :return: Generator of AST nodes.
+    """
+    for node, _ in walk_with_parents(root, kinds, follow_references):
+        yield node
+
+
+class Visitor(object):
+    """
+    Base class of AST visitors.
+
+    Subclasses define visit_<ClassName>(node, parent) methods. A node is
+    passed to the method of its own class or, if there is none, of its
+    nearest base class, e.g. visit_PrimitiveType() receives all primitive
+    types.
+    """
+    pass
+
+
+class MultiVisitor(object):
+    """
+    Runs several visitors over a single traversal.
+    """
+
+    def __init__(self, visitors):
+        """
+        Constructor.
+
+        :param visitors: List of Visitor objects.
+        """
+        self.visitors = list(visitors)
+        # Maps AST classes to lists of bound visit methods.
+        self._dispatch = {}
+
+    def _methods(self, cls):
+        methods = self._dispatch.get(cls)
+        if methods is None:
+            methods = []
+            for visitor in self.visitors:
+                for base in cls.__mro__:
+                    method = getattr(visitor, "visit_" + base.__name__, None)
+                    if method is not None:
+                        methods.append(method)
+                        break
+            self._dispatch[cls] = methods
+        return methods
+
+    def run(self, root, follow_references=False):
+        """
+        Traverse the AST once, calling all visitors for each node.
+
+        :param root: See walk_with_parents().
+        :param follow_references: See walk_with_parents().
+        """
+        for node, parent in walk_with_parents(
+                root, follow_references=follow_references):
+            for method in self._methods(node.__class__):
+                method(node, parent)
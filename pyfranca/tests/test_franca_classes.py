@@ -0,0 +1,102 @@
+"""
+Pyfranca run-time class tests.
+"""
+
+import unittest
+
+from pyfranca import Processor
+from pyfranca.franca_classes import python_type, new, IntEnum, \
+    ClassesException, StructBase, UnionBase
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B = 5 C }
+    enumeration F extends E { D }
+    struct Base { UInt8 a String s }
+    struct S extends Base { E e Base b UInt16[] l Numbers n U u Boolean class }
+    array Numbers of Int8
+    map M { String to Int8 }
+    union U { UInt8 x String y }
+    union V extends U { Double z }
+    typedef T is S
+}
+"""
+
+
+class TestClasses(BaseTestCase):
+
+    def setUp(self):
+        super(TestClasses, self).setUp()
+        self.processor.import_string("model.fidl", MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+
+    def test_struct(self):
+        cls = python_type(self.tc.structs["S"])
+        self.assertTrue(issubclass(cls, StructBase))
+        self.assertTrue(issubclass(cls, python_type(self.tc.structs["Base"])))
+        self.assertEqual(cls._fields,
+                         ("a", "s", "e", "b", "l", "n", "u", "class"))
+        self.assertEqual(cls.__slots__, ("e", "b", "l", "n", "u", "class"))
+        item = cls(a=3)
+        self.assertEqual(item.a, 3)
+        self.assertEqual(item.s, "")
+        self.assertEqual(getattr(item, "class"), False)
+        with self.assertRaises(AttributeError):
+            item.unknown = 1
+
+    def test_defaults(self):
+        cls = python_type(self.tc.structs["S"])
+        first = cls()
+        second = cls(class_=True)
+        self.assertEqual(getattr(second, "class"), True)
+        self.assertEqual(first.l, [])
+        self.assertIsNot(first.l, second.l)
+        self.assertIsNot(first.b, second.b)
+        self.assertIsInstance(first.n, python_type(self.tc.arrays["Numbers"]))
+        self.assertIsInstance(first.u, UnionBase)
+        self.assertEqual(first, cls())
+        self.assertNotEqual(first, second)
+
+    def test_union(self):
+        cls = python_type(self.tc.unions["V"])
+        item = cls(x=1)
+        self.assertEqual((item.x, item.y, item.z), (1, None, None))
+        item.z = 2.0
+        self.assertEqual((item.x, item.z), (None, 2.0))
+        self.assertEqual(repr(item), "V(z=2.0)")
+        with self.assertRaises(TypeError):
+            cls(x=1, y="a")
+
+    @unittest.skipIf(IntEnum is None, "enum module not available")
+    def test_enumeration(self):
+        cls = python_type(self.tc.enumerations["F"])
+        self.assertTrue(issubclass(cls, IntEnum))
+        self.assertEqual([(item.name, item.value) for item in cls],
+                         [("A", 0), ("B", 5), ("C", 6), ("D", 7)])
+        self.assertEqual(new(self.tc.enumerations["E"]).name, "A")
+
+    def test_other_types(self):
+        self.assertIs(python_type(self.tc.typedefs["T"]),
+                      python_type(self.tc.structs["S"]))
+        self.assertIs(python_type(self.tc.maps["M"]), dict)
+        self.assertIs(python_type(self.tc.arrays["Numbers"].type), int)
+        self.assertEqual(new(self.tc.maps["M"]), {})
+        self.assertEqual(new(self.tc.structs["Base"], a=1).a, 1)
+        with self.assertRaises(ClassesException):
+            python_type(self.tc)
+
+    def test_shared(self):
+        cls = python_type(self.tc.structs["S"])
+        self.assertIs(python_type(self.tc.structs["S"]), cls)
+        other = Processor()
+        other.import_string("model.fidl", MODEL)
+        self.assertIs(python_type(other.packages["P"]["TC"].structs["S"]),
+                      cls)
+        changed = Processor()
+        changed.import_string("model.fidl",
+                              MODEL.replace("UInt8 a", "UInt16 a"))
+        self.assertIsNot(
+            python_type(changed.packages["P"]["TC"].structs["S"]), cls)
@@ -0,0 +1,171 @@
+"""
+Pyfranca binary wire codec tests.
+"""
+
+import struct
+
+from pyfranca.franca_classes import python_type
+from pyfranca.franca_codec import type_codec, method_codecs, \
+    broadcast_codec, CodecException, BulkCodec
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B = 5 C }
+    struct Base { UInt8 a String s }
+    struct S extends Base { E e Base b UInt16[] l Bases bases U u M m }
+    array Bases of Base
+    union U { UInt8 x String y }
+    map M { String to E }
+    struct Node { String name Node[] children }
+    typedef T is S
+}
+interface I {
+    method Get { in { UInt8 x Base b } out { ByteBuffer data } }
+    broadcast Changed { out { Double d } }
+}
+"""
+
+
+class TestCodec(BaseTestCase):
+
+    def setUp(self):
+        super(TestCodec, self).setUp()
+        self.processor.import_string("model.fidl", MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+        self.i = self.processor.packages["P"]["I"]
+        self.base = python_type(self.tc.structs["Base"])
+
+    def test_layout(self):
+        data = type_codec(self.tc.structs["Base"]).encode(
+            self.base(a=1, s=u"hé"))
+        self.assertEqual(bytes(data), b"\x01\x00\x00\x00\x03h\xc3\xa9")
+        union = python_type(self.tc.unions["U"])
+        codec = type_codec(self.tc.unions["U"])
+        self.assertEqual(bytes(codec.encode(union(x=7))),
+                         b"\x00\x00\x00\x01\x00\x00\x00\x01\x07")
+        self.assertEqual(bytes(codec.encode(union())), b"\x00" * 8)
+        codec = type_codec(self.tc.structs["S"].fields["l"].type)
+        self.assertEqual(bytes(codec.encode([1, 2])),
+                         b"\x00\x00\x00\x04\x00\x01\x00\x02")
+
+    def test_round_trip(self):
+        cls = python_type(self.tc.structs["S"])
+        union = python_type(self.tc.unions["U"])
+        value = cls(a=1, s="s", e=5, l=[1, 2, 3], u=union(y="y"),
+                    m={"k": 6})
+        value.bases.append(self.base(a=2, s="x"))
+        codec = type_codec(self.tc.typedefs["T"])
+        self.assertIs(codec, type_codec(self.tc.structs["S"]))
+        decoded = codec.decode(codec.encode(value))
+        self.assertEqual(decoded, value)
+        self.assertIsInstance(decoded.bases,
+                              python_type(self.tc.arrays["Bases"]))
+        self.assertEqual(decoded.m["k"].name, "C")
+
+    def test_recursive(self):
+        cls = python_type(self.tc.structs["Node"])
+        value = cls(name="root", children=[cls(name="child")])
+        codec = type_codec(self.tc.structs["Node"])
+        self.assertEqual(codec.decode(codec.encode(value)), value)
+
+    def test_arguments(self):
+        request, response = method_codecs(self.i.methods["Get"])
+        value = (1, self.base(a=2, s="b"))
+        self.assertEqual(request.decode(request.encode(value)), value)
+        self.assertEqual(response.decode(response.encode((b"\x00\x01",))),
+                         (b"\x00\x01",))
+        codec = broadcast_codec(self.i.broadcasts["Changed"])
+        self.assertEqual(bytes(codec.encode((1.5,))),
+                         struct.pack(">d", 1.5))
+        self.assertIs(method_codecs(self.i.methods["Get"])[0], request)
+
+    def test_decode_from(self):
+        codec = type_codec(self.tc.structs["Base"])
+        data = bytearray(b"xx")
+        codec.encode_into(self.base(a=3, s="a"), data)
+        value, offset = codec.decode_from(data, 2)
+        self.assertEqual((value.a, value.s, offset), (3, "a", len(data)))
+
+    def test_errors(self):
+        codec = type_codec(self.tc.structs["Base"])
+        data = codec.encode(self.base(a=1, s="abc"))
+        with self.assertRaises(CodecException):
+            codec.decode(data[:-1])
+        with self.assertRaises(CodecException):
+            codec.decode(data + b"\x00")
+        with self.assertRaises(CodecException):
+            codec.encode(self.base(a=256))
+        with self.assertRaises(CodecException):
+            type_codec(self.tc.unions["U"]).decode(
+                b"\x00\x00\x00\x01\x00\x00\x00\x03\x07")
+        with self.assertRaises(CodecException):
+            type_codec(self.tc.enumerations["E"]).decode(b"\x00\x00\x00\x02")
+
+
+BULK_MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B }
+    struct Position { Double latitude Double longitude }
+    struct Sample { UInt64 time Position position Int16 v Boolean ok E e }
+    array Samples of Sample
+    array Names of Base
+    struct Base { String name }
+}
+"""
+
+
+class TestBulkCodec(BaseTestCase):
+
+    def setUp(self):
+        super(TestBulkCodec, self).setUp()
+        self.processor.import_string("model.fidl", BULK_MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+        sample = python_type(self.tc.structs["Sample"])
+        position = python_type(self.tc.structs["Position"])
+        self.samples = [sample(time=i, position=position(1.5, i), v=-i,
+                               ok=bool(i % 2), e=1) for i in range(5)]
+        self.data = bytes(type_codec(self.tc.arrays["Samples"]).encode(
+            self.samples))
+
+    def test_columns(self):
+        codec = BulkCodec(self.tc.arrays["Samples"], use_numpy=False)
+        self.assertEqual(codec.names, ["time", "position.latitude",
+                                       "position.longitude", "v", "ok", "e"])
+        records = codec.decode(self.data)
+        self.assertEqual(list(records["time"]), [0, 1, 2, 3, 4])
+        self.assertEqual(list(records["position.longitude"]),
+                         [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(list(records["v"]), [0, -1, -2, -3, -4])
+        self.assertEqual(bytes(codec.encode(records)), self.data)
+
+    def test_numpy(self):
+        codec = BulkCodec(self.tc.arrays["Samples"])
+        if codec.numpy is None:
+            self.skipTest("NumPy not available")
+        records = codec.decode(self.data)
+        self.assertEqual(records["position"]["longitude"].tolist(),
+                         [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(bytes(codec.encode(records)), self.data)
+        native = records.astype(records.dtype.newbyteorder("="))
+        self.assertEqual(bytes(codec.encode(native)), self.data)
+
+    def test_empty(self):
+        codec = BulkCodec(self.tc.arrays["Samples"], use_numpy=False)
+        records = codec.decode(b"\x00\x00\x00\x00")
+        self.assertEqual(len(records["time"]), 0)
+        self.assertEqual(bytes(codec.encode(records)), b"\x00\x00\x00\x00")
+
+    def test_errors(self):
+        with self.assertRaises(CodecException):
+            BulkCodec(self.tc.arrays["Names"])
+        with self.assertRaises(CodecException):
+            BulkCodec(self.tc.structs["Sample"])
+        codec = BulkCodec(self.tc.arrays["Samples"], use_numpy=False)
+        with self.assertRaises(CodecException):
+            codec.decode(self.data[:-1])
+        with self.assertRaises(CodecException):
+            codec.encode({"time": []})
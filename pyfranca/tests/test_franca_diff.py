@@ -0,0 +1,181 @@
+"""
+Pyfranca model comparison tests.
+"""
+
+from pyfranca import Processor
+from pyfranca.franca_diff import diff, is_compatible, Change, Differ
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    version { major 1 minor 0 }
+    struct S { UInt8 a String b }
+    union U { UInt8 x String y }
+    enumeration E { A = 1 B = 2 }
+    enumeration Implicit { X Y }
+    const UInt8 C = 1
+}
+interface I {
+    version { major 1 minor 0 }
+    attribute S s
+    method M { in { UInt8 x String y } out { E e } error { FAILED } }
+    broadcast B { out { UInt8 v } }
+}
+"""
+
+
+class TestDiff(BaseTestCase):
+
+    def _load(self, fidl):
+        processor = Processor()
+        processor.import_string("model.fidl", fidl)
+        return processor
+
+    def _diff(self, *replacements):
+        new = MODEL
+        for old_text, new_text in replacements:
+            self.assertIn(old_text, new)
+            new = new.replace(old_text, new_text)
+        return [str(change) for change in
+                diff(self._load(MODEL), self._load(new))]
+
+    def test_identical(self):
+        changes = diff(self._load(MODEL), self._load("\n" + MODEL))
+        self.assertEqual(changes, [])
+        self.assertTrue(is_compatible(changes))
+
+    def test_added_method(self):
+        changes = self._diff(("broadcast B", "method N { }\nbroadcast B"))
+        self.assertEqual(changes, ["compatible: method 'P.I.N' added"])
+
+    def test_removed_members(self):
+        changes = self._diff(("method M", "method Renamed"),
+                             ("const UInt8 C = 1", ""))
+        self.assertEqual(sorted(changes), [
+            "breaking: constant 'P.TC.C' removed",
+            "breaking: method 'P.I.M' removed",
+            "compatible: method 'P.I.Renamed' added"])
+
+    def test_argument_type(self):
+        changes = self._diff(("in { UInt8 x", "in { UInt16 x"))
+        self.assertEqual(changes, [
+            "breaking: argument 'P.I.M.in.x' type changed (UInt8 -> UInt16)"])
+
+    def test_argument_order(self):
+        changes = self._diff(("in { UInt8 x String y }",
+                              "in { String y UInt8 x }"))
+        self.assertEqual(changes, [
+            "breaking: arguments 'P.I.M.in' reordered (x, y -> y, x)"])
+
+    def test_struct_fields(self):
+        changes = self._diff(("UInt8 a String b", "String b UInt8 a"))
+        self.assertEqual(changes, [
+            "breaking: fields 'P.TC.S' reordered (a, b -> b, a)"])
+        changes = self._diff(("UInt8 a String b", "UInt8 a String b Int8 c"))
+        self.assertEqual(changes, ["breaking: field 'P.TC.S.c' added"])
+
+    def test_type_change_reported_once(self):
+        # The attribute using S keeps its type.
+        changes = self._diff(("UInt8 a String b", "UInt16 a String b"))
+        self.assertEqual(changes, [
+            "breaking: field 'P.TC.S.a' type changed (UInt8 -> UInt16)"])
+
+    def test_union_alternative(self):
+        changes = self._diff(("UInt8 x String y }\n", "UInt8 x String y "
+                                                      "Int8 z }\n"))
+        self.assertEqual(changes, [
+            "compatible: alternative 'P.TC.U.z' added"])
+
+    def test_enumerators(self):
+        changes = self._diff(("A = 1 B = 2", "A = 1 B = 3 C = 4"))
+        self.assertEqual(changes, [
+            "breaking: enumerator 'P.TC.E.B' value changed (2 -> 3)",
+            "compatible: enumerator 'P.TC.E.C' added"])
+        changes = self._diff(("X Y", "Y X"))
+        self.assertEqual(changes, [
+            "breaking: enumerator 'P.TC.Implicit.Y' value changed (1 -> 0)",
+            "breaking: enumerator 'P.TC.Implicit.X' value changed (0 -> 1)"])
+        changes = self._diff(("error { FAILED }", "error { FAILED BUSY }"))
+        self.assertEqual(changes, [
+            "compatible: error 'P.I.M.errors.BUSY' added"])
+
+    def test_enumerator_inserted(self):
+        # Implicit values after the new enumerator shift.
+        changes = self._diff(("X Y", "X Z Y"))
+        self.assertEqual(changes, [
+            "compatible: enumerator 'P.TC.Implicit.Z' added",
+            "breaking: enumerator 'P.TC.Implicit.Y' value changed (1 -> 2)"])
+        changes = self._diff(("X Y", "X Y Z"))
+        self.assertEqual(changes, [
+            "compatible: enumerator 'P.TC.Implicit.Z' added"])
+
+    def test_enumerator_values_written_out(self):
+        changes = self._diff(("X Y", "X = 0 Y = 1"))
+        self.assertEqual(changes, [])
+        changes = self._diff(("A = 1 B = 2", "A = 1 B"))
+        self.assertEqual(changes, [])
+
+    def test_extended_enumerators(self):
+        changes = self._diff(
+            ("enumeration Implicit { X Y }",
+             "enumeration Implicit { X Y }\n"
+             "    enumeration Derived extends Implicit { Z }"))
+        self.assertEqual(changes, [
+            "compatible: enumeration 'P.TC.Derived' added"])
+        old = MODEL.replace(
+            "enumeration Implicit { X Y }",
+            "enumeration Implicit { X Y }\n"
+            "    enumeration Derived extends Implicit { Z }")
+        new = old.replace("Implicit { X Y }", "Implicit { X Y W }")
+        changes = [str(change) for change in
+                   diff(self._load(old), self._load(new))]
+        self.assertEqual(sorted(changes), [
+            "breaking: enumerator 'P.TC.Derived.Z' value changed (2 -> 3)",
+            "compatible: enumerator 'P.TC.Implicit.W' added"])
+
+    def test_versions(self):
+        changes = self._diff(("interface I {\n    version { major 1 minor 0",
+                              "interface I {\n    version { major 1 minor 1"))
+        self.assertEqual(changes, [
+            "compatible: interface 'P.I' version changed (1.0 -> 1.1)"])
+        changes = self._diff(("interface I {\n    version { major 1 minor 0",
+                              "interface I {\n    version { major 2 minor 0"))
+        self.assertEqual(changes, [
+            "breaking: interface 'P.I' version changed (1.0 -> 2.0)"])
+
+    def test_kind_and_flags(self):
+        changes = self._diff(("union U", "struct U"),
+                             ("attribute S s", "attribute S s readonly"))
+        self.assertEqual(sorted(changes), [
+            "breaking: attribute 'P.I.s' flags changed ( -> readonly)",
+            "breaking: struct 'P.TC.U' kind changed (union -> struct)"])
+
+    def test_packages(self):
+        old = self._load(MODEL)
+        new = self._load(MODEL)
+        new.import_string("other.fidl", "package Q\ntypeCollection T { }")
+        changes = Differ().compare(old.packages, new.packages)
+        self.assertEqual([str(change) for change in changes],
+                         ["compatible: package 'Q' added"])
+        changes = diff(new, old)
+        self.assertEqual(changes[0].kind, Change.REMOVED)
+        self.assertFalse(is_compatible(changes))
+
+    def test_pruning(self):
+        class CountingDiffer(Differ):
+            def __init__(self):
+                super(CountingDiffer, self).__init__()
+                self.compared = []
+
+            def _compare_member(self, old, new, path):
+                self.compared.append(path)
+                super(CountingDiffer, self)._compare_member(old, new, path)
+
+        old = self._load(MODEL)
+        new = self._load(MODEL.replace("UInt8 v", "UInt16 v"))
+        differ = CountingDiffer()
+        differ.compare(old, new)
+        # Unchanged namespaces and members are not descended into.
+        self.assertEqual(differ.compared, ["P.I.B"])
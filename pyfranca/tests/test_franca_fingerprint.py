@@ -0,0 +1,109 @@
+"""
+Pyfranca structural fingerprint tests.
+"""
+
+from pyfranca import Processor
+from pyfranca.franca_fingerprint import fingerprint, invalidate
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    version { major 1 minor 0 }
+    <** @description: A sample **>
+    struct S { UInt8 a String b }
+    enumeration E { A = 1 B = 0x02 }
+    typedef T is S
+}
+interface I {
+    attribute T t readonly
+    method M { in { S s } out { E e } }
+}
+"""
+
+
+class TestFingerprint(BaseTestCase):
+
+    def _load(self, fidl, filename="model.fidl"):
+        processor = Processor()
+        processor.import_string(filename, fidl)
+        return processor.packages["P"]
+
+    def test_stable(self):
+        first = self._load(MODEL)
+        second = self._load(MODEL)
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertEqual(fingerprint(first["I"]), fingerprint(second["I"]))
+
+    def test_formatting_independent(self):
+        first = self._load(MODEL)
+        second = self._load(
+            "\n\n" + MODEL.replace("0x02", "2").replace("    ", "\t")
+            .replace("<** @description: A sample **>", "// Comment"))
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertNotEqual(fingerprint(first, comments=True),
+                            fingerprint(second, comments=True))
+
+    def test_member_order(self):
+        first = self._load(MODEL)
+        second = self._load(MODEL.replace(
+            "    typedef T is S\n", "").replace(
+            "typeCollection TC {", "typeCollection TC {\ntypedef T is S"))
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        third = self._load(MODEL.replace("UInt8 a String b",
+                                         "String b UInt8 a"))
+        self.assertNotEqual(fingerprint(first["TC"].structs["S"]),
+                            fingerprint(third["TC"].structs["S"]))
+
+    def test_changes(self):
+        first = self._load(MODEL)
+        for old, new in (("minor 0", "minor 1"),
+                         ("A = 1", "A = 3"),
+                         ("readonly", ""),
+                         ("out { E e }", "out { E f }")):
+            second = self._load(MODEL.replace(old, new))
+            self.assertNotEqual(fingerprint(first), fingerprint(second))
+
+    def test_references(self):
+        first = self._load(MODEL)
+        second = self._load(MODEL.replace("UInt8 a", "UInt16 a"))
+        # The change is visible through the typedef and the arguments.
+        self.assertNotEqual(fingerprint(first["I"]), fingerprint(second["I"]))
+        self.assertEqual(fingerprint(first["TC"].enumerations["E"]),
+                         fingerprint(second["TC"].enumerations["E"]))
+
+    def test_recursive(self):
+        fidl = """
+            package P
+            typeCollection TC {
+                struct Node { String name Node[] children }
+            }
+        """
+        first = self._load(fidl)
+        second = self._load(fidl)
+        node = first["TC"].structs["Node"]
+        self.assertEqual(fingerprint(node),
+                         fingerprint(second["TC"].structs["Node"]))
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_cached(self):
+        package = self._load(MODEL)
+        struct = package["TC"].structs["S"]
+        digest = fingerprint(package)
+        self.assertEqual(struct.fingerprints[False], fingerprint(struct))
+        struct.fingerprints[False] = "changed"
+        self.assertEqual(fingerprint(package), digest)
+        invalidate(package)
+        self.assertEqual(package.fingerprints, {})
+        self.assertNotEqual(fingerprint(struct), "changed")
+
+    def test_merge(self):
+        self.import_tmp_fidl("model.fidl", MODEL)
+        package = self.processor.packages["P"]
+        digest = fingerprint(package)
+        self.import_tmp_fidl("other.fidl", """
+            package P
+            typeCollection Other { typedef X is UInt8 }
+        """)
+        self.assertNotEqual(fingerprint(package), digest)
@@ -0,0 +1,121 @@
+"""
+Pyfranca formatter tests.
+"""
+
+import os
+from pyfranca import Parser
+from pyfranca.franca_formatter import format_fidl, format_files, \
+    tokenize, FormatCache, FormatterException, UNCHANGED, REFORMATTED, \
+    ERROR
+from pyfranca.franca_serializer import dumps
+from .test_franca_processor import BaseTestCase
+from .test_franca_serializer import MODEL
+
+
+UNFORMATTED = """// Header.
+package P   import P.T.* from "x.fidl" import model "y.fidl"
+typeCollection T { version {major 1 minor 0} /* Block. */ struct S {
+UInt8 a // Trailing.
+P.T.X[] b } <** @description: E **> enumeration E { A B=0x10 C }
+map M {UInt8 to String}}
+interface I { method m { in { UInt8 a } error P.T.E } }
+"""
+
+FORMATTED = """// Header.
+package P
+
+import P.T.* from "x.fidl"
+import model "y.fidl"
+
+typeCollection T {
+\tversion { major 1 minor 0 } /* Block. */
+
+\tstruct S {
+\t\tUInt8 a // Trailing.
+\t\tP.T.X[] b
+\t}
+
+\t<** @description: E **>
+\tenumeration E {
+\t\tA
+\t\tB = 0x10
+\t\tC
+\t}
+
+\tmap M {
+\t\tUInt8 to String
+\t}
+}
+
+interface I {
+\tmethod m {
+\t\tin {
+\t\t\tUInt8 a
+\t\t}
+\t\terror P.T.E
+\t}
+}
+"""
+
+
+class TestFormatter(BaseTestCase):
+
+    def test_format(self):
+        self.assertEqual(format_fidl(UNFORMATTED), FORMATTED)
+        self.assertEqual(format_fidl(FORMATTED), FORMATTED)
+
+    def test_indent(self):
+        self.assertEqual(format_fidl(FORMATTED, indent="  "),
+                         FORMATTED.replace("\t", "  "))
+
+    def test_serializer_layout(self):
+        self.assertEqual(format_fidl(MODEL), MODEL)
+        package = Parser().parse(UNFORMATTED.replace("// Header.", "")
+                                 .replace("/* Block. */", "")
+                                 .replace("// Trailing.", ""))
+        self.assertEqual(format_fidl(dumps(package)), dumps(package))
+
+    def test_comment_tokens(self):
+        kinds = [token[0] for token in tokenize(UNFORMATTED)]
+        self.assertEqual(kinds.count("LINE_COMMENT"), 2)
+        self.assertEqual(kinds.count("BLOCK_COMMENT"), 1)
+        # The parser is not affected.
+        self.assertEqual(Parser().parse(UNFORMATTED).name, "P")
+
+    def test_errors(self):
+        with self.assertRaises(FormatterException):
+            format_fidl("package P typeCollection T {")
+        with self.assertRaises(FormatterException):
+            format_fidl("package P }")
+        with self.assertRaises(FormatterException):
+            format_fidl("package P ?")
+
+    def test_files(self):
+        formatted = self.tmp_fidl("formatted.fidl", FORMATTED)
+        unformatted = self.tmp_fidl("unformatted.fidl", UNFORMATTED)
+        broken = self.tmp_fidl("broken.fidl", "package P {")
+        paths = [formatted, unformatted, broken]
+        cache = FormatCache(self.get_spec(filename="cache.json"))
+
+        results = format_files(paths, check=True, cache=cache)
+        self.assertEqual([result[1] for result in results],
+                         [UNCHANGED, REFORMATTED, ERROR])
+        with open(unformatted, "r") as f:
+            self.assertEqual(f.read(), UNFORMATTED)
+        self.assertEqual(len(cache.digests), 1)
+
+        mtime = os.path.getmtime(formatted)
+        results = format_files(paths, jobs=2, cache=cache)
+        self.assertEqual([result[1] for result in results],
+                         [UNCHANGED, REFORMATTED, ERROR])
+        with open(unformatted, "r") as f:
+            self.assertEqual(f.read(), FORMATTED)
+        self.assertEqual(os.path.getmtime(formatted), mtime)
+        # Both files have the same content now.
+        self.assertEqual(len(cache.digests), 1)
+
+        cache.save()
+        cache = FormatCache(cache.path)
+        self.assertEqual(len(cache.digests), 1)
+        self.assertEqual(len(FormatCache(cache.path, indent="  ").digests),
+                         0)
@@ -0,0 +1,129 @@
+"""
+Pyfranca payload generation tests.
+"""
+
+import base64
+import io
+import json
+from pyfranca.franca_generator import PayloadGenerator, write_ndjson, \
+    GeneratorException
+from pyfranca.franca_validation import type_validator, method_validators, \
+    broadcast_validator
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B = 5 C }
+    struct Position { Double latitude Double longitude Float altitude }
+    struct Derived { Int8 a UInt64 b Position p E e Boolean f }
+    union U { UInt8 x String s }
+    array Bytes of UInt8
+    map Names { UInt16 to String }
+    map Index { String to Int32 }
+    struct Node { String name Node[] children }
+}
+interface I {
+    method M { in { Int8 x Bytes b } out { Boolean ok } }
+    method F fireAndForget { in { Derived d } }
+    broadcast B { out { U u Names n Index i ByteBuffer data } }
+}
+interface J extends I {
+    method N { in { Int8 y } out { E e } }
+}
+"""
+
+
+class TestGenerator(BaseTestCase):
+
+    def setUp(self):
+        super(TestGenerator, self).setUp()
+        self.processor.import_string("model.fidl", MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+        self.i = self.processor.packages["P"]["I"]
+
+    def test_valid_values(self):
+        generator = PayloadGenerator(seed=1)
+        for name in ("Derived", "Node"):
+            validator = type_validator(self.tc.structs[name])
+            for value in generator.values(self.tc.structs[name], 100):
+                self.assertIsNone(validator.validate(value))
+        validator = broadcast_validator(self.i.broadcasts["B"])
+        for _ in range(100):
+            self.assertIsNone(validator.validate(
+                generator.broadcast_arguments(self.i.broadcasts["B"])))
+        request, response = method_validators(self.i.methods["M"])
+        for _ in range(100):
+            values = generator.method_arguments(self.i.methods["M"])
+            self.assertIsNone(request.validate(values[0]))
+            self.assertIsNone(response.validate(values[1]))
+
+    def test_seeds(self):
+        first = list(PayloadGenerator(seed=7).values(
+            self.tc.structs["Node"], 20))
+        second = list(PayloadGenerator(seed=7).values(
+            self.tc.structs["Node"], 20))
+        third = list(PayloadGenerator(seed=8).values(
+            self.tc.structs["Node"], 20))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_sizes(self):
+        generator = PayloadGenerator(seed=1, array_size=(3, 3),
+                                     string_size=(5, 5), bytes_size=(2, 2))
+        self.assertEqual(len(generator.value(self.tc.arrays["Bytes"])), 3)
+        node = generator.value(self.tc.structs["Node"])
+        self.assertEqual(len(node["name"]), 5)
+        self.assertEqual(len(node["children"]), 3)
+        data = generator.broadcast_arguments(self.i.broadcasts["B"])["data"]
+        self.assertEqual(len(base64.b64decode(data)), 2)
+        with self.assertRaises(GeneratorException):
+            PayloadGenerator(array_size=(2, 1))
+
+    def test_max_depth(self):
+        generator = PayloadGenerator(seed=1, array_size=(1, 1), max_depth=3)
+        node = generator.value(self.tc.structs["Node"])
+        depth = 0
+        while node["children"]:
+            node = node["children"][0]
+            depth += 1
+        self.assertEqual(depth, 1)
+
+    def test_maps(self):
+        generator = PayloadGenerator(seed=1, array_size=(2, 2))
+        self.assertIsInstance(generator.value(self.tc.maps["Index"]), dict)
+        names = generator.value(self.tc.maps["Names"])
+        self.assertIsInstance(names, list)
+        self.assertTrue(all(len(item) == 2 for item in names))
+
+    def test_interface_payloads(self):
+        generator = PayloadGenerator(seed=1)
+        messages = list(generator.interface_payloads(self.i, 8))
+        self.assertEqual([(item["name"], item["direction"])
+                          for item in messages[:4]],
+                         [("M", "in"), ("M", "out"), ("F", "in"),
+                          ("B", "out")])
+        self.assertEqual(messages[4]["name"], "M")
+        self.assertEqual(len(messages), 8)
+
+    def test_extended_interface_payloads(self):
+        generator = PayloadGenerator(seed=1)
+        j = self.processor.packages["P"]["J"]
+        messages = list(generator.interface_payloads(j, 6))
+        self.assertEqual([(item["name"], item["direction"])
+                          for item in messages],
+                         [("M", "in"), ("M", "out"), ("F", "in"),
+                          ("B", "out"), ("N", "in"), ("N", "out")])
+        self.assertEqual(list(messages[4]["arguments"]), ["y"])
+
+    def test_ndjson(self):
+        generator = PayloadGenerator(seed=1)
+        stream = io.StringIO()
+        count = write_ndjson(stream, generator.interface_payloads(self.i, 10))
+        self.assertEqual(count, 10)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 10)
+        validator = broadcast_validator(self.i.broadcasts["B"])
+        self.assertIsNone(validator.validate(
+            json.loads(lines[3])["arguments"]))
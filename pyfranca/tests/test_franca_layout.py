@@ -0,0 +1,113 @@
+"""
+Pyfranca wire layout tests.
+"""
+
+from pyfranca.franca_classes import python_type
+from pyfranca.franca_codec import type_codec, method_codecs
+from pyfranca.franca_layout import layout, method_layouts, \
+    broadcast_layout, LayoutException
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B }
+    struct Position { Double latitude Double longitude Boolean valid }
+    struct Base { UInt8 a }
+    struct Derived extends Base { Position p E e }
+    struct Named { UInt16 id String name UInt8 flags }
+    union U { UInt8 x Position p }
+    union Open { UInt8 x UInt8[] list }
+    typedef T is Derived
+    struct Node { String name Node[] children }
+    struct Tree { UInt8 v TreeNode n }
+    union TreeNode { Tree t UInt8 leaf }
+}
+interface I {
+    method M { in { UInt32 x Position p } out { String s } }
+    broadcast B { out { U u } }
+}
+"""
+
+
+class TestLayout(BaseTestCase):
+
+    def setUp(self):
+        super(TestLayout, self).setUp()
+        self.processor.import_string("model.fidl", MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+        self.i = self.processor.packages["P"]["I"]
+
+    def test_fixed_struct(self):
+        result = layout(self.tc.structs["Position"])
+        self.assertTrue(result.fixed)
+        self.assertEqual(result.size, 17)
+        self.assertEqual(result.alignment, 8)
+        self.assertEqual(list(result.offsets.items()),
+                         [("latitude", 0), ("longitude", 8), ("valid", 16)])
+
+    def test_extends_and_typedefs(self):
+        result = layout(self.tc.typedefs["T"])
+        self.assertIs(result, layout(self.tc.structs["Derived"]))
+        self.assertEqual(result.size, 1 + 17 + 4)
+        self.assertEqual(list(result.offsets.items()),
+                         [("a", 0), ("p", 1), ("e", 18)])
+
+    def test_variable_struct(self):
+        result = layout(self.tc.structs["Named"])
+        self.assertFalse(result.fixed)
+        self.assertTrue(result.unbounded)
+        self.assertEqual(result.min_size, 2 + 4 + 1)
+        self.assertIsNone(result.size)
+        self.assertEqual(list(result.offsets.values()), [0, 2, None])
+        self.assertEqual(str(result), "7..unbounded bytes")
+
+    def test_unions(self):
+        result = layout(self.tc.unions["U"])
+        self.assertEqual((result.min_size, result.max_size), (8, 8 + 17))
+        self.assertTrue(layout(self.tc.unions["Open"]).unbounded)
+
+    def test_recursive(self):
+        self.assertTrue(layout(self.tc.structs["Node"]).unbounded)
+
+    def test_recursive_union(self):
+        tree = layout(self.tc.structs["Tree"])
+        self.assertFalse(tree.fixed)
+        self.assertEqual((tree.min_size, tree.max_size), (1 + 8, None))
+        self.assertEqual(list(tree.offsets.items()), [("v", 0), ("n", 1)])
+        node = layout(self.tc.unions["TreeNode"])
+        self.assertEqual((node.min_size, node.max_size), (8, None))
+        # The layouts do not depend on the type computed first.
+        self.processor.import_string("other.fidl", """
+            package Q
+            typeCollection TC {
+                struct Tree { UInt8 v TreeNode n }
+                union TreeNode { Tree t Double leaf }
+            }
+        """)
+        tc = self.processor.packages["Q"]["TC"]
+        self.assertEqual(layout(tc.unions["TreeNode"]).alignment, 8)
+        tree = layout(tc.structs["Tree"])
+        self.assertEqual((tree.min_size, tree.alignment), (1 + 8, 8))
+
+    def test_arguments(self):
+        request, response = method_layouts(self.i.methods["M"])
+        self.assertEqual(request.size, 4 + 17)
+        self.assertEqual(request.offsets["p"], 4)
+        self.assertEqual((response.min_size, response.max_size), (4, None))
+        self.assertEqual(broadcast_layout(self.i.broadcasts["B"]).max_size,
+                         25)
+
+    def test_matches_codec(self):
+        derived = python_type(self.tc.structs["Derived"])
+        data = type_codec(self.tc.structs["Derived"]).encode(derived())
+        self.assertEqual(len(data), layout(self.tc.structs["Derived"]).size)
+        position = python_type(self.tc.structs["Position"])
+        data = method_codecs(self.i.methods["M"])[0].encode((1, position()))
+        self.assertEqual(len(data), method_layouts(self.i.methods["M"])[0]
+                         .size)
+
+    def test_errors(self):
+        with self.assertRaises(LayoutException):
+            layout(self.tc)
@@ -4,7 +4,7 @@ Pyfranca lexer tests.
 
 import unittest
 
-from pyfranca import Lexer
+from pyfranca import Lexer, LexerException
 
 
 class BaseTestCase(unittest.TestCase):
@@ -301,3 +301,15 @@ class TestCheckRegularExpressions(BaseTestCase):
         self.assertEqual(tokenized_data[3].value, '=')
         self.assertEqual(tokenized_data[4].type, "BOOLEAN_VAL")
         self.assertEqual(tokenized_data[4].value, True)
+
+
+class TestErrorLocation(BaseTestCase):
+    """Test the location of lexer errors."""
+
+    def test_illegal_character(self):
+        with self.assertRaises(LexerException) as context:
+            self._tokenize("package P\ntypeCollection TC {\n    ? }")
+        error = context.exception
+        self.assertEqual((error.lineno, error.column, error.lexpos),
+                         (3, 5, 34))
+        self.assertIsNone(error.file)
@@ -0,0 +1,173 @@
+"""
+Pyfranca linter tests.
+"""
+
+from pyfranca import ast
+from pyfranca.franca_lint import Linter, LintException, Rule, \
+    NamingRule, DeprecatedReferenceRule, UnusedTypeRule, \
+    MissingVersionRule, EnumeratorValueRule
+from .test_franca_processor import BaseTestCase
+
+
+class BaseLintTestCase(BaseTestCase):
+
+    def lint(self, fidl, rules, **kwargs):
+        self.import_tmp_fidl("test.fidl", fidl)
+        linter = Linter(rules)
+        return linter.run(self.processor, **kwargs)
+
+
+class TestRules(BaseLintTestCase):
+    """Test the built-in rules."""
+
+    def test_naming(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection tc {
+                struct S { UInt8 Bad }
+                enumeration E { ok }
+                const UInt8 C = 1
+            }
+        """, [NamingRule()])
+        self.assertEqual([d.message for d in diagnostics], [
+            "Invalid type name 'tc'.",
+            "Invalid enumerator name 'ok'.",
+            "Invalid member name 'Bad'."])
+        self.assertEqual([d.lineno for d in diagnostics], [3, 5, 4])
+
+    def test_naming_patterns(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection TC {
+                struct S { UInt8 field_name }
+            }
+        """, [NamingRule(member_pattern=r"^[a-z_]+$")])
+        self.assertEqual(diagnostics, [])
+
+    def test_deprecated_reference(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection TC {
+                <** @deprecated: Use New **>
+                struct Old { UInt8 x }
+                struct New extends Old { }
+            }
+            interface I {
+                attribute Old a
+            }
+        """, [DeprecatedReferenceRule()])
+        self.assertEqual([(d.message, d.lineno) for d in diagnostics], [
+            ("Use of deprecated 'TC.Old': Use New", 9),
+            ("Use of deprecated 'TC.Old': Use New", 6)])
+
+    def test_unused_type(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection TC {
+                typedef Used is UInt8
+                typedef Unused is UInt8
+            }
+            interface I {
+                typedef Local is UInt8
+                attribute Used a
+            }
+        """, [UnusedTypeRule()])
+        self.assertEqual([d.message for d in diagnostics],
+                         ["Unused type 'Unused'."])
+
+    def test_missing_version(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection TC {
+                version { major 1 minor 0 }
+            }
+            interface I {
+            }
+        """, [MissingVersionRule()])
+        self.assertEqual([(d.message, d.lineno) for d in diagnostics],
+                         [("Missing version in 'I'.", 6)])
+
+    def test_enumerator_value(self):
+        diagnostics = self.lint("""
+            package P
+            typeCollection TC {
+                enumeration E {
+                    A = 1
+                    B
+                }
+            }
+        """, [EnumeratorValueRule()])
+        self.assertEqual([(d.message, d.lineno) for d in diagnostics],
+                         [("Enumerator 'E.B' has no value.", 6)])
+
+
+class TestLinter(BaseLintTestCase):
+    """Test the lint engine."""
+
+    FIDL = """
+        package P
+        typeCollection tc {
+            enumeration E { A B }
+        }
+        interface I {
+            method m { in { UInt8 X } }
+        }
+    """
+
+    def test_file_and_line(self):
+        diagnostics = self.lint(self.FIDL, None)
+        fspec = self.get_spec(filename="test.fidl")
+        for diagnostic in diagnostics:
+            self.assertEqual(diagnostic.file, fspec)
+        self.assertIn("{}:3: warning: [naming] Invalid type name 'tc'.".format(
+            fspec), [str(d) for d in diagnostics])
+
+    def test_single_traversal(self):
+        class Counter(Rule):
+            name = "counter"
+            kinds = (ast.Type, ast.Namespace)
+
+            def __init__(self):
+                self.nodes = []
+
+            def check(self, node, context):
+                self.nodes.append(node)
+
+        first = Counter()
+        second = Counter()
+        self.lint(self.FIDL, [first, second])
+        self.assertEqual(first.nodes, second.nodes)
+        self.assertEqual(len(first.nodes), len(set(map(id, first.nodes))))
+
+    def test_context(self):
+        class Parents(Rule):
+            name = "parents"
+            kinds = (ast.Argument,)
+
+            def check(self, node, context):
+                context.report(self, node, "{}.{}".format(
+                    context.namespace.name, context.parent.name))
+
+        diagnostics = self.lint(self.FIDL, [Parents()])
+        self.assertEqual([d.message for d in diagnostics], ["I.m"])
+
+    def test_jobs(self):
+        self.tmp_fidl("other.fidl", """
+            package Other
+            typeCollection other {
+                enumeration F { C D }
+            }
+        """)
+        fidl = self.FIDL.replace(
+            "package P", "package P\nimport model \"other.fidl\"")
+        serial = [str(d) for d in self.lint(fidl, None)]
+        parallel = [str(d) for d in Linter().run(self.processor, jobs=2)]
+        self.assertEqual(serial, parallel)
+        self.assertTrue(any("'other'" in d for d in parallel))
+
+    def test_packages(self):
+        diagnostics = self.lint(self.FIDL, None, packages=[])
+        self.assertEqual(diagnostics, [])
+        with self.assertRaises(LintException) as context:
+            Linter().run(self.processor, packages=["Q"])
+        self.assertEqual(str(context.exception), "Unknown package 'Q'.")
@@ -0,0 +1,341 @@
+"""
+Pyfranca language server tests.
+"""
+
+import json
+from io import BytesIO
+
+from pyfranca.franca_lsp import LanguageServer, Document, fspec_to_uri
+from .test_franca_processor import BaseTestCase
+
+
+COMMON = """package P
+typeCollection TC {
+    <** @description: A timestamp **>
+    typedef Timestamp is UInt64
+    struct S { Timestamp t }
+}
+"""
+
+MODEL = """package P2
+import P.TC.* from "common.fidl"
+interface I {
+    attribute Timestamp a
+    method M { in { P.TC.S s } }
+}
+"""
+
+
+def _frame(message):
+    body = json.dumps(message).encode("utf-8")
+    return "Content-Length: {}\r\n\r\n".format(len(body)).encode("ascii") + \
+        body
+
+
+class TestDocument(BaseTestCase):
+    """Test document indexing."""
+
+    def test_index(self):
+        document = Document("file:///m.fidl", MODEL)
+        self.assertEqual(document.package, "P2")
+        self.assertEqual([(s.name, s.kind) for s in document.declarations],
+                         [("I", "interface"), ("a", "attribute"),
+                          ("M", "method")])
+        self.assertEqual([(s.name, s.namespace)
+                          for s in document.occurrences],
+                         [("Timestamp", "I"), ("P.TC.S", "I")])
+
+    def test_enumerators_and_fields_are_not_references(self):
+        document = Document("file:///m.fidl", """
+            package P
+            typeCollection TC {
+                enumeration E { A B = 2 }
+                struct S extends Base { A a B b }
+                union U { Int32 x }
+            }
+        """)
+        self.assertEqual([s.name for s in document.occurrences],
+                         ["Base", "A", "B"])
+
+    def test_positions(self):
+        document = Document("file:///m.fidl", "ab\ncd\n")
+        self.assertEqual(document.position(4), {"line": 1, "character": 1})
+        self.assertEqual(document.offset({"line": 1, "character": 1}), 4)
+
+    def test_illegal_character(self):
+        document = Document("file:///m.fidl", "package P % typeCollection")
+        self.assertEqual(document.package, "P")
+        self.assertEqual(document.declarations, [])
+
+
+class TestWorkspace(BaseTestCase):
+    """Test language features on a workspace."""
+
+    def setUp(self):
+        super(TestWorkspace, self).setUp()
+        self.tmp_fidl("common.fidl", COMMON)
+        self.fspec = self.tmp_fidl("model.fidl", MODEL)
+        self.server = LanguageServer(BytesIO(), BytesIO())
+        self.server.handle({"id": 0, "method": "initialize", "params": {
+            "rootUri": fspec_to_uri(self.get_spec())}})
+        self.uri = fspec_to_uri(self.fspec)
+        self.workspace = self.server.workspace
+
+    def _request(self, method, params):
+        self.server.outstream = BytesIO()
+        self.server.handle({"jsonrpc": "2.0", "id": 1, "method": method,
+                            "params": params})
+        return self._messages()[-1]["result"]
+
+    def _messages(self):
+        data = self.server.outstream.getvalue()
+        messages = []
+        while data:
+            header, _, data = data.partition(b"\r\n\r\n")
+            length = int(header.split(b":")[1])
+            messages.append(json.loads(data[:length].decode("utf-8")))
+            data = data[length:]
+        return messages
+
+    def _position(self, text, word, occurrence=1):
+        offset = -1
+        for _ in range(occurrence):
+            offset = text.index(word, offset + 1)
+        line = text.count("\n", 0, offset)
+        return {"line": line,
+                "character": offset - (text.rfind("\n", 0, offset) + 1)}
+
+    def test_workspace_indexed(self):
+        self.assertIn("P.TC.Timestamp", self.workspace.definitions)
+        self.assertIn("P2.I.M", self.workspace.definitions)
+
+    def test_definition(self):
+        result = self._request("textDocument/definition", {
+            "textDocument": {"uri": self.uri},
+            "position": self._position(MODEL, "Timestamp")})
+        self.assertEqual(result["uri"],
+                         fspec_to_uri(self.get_spec(filename="common.fidl")))
+        self.assertEqual(result["range"]["start"],
+                         self._position(COMMON, "Timestamp", 1))
+
+    def test_definition_fqn(self):
+        result = self._request("textDocument/definition", {
+            "textDocument": {"uri": self.uri},
+            "position": self._position(MODEL, "P.TC.S")})
+        self.assertEqual(result["range"]["start"],
+                         self._position(COMMON, "S {"))
+
+    def test_hover(self):
+        result = self._request("textDocument/hover", {
+            "textDocument": {"uri": self.uri},
+            "position": self._position(MODEL, "Timestamp")})
+        self.assertIn("`P.TC.Timestamp`", result["contents"]["value"])
+        self.assertIn("A timestamp", result["contents"]["value"])
+        self.assertIn("UInt64", result["contents"]["value"])
+
+    def test_references(self):
+        common_uri = fspec_to_uri(self.get_spec(filename="common.fidl"))
+        result = self._request("textDocument/references", {
+            "textDocument": {"uri": common_uri},
+            "position": self._position(COMMON, "Timestamp", 2),
+            "context": {"includeDeclaration": True}})
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0]["range"]["start"],
+                         self._position(COMMON, "Timestamp", 1))
+        self.assertEqual(sorted(r["uri"] for r in result[1:]),
+                         sorted([common_uri, self.uri]))
+
+    def test_references_of_extended_types(self):
+        text = """package P3
+import P.TC.* from "common.fidl"
+import model "model.fidl"
+typeCollection A {
+    struct S extends P.TC.S { }
+    typedef T is UInt8
+}
+typeCollection B {
+    typedef T is UInt8
+    struct U { A.T a B.T b }
+}
+interface J extends P2.I { }
+"""
+        fspec = self.tmp_fidl("extended.fidl", text)
+        uri = fspec_to_uri(fspec)
+        self.workspace.update(uri, text)
+        result = self._request("textDocument/references", {
+            "textDocument": {"uri": uri},
+            "position": self._position(text, "P.TC.S"),
+            "context": {"includeDeclaration": False}})
+        self.assertEqual(
+            [(r["uri"], r["range"]["start"]) for r in result],
+            [(uri, self._position(text, "P.TC.S")),
+             (self.uri, self._position(MODEL, "P.TC.S"))])
+        result = self._request("textDocument/references", {
+            "textDocument": {"uri": uri},
+            "position": self._position(text, "T is"),
+            "context": {"includeDeclaration": False}})
+        self.assertEqual([r["range"]["start"] for r in result],
+                         [self._position(text, "A.T")])
+        result = self._request("textDocument/references", {
+            "textDocument": {"uri": self.uri},
+            "position": self._position(MODEL, "I {"),
+            "context": {"includeDeclaration": False}})
+        self.assertEqual([r["range"]["start"] for r in result],
+                         [self._position(text, "P2.I")])
+
+    def test_workspace_link_reused(self):
+        text = """
+            package P3
+            typeCollection TC { typedef T is Int8 }
+        """
+        self.workspace.update(
+            fspec_to_uri(self.tmp_fidl("other.fidl", text)), text)
+        processor = self.workspace.link_all()
+        self.assertIs(self.workspace.link_all(), processor)
+        p2 = processor.packages["P2"]
+        p3 = processor.packages["P3"]
+        misses = self.workspace.parse_cache.misses
+        self.workspace.update(
+            fspec_to_uri(self.get_spec(filename="common.fidl")),
+            COMMON.replace("UInt64", "Int64"))
+        self.assertIs(self.workspace.link_all(), processor)
+        # Only the edited document is parsed, its importer is linked again.
+        self.assertEqual(self.workspace.parse_cache.misses, misses + 1)
+        self.assertIsNot(processor.packages["P2"], p2)
+        self.assertIs(processor.packages["P3"], p3)
+        timestamp = processor.packages["P"]["TC"].typedefs["Timestamp"]
+        self.assertEqual(len(processor.get_usages(timestamp)), 2)
+        self.assertEqual(processor.packages["P2"]["I"].attributes["a"]
+                         .type.reference, timestamp)
+
+    def test_workspace_link_retries_failed_documents(self):
+        common_uri = fspec_to_uri(self.get_spec(filename="common.fidl"))
+        self.workspace.update(common_uri, COMMON.replace("TC", "TC2"))
+        processor = self.workspace.link_all()
+        self.assertNotIn("P2", processor.packages)
+        self.workspace.update(common_uri, COMMON)
+        self.assertIs(self.workspace.link_all(), processor)
+        self.assertIn("P2", processor.packages)
+
+    def test_workspace_link_after_removal(self):
+        processor = self.workspace.link_all()
+        self.workspace.remove(fspec_to_uri(self.fspec))
+        processor = self.workspace.link_all()
+        self.assertNotIn("P2", processor.packages)
+        self.assertIn("P", processor.packages)
+
+    def test_completion(self):
+        result = self._request("textDocument/completion", {
+            "textDocument": {"uri": self.uri},
+            "position": self._position(MODEL, "S s")})
+        labels = [item["label"] for item in result["items"]]
+        self.assertIn("P.TC.S", labels)
+        self.assertIn("P.TC.Timestamp", labels)
+        self.assertNotIn("P2.I.M", labels)
+
+    def test_diagnostics(self):
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": self.uri, "version": 1, "text": MODEL}}})
+        self.assertEqual(self._messages()[-1]["params"]["diagnostics"], [])
+        self.server.outstream = BytesIO()
+        text = MODEL.replace("Timestamp a", "Unknown a")
+        self.server.handle({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": self.uri, "version": 2},
+            "contentChanges": [{"text": text}]}})
+        diagnostics = self._messages()[-1]["params"]["diagnostics"]
+        self.assertEqual(len(diagnostics), 1)
+        self.assertEqual(diagnostics[0]["message"],
+                         "Unresolved reference 'Unknown'.")
+        self.assertEqual(diagnostics[0]["range"]["start"],
+                         self._position(text, "Unknown"))
+
+    def test_syntax_error_diagnostics(self):
+        text = MODEL.replace("method M", "method")
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": self.uri, "version": 1, "text": text}}})
+        diagnostics = self._messages()[-1]["params"]["diagnostics"]
+        self.assertEqual(diagnostics[0]["range"]["start"]["line"], 4)
+
+    def test_all_syntax_errors(self):
+        text = MODEL.replace("Timestamp a", "Timestamp a ?").replace(
+            "method M", "method")
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": self.uri, "version": 1, "text": text}}})
+        diagnostics = self._messages()[-1]["params"]["diagnostics"]
+        self.assertEqual([d["range"] for d in diagnostics], [
+            {"start": {"line": 3, "character": 26},
+             "end": {"line": 3, "character": 27}},
+            {"start": {"line": 4, "character": 11},
+             "end": {"line": 4, "character": 12}},
+        ])
+
+    def test_unsaved_import(self):
+        common_uri = fspec_to_uri(self.get_spec(filename="common.fidl"))
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": common_uri, "version": 1,
+                             "text": COMMON.replace("Timestamp", "Time")}}})
+        diagnostics = self.workspace.diagnostics(self.fspec)
+        self.assertEqual(diagnostics[0]["message"],
+                         "Unresolved reference 'Timestamp'.")
+
+    def test_only_edited_document_is_parsed(self):
+        self.workspace.diagnostics(self.fspec)
+        misses = self.workspace.parse_cache.misses
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": self.uri, "version": 1,
+                             "text": MODEL + "\n"}}})
+        self.assertEqual(self.workspace.parse_cache.misses, misses + 1)
+
+    def test_link_reused(self):
+        processor, _ = self.workspace.link(self.fspec)
+        self.assertIs(self.workspace.link(self.fspec)[0], processor)
+        self.workspace.update(
+            fspec_to_uri(self.get_spec(filename="common.fidl")), COMMON)
+        self.assertIsNot(self.workspace.link(self.fspec)[0], processor)
+
+
+class TestProtocol(BaseTestCase):
+    """Test the JSON-RPC transport."""
+
+    def _handle(self, message):
+        server = LanguageServer(BytesIO(), BytesIO())
+        server.handle(message)
+        return json.loads(server.outstream.getvalue().partition(
+            b"\r\n\r\n")[2].decode("utf-8"))
+
+    def test_invalid_params(self):
+        response = self._handle({"jsonrpc": "2.0", "id": 1, "params": {},
+                                 "method": "textDocument/definition"})
+        self.assertEqual(response["id"], 1)
+        self.assertEqual(response["error"]["code"], -32602)
+
+    def test_failed_notification(self):
+        message = self._handle({"jsonrpc": "2.0", "params": {},
+                                "method": "textDocument/didOpen"})
+        self.assertEqual(message["method"], "window/logMessage")
+        self.assertIn("textDocument/didOpen", message["params"]["message"])
+
+    def test_invalid_message(self):
+        instream = BytesIO(
+            b"Content-Length: 1\r\n\r\n{" +
+            _frame({"jsonrpc": "2.0", "id": 1, "method": "shutdown"}))
+        outstream = BytesIO()
+        LanguageServer(instream, outstream).serve()
+        data = outstream.getvalue()
+        self.assertIn(b'"code": -32700', data)
+        self.assertIn(b'"id": 1', data)
+
+    def test_serve(self):
+        instream = BytesIO(
+            _frame({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                    "params": {}}) +
+            _frame({"jsonrpc": "2.0", "id": 2, "method": "nosuch"}) +
+            _frame({"jsonrpc": "2.0", "id": 3, "method": "shutdown"}) +
+            _frame({"jsonrpc": "2.0", "method": "exit"}))
+        outstream = BytesIO()
+        server = LanguageServer(instream, outstream)
+        server.serve()
+        data = outstream.getvalue()
+        self.assertIn(b'"definitionProvider": true', data)
+        self.assertIn(b'"code": -32601', data)
+        self.assertFalse(server.running)
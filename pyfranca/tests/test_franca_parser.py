@@ -2,7 +2,9 @@
 Pyfranca parser tests.
 """
 
+import gc
 import unittest
+import weakref
 
 from pyfranca import LexerException, ParserException, Parser, ast
 
@@ -1409,3 +1411,244 @@ class TestConstants(BaseTestCase):
         """)
         self.assertEqual(str(context.exception),
                          "Syntax error at line 4 near 'UInt32'.")
+
+
+class TestParserReuse(BaseTestCase):
+    """Test parsing several inputs with the same parser."""
+
+    def test_line_numbers(self):
+        parser = Parser()
+        parser.parse("package P\n")
+        with self.assertRaises(ParserException) as context:
+            parser.parse("package P\n\ntypeCollection {")
+        self.assertEqual(str(context.exception),
+                         "Syntax error at line 3 near '{'.")
+
+    def test_declaration_line_numbers(self):
+        parser = Parser()
+        parser.parse("package P\n")
+        package = parser.parse(
+            "package P\n"
+            "typeCollection TC {\n"
+            "    struct S {\n"
+            "        UInt8 x\n"
+            "    }\n"
+            "}\n")
+        self.assertEqual(package.lineno, 1)
+        typecollection = package.typecollections["TC"]
+        self.assertEqual(typecollection.lineno, 2)
+        self.assertEqual(typecollection.structs["S"].lineno, 3)
+        self.assertEqual(typecollection.structs["S"].fields["x"].lineno, 4)
+
+    def test_model_not_kept(self):
+        parser = Parser()
+        ref = weakref.ref(parser.parse("package P\ntypeCollection TC { }\n"))
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class TestLossless(BaseTestCase):
+    """Test parsing in lossless mode."""
+
+    FIDL = (
+        "// Header.\n"
+        "package P\n"
+        "typeCollection TC {\n"
+        "    <** @description: Sample. **>\n"
+        "    struct S { /* Fields. */\n"
+        "        UInt8 x\n"
+        "        P.TC.E[] y // Trailing.\n"
+        "    }\n"
+        "    enumeration E { A B = 0x10 }\n"
+        "    const UInt16 C = 0b101\n"
+        "}\n")
+
+    def test_spans(self):
+        package = Parser().parse(self.FIDL, lossless=True)
+        source_map = package.source_maps[0]
+        typecollection = package.typecollections["TC"]
+        struct = typecollection.structs["S"]
+        self.assertEqual(source_map.source(package), self.FIDL[11:-1])
+        self.assertTrue(source_map.source(struct).startswith(
+            "<** @description: Sample. **>\n    struct S {"))
+        self.assertTrue(source_map.source(struct).endswith("// Trailing.\n    }"))
+        self.assertEqual(source_map.source(struct.fields["y"]), "P.TC.E[] y")
+        self.assertEqual(source_map.source(struct.fields["y"].type.type),
+                         "P.TC.E")
+        enumeration = typecollection.enumerations["E"]
+        self.assertEqual(source_map.source(enumeration.enumerators["B"]),
+                         "B = 0x10")
+        constant = typecollection.constants["C"]
+        self.assertEqual(source_map.source(constant), "const UInt16 C = 0b101")
+        self.assertEqual(source_map.source(constant.value), "0b101")
+        self.assertEqual(source_map.source(constant.type), "UInt16")
+
+    def test_node_at(self):
+        package = Parser().parse(self.FIDL, lossless=True)
+        source_map = package.source_maps[0]
+        struct = package.typecollections["TC"].structs["S"]
+        offset = self.FIDL.index("UInt8 x")
+        self.assertIs(source_map.node_at(offset), struct.fields["x"].type)
+        self.assertIs(source_map.node_at(offset + 6), struct.fields["x"])
+        self.assertIs(source_map.node_at(self.FIDL.index("/*")), struct)
+
+    def test_trivia(self):
+        package = Parser().parse(self.FIDL, lossless=True)
+        source_map = package.source_maps[0]
+        pieces = list(source_map.pieces())
+        self.assertEqual("".join(self.FIDL[start:end]
+                                 for _, start, end in pieces), self.FIDL)
+        self.assertEqual([self.FIDL[start:end]
+                          for kind, start, end in pieces
+                          if kind == "comment"],
+                         ["// Header.", "/* Fields. */", "// Trailing."])
+        struct = package.typecollections["TC"].structs["S"]
+        start = source_map.span(struct.fields["x"])[0]
+        self.assertEqual([self.FIDL[first:last] for first, last in
+                          source_map.comments_before(start)],
+                         ["/* Fields. */"])
+
+    def test_default_mode(self):
+        parser = Parser()
+        package = parser.parse(self.FIDL)
+        self.assertEqual(package.source_maps, ())
+        self.assertNotIn("source_maps", vars(package))
+        # The lexer drops comments again after a lossless parse.
+        parser.parse(self.FIDL, lossless=True)
+        self.assertEqual(parser.parse(self.FIDL).name, "P")
+
+
+class TestErrorRecovery(BaseTestCase):
+    """Test collecting several errors with error recovery."""
+
+    FIDL = (
+        "package P\n"
+        "import P.* from\n"
+        "typeCollection TC {\n"
+        "    struct S { UInt8 a UInt8 = }\n"
+        "    enumeration E { A = x B }\n"
+        "    typedef T is UInt8 ?\n"
+        "    union U { UInt8 }\n"
+        "}\n"
+        "interface I {\n"
+        "    method m { in { UInt8 } }\n"
+        "    attribute UInt8\n"
+        "    broadcast b { out { UInt8 c } }\n"
+        "}\n")
+
+    def _errors(self, data, max_errors=100, lossless=False):
+        with self.assertRaises(ParserException) as context:
+            Parser().parse(data, lossless=lossless, max_errors=max_errors)
+        return context.exception.errors
+
+    def test_errors(self):
+        errors = self._errors(self.FIDL)
+        self.assertEqual([(error.lineno, error.message) for error in errors], [
+            (3, "Syntax error at line 3 near 'typeCollection'."),
+            (4, "Syntax error at line 4 near '='."),
+            (5, "Syntax error at line 5 near 'x'."),
+            (6, "Illegal character '?' at line 6."),
+            (7, "Syntax error at line 7 near '}'."),
+            (10, "Syntax error at line 10 near '}'."),
+            (12, "Syntax error at line 12 near 'broadcast'."),
+        ])
+        self.assertEqual(errors[1].lexpos, self.FIDL.index("= }"))
+
+    def test_max_errors(self):
+        errors = self._errors(self.FIDL, max_errors=2)
+        self.assertEqual([error.lineno for error in errors], [3, 4])
+        errors = self._errors("package P ? ? ?", max_errors=2)
+        self.assertEqual(len(errors), 2)
+
+    def test_end_of_file(self):
+        errors = self._errors(
+            "package P\ninterface I { method m { in {\n", lossless=True)
+        self.assertEqual([error.message for error in errors],
+                         ["Reached unexpected end of file."])
+
+    def test_semantic_error(self):
+        errors = self._errors("package P\n"
+                              "typeCollection TC { struct S { UInt8 } }\n"
+                              "interface I {\n"
+                              "    method m { in { UInt8 a UInt8 a } }\n"
+                              "}\n")
+        self.assertEqual(len(errors), 2)
+        self.assertIn("Duplicate", errors[1].message)
+
+    def test_valid(self):
+        package = Parser().parse("package P typeCollection TC { }",
+                                 max_errors=10)
+        self.assertEqual(package.name, "P")
+
+    def test_default_mode(self):
+        parser = Parser()
+        with self.assertRaises(ParserException) as context:
+            parser.parse(self.FIDL)
+        self.assertEqual(context.exception.errors, [])
+        self._errors(self.FIDL)
+        with self.assertRaises(LexerException):
+            parser.parse("package P ?")
+
+
+class TestLocations(BaseTestCase):
+    """Test source spans of nodes and error locations."""
+
+    FIDL = (
+        "package P.Q\n"
+        "import P.TC.* from \"common.fidl\"\n"
+        "typeCollection TC {\n"
+        "    struct S { UInt8 a  P.TC.E[] b }\n"
+        "    enumeration E { A B = 3 }\n"
+        "}\n"
+        "interface I { method m { error E } }\n")
+
+    def _source(self, node):
+        return self.FIDL[node.span[0]:node.span[1]]
+
+    def test_spans(self):
+        package = self._assertParse(self.FIDL)
+        self.assertEqual(self._source(package), "P.Q")
+        self.assertEqual(self._source(package.imports[0]),
+                         "import P.TC.* from \"common.fidl\"")
+        typecollection = package.typecollections["TC"]
+        self.assertEqual(self._source(typecollection), "TC")
+        struct = typecollection.structs["S"]
+        self.assertEqual(self._source(struct), "S")
+        self.assertEqual(self._source(struct.fields["b"]), "b")
+        self.assertEqual(self._source(struct.fields["b"].type.type),
+                         "P.TC.E")
+        enumerator = typecollection.enumerations["E"].enumerators["B"]
+        self.assertEqual(self._source(enumerator), "B")
+        method = package.interfaces["I"].methods["m"]
+        self.assertEqual(self._source(method.errors), "E")
+        self.assertEqual(method.errors.lineno, 7)
+
+    def test_line_index(self):
+        line_index = ast.LineIndex("ab\n\ncd")
+        self.assertEqual(line_index.position(0), (1, 1))
+        self.assertEqual(line_index.position(2), (1, 3))
+        self.assertEqual(line_index.position(3), (2, 1))
+        self.assertEqual(line_index.position(5), (3, 2))
+
+    def test_syntax_error(self):
+        with self.assertRaises(ParserException) as context:
+            self._parse("package P\ntypeCollection TC {\n  typedef A B }")
+        error = context.exception
+        self.assertEqual((error.lineno, error.column, error.lexpos),
+                         (3, 13, 42))
+
+    def test_semantic_error(self):
+        with self.assertRaises(ParserException) as context:
+            self._parse("package P\ninterface I {\n"
+                        "  method m { in { UInt8 a UInt8 a } }\n}")
+        self.assertIn("Duplicate", context.exception.message)
+        self.assertEqual(context.exception.lineno, 3)
+        self.assertIsNotNone(context.exception.column)
+
+    def test_recovered_errors(self):
+        with self.assertRaises(ParserException) as context:
+            Parser().parse("package P\n  ?\ntypeCollection TC {\n  typedef }",
+                           max_errors=10)
+        self.assertEqual([(error.lineno, error.column)
+                          for error in context.exception.errors],
+                         [(2, 3), (4, 11)])
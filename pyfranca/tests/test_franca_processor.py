@@ -5,9 +5,14 @@ Pyfranca processor tests.
 import unittest
 import os
 import errno
+import gc
 import shutil
+import pickle
+import threading
+import weakref
 
-from pyfranca import ProcessorException, Processor, ast
+from pyfranca import ProcessorException, ParserException, Processor, ast
+from pyfranca.franca_processor import ParseCache
 
 
 class BaseTestCase(unittest.TestCase):
@@ -995,3 +1000,886 @@ class TestReferences(BaseTestCase):
             self.assertEqual(d2.type.reference, a)
 
 
+
+
+class TestImportString(BaseTestCase):
+    """Test importing models from strings."""
+
+    def test_import_string(self):
+        package = self.processor.import_string("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        self.assertEqual(package.name, "P")
+        self.assertIn(os.path.abspath("test.fidl"), self.processor.files)
+
+    def test_registered_import(self):
+        self.processor.register_string(
+            self.get_spec(filename="common.fidl"), """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        fspec = self.tmp_fidl("test.fidl", """
+            package P2
+            import P.TC.* from "common.fidl"
+            typeCollection TC2 { typedef B is A }
+        """)
+        self.processor.import_file(fspec)
+        b = self.processor.packages["P2"].typecollections["TC2"].typedefs["B"]
+        self.assertEqual(b.type.reference.name, "A")
+
+    def test_lossless(self):
+        self.processor.lossless = True
+        package = self.processor.import_string("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        source_map = package.source_maps[0]
+        self.assertEqual(source_map.file, os.path.abspath("test.fidl"))
+        typedef = package.typecollections["TC"].typedefs["A"]
+        self.assertEqual(source_map.source(typedef), "typedef A is Int32")
+
+    def test_max_errors(self):
+        self.processor.max_errors = 10
+        with self.assertRaises(ParserException) as context:
+            self.processor.import_string("test.fidl", """
+                package P
+                typeCollection TC { typedef A is }
+                interface I { attribute UInt8 }
+            """)
+        errors = context.exception.errors
+        self.assertEqual([error.lineno for error in errors], [3, 4])
+        self.assertEqual(errors[0].file, os.path.abspath("test.fidl"))
+
+
+class TestUsages(BaseTestCase):
+    """Test the reverse reference index."""
+
+    def setUp(self):
+        super(TestUsages, self).setUp()
+        self.tmp_fidl("common.fidl", """
+            package Common
+            typeCollection Types {
+                typedef Timestamp is UInt64
+                typedef Unused is UInt64
+                struct Sample { Timestamp time Float value }
+                struct Sample2 extends Sample { }
+                array Samples of Sample
+                map SampleMap { Timestamp to Sample[] }
+                enumeration Errors { FAILED }
+            }
+        """)
+        fspec = self.tmp_fidl("test.fidl", """
+            package P
+            import model "common.fidl"
+            interface I {
+                attribute Timestamp now
+                method Get { out { Samples samples } error Errors }
+                broadcast Changed { out { Sample2 sample } }
+            }
+            interface I2 extends I { }
+            interface I3 { method M { in { UInt8 x } } }
+        """)
+        self.processor.import_file(fspec)
+        self.types = self.processor.packages["Common"].typecollections["Types"]
+        self.i = self.processor.packages["P"].interfaces["I"]
+
+    def _usages(self, item):
+        return [(usage.item.name, usage.owner.name, usage.kind)
+                for usage in self.processor.get_usages(item)]
+
+    def test_direct_usages(self):
+        self.assertEqual(self._usages(self.types["Timestamp"]), [
+            ("time", "Sample", "field"),
+            ("SampleMap", "SampleMap", "key"),
+            ("now", "now", "attribute"),
+        ])
+        self.assertEqual(self._usages(self.types["Sample"]), [
+            ("Sample2", "Sample2", "extends"),
+            ("Samples", "Samples", "element"),
+            ("SampleMap", "SampleMap", "value"),
+        ])
+        self.assertEqual(self._usages(self.types["Errors"]), [
+            ("Get", "Get", "error"),
+        ])
+        self.assertEqual(self._usages(self.types["Samples"]), [
+            ("samples", "Get", "argument"),
+        ])
+        self.assertEqual(self._usages(self.i), [
+            ("I2", "I2", "extends"),
+        ])
+        self.assertEqual(self._usages(self.types["Unused"]), [])
+
+    def test_impact(self):
+        affected = self.processor.impact(self.types["Timestamp"])
+        names = [item.name for item in affected]
+        self.assertEqual(set(names), set([
+            "Sample", "SampleMap", "now", "Types", "Sample2", "Samples", "I",
+            "Changed", "Get", "I2"]))
+        self.assertEqual(names[:3], ["Sample", "SampleMap", "now"])
+        self.assertNotIn(self.processor.packages["P"].interfaces["I3"],
+                         affected)
+        self.assertEqual(self.processor.impact(self.types["Unused"]), [])
+
+    def test_failed_import_does_not_register_usages(self):
+        count = len(self.processor.get_usages(self.types["Timestamp"]))
+        with self.assertRaises(ProcessorException):
+            self.import_tmp_fidl("broken.fidl", """
+                package P3
+                import model "common.fidl"
+                typeCollection TC {
+                    typedef A is Timestamp
+                    typedef B is Unknown
+                }
+            """)
+        self.assertEqual(len(self.processor.get_usages(
+            self.types["Timestamp"])), count)
+
+
+class TestInheritance(BaseTestCase):
+    """Test flattened inheritance views."""
+
+    def test_struct_fields(self):
+        self.import_tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC {
+                struct S3 extends S2 { Int32 c }
+                struct S2 extends S { Int32 b }
+                struct S { Int32 a }
+                union U { Int32 a }
+                union U2 extends U { String b }
+            }
+        """)
+        tc = self.processor.packages["P"].typecollections["TC"]
+        self.assertEqual(list(self.processor.all_fields(tc.structs["S3"])),
+                         ["a", "b", "c"])
+        self.assertEqual(list(self.processor.all_fields(tc.structs["S"])),
+                         ["a"])
+        self.assertEqual(list(self.processor.all_fields(tc.unions["U2"])),
+                         ["a", "b"])
+        self.assertIs(self.processor.all_fields(tc.structs["S3"]),
+                      self.processor.all_fields(tc.structs["S3"]))
+
+    def test_enumerators(self):
+        self.import_tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC {
+                enumeration E { A B }
+                enumeration E2 extends E { C = 5 }
+            }
+        """)
+        tc = self.processor.packages["P"].typecollections["TC"]
+        self.assertEqual(
+            list(self.processor.all_enumerators(tc.enumerations["E2"])),
+            ["A", "B", "C"])
+
+    def test_interface_members(self):
+        self.import_tmp_fidl("test.fidl", """
+            package P
+            interface I {
+                attribute Int32 a
+                method M {}
+                broadcast B {}
+            }
+            interface I2 extends I {
+                method M2 {}
+            }
+        """)
+        i2 = self.processor.packages["P"].interfaces["I2"]
+        self.assertEqual(list(self.processor.all_methods(i2)), ["M", "M2"])
+        self.assertEqual(list(self.processor.all_attributes(i2)), ["a"])
+        self.assertEqual(list(self.processor.all_broadcasts(i2)), ["B"])
+
+    def test_circular_struct_extension(self):
+        with self.assertRaises(ProcessorException) as context:
+            self.import_tmp_fidl("test.fidl", """
+                package P
+                typeCollection TC {
+                    struct S extends S2 { Int32 a }
+                    struct S2 extends S { Int32 b }
+                }
+            """)
+        self.assertEqual(str(context.exception),
+                         "Circular struct extension 'S'.")
+
+    def test_circular_interface_extension(self):
+        with self.assertRaises(ProcessorException) as context:
+            self.import_tmp_fidl("test.fidl", """
+                package P
+                interface I extends I { }
+            """)
+        self.assertEqual(str(context.exception),
+                         "Circular interface extension 'I'.")
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.processor.all_fields(ast.Enumeration("E"))
+
+    def test_merge_invalidates_views(self):
+        self.tmp_fidl("base.fidl", """
+            package P
+            typeCollection TC { struct S { Int32 a } }
+        """)
+        self.import_tmp_fidl("derived.fidl", """
+            package P2
+            import model "base.fidl"
+            typeCollection TC2 { struct S2 extends S { Int32 b } }
+        """)
+        s2 = self.processor.packages["P2"].typecollections["TC2"].structs["S2"]
+        view = self.processor.all_fields(s2)
+        self.import_tmp_fidl("more.fidl", """
+            package P
+            typeCollection TC3 { struct S3 { Int32 c } }
+        """)
+        self.assertIsNot(self.processor.all_fields(s2), view)
+        self.assertEqual(list(self.processor.all_fields(s2)), ["a", "b"])
+        tc3 = self.processor.packages["P"].typecollections["TC3"]
+        self.assertEqual(list(self.processor.all_fields(tc3.structs["S3"])),
+                         ["c"])
+
+
+class TestErrorLocations(BaseTestCase):
+    """Test the location of processor errors."""
+
+    def _error(self, content, exception=ProcessorException):
+        fspec = self.tmp_fidl("test.fidl", content)
+        with self.assertRaises(exception) as context:
+            self.processor.import_file(fspec)
+        error = context.exception
+        self.assertEqual(error.file, fspec)
+        return error.lineno, error.column
+
+    def test_unresolved_reference(self):
+        self.assertEqual(self._error(
+            "package P\n"
+            "typeCollection TC {\n"
+            "    struct S { UInt8 a  Unknown[] b }\n"
+            "}\n"), (3, 25))
+
+    def test_invalid_extension(self):
+        self.assertEqual(self._error(
+            "package P\n"
+            "typeCollection TC {\n"
+            "    typedef A is UInt8\n"
+            "    struct S extends A { }\n"
+            "}\n"), (4, 12))
+        self.assertEqual(self._error(
+            "package P\n"
+            "interface I extends Unknown { }\n"), (2, 11))
+
+    def test_circular_extension(self):
+        self.assertEqual(self._error(
+            "package P\n"
+            "typeCollection TC {\n"
+            "    struct A extends B { }\n"
+            "    struct B extends A { }\n"
+            "}\n"), (3, 12))
+
+    def test_import(self):
+        self.assertEqual(self._error(
+            "package P\n"
+            "  import model \"nosuch.fidl\"\n"), (2, 3))
+
+    def test_syntax_error(self):
+        self.assertEqual(self._error(
+            "package P\n"
+            "typeCollection TC { typedef }\n", ParserException), (2, 29))
+
+
+class TestConcurrency(BaseTestCase):
+    """Test queries concurrent to imports."""
+
+    def test_concurrent_readers(self):
+        self.tmp_fidl("base.fidl", """
+            package Base
+            typeCollection Types { struct Base { UInt8 id } }
+        """)
+        fspecs = []
+        for index in range(40):
+            # Half of the files extend the same package.
+            fspecs.append(self.tmp_fidl("model{}.fidl".format(index), """
+                package {}
+                import Base.Types.* from "base.fidl"
+                typeCollection Types{} {{
+                    typedef T{} is UInt32
+                    struct S{} extends Base {{ T{} value }}
+                }}
+            """.format("Shared" if index % 2 else "P{}".format(index),
+                       index, index, index, index)))
+        self.processor.import_file(self.get_spec(filename="base.fidl"))
+        base = self.processor.packages["Base"].typecollections["Types"] \
+            .structs["Base"]
+
+        done = threading.Event()
+        halfway = threading.Event()
+        observed = threading.Event()
+        errors = []
+
+        def query():
+            with self.processor.reading():
+                structs = [
+                    struct
+                    for package in self.processor.packages.values()
+                    for typecollection in package.typecollections.values()
+                    for struct in typecollection.structs.values()
+                    if struct is not base]
+                for struct in structs:
+                    # Published packages are fully linked.
+                    self.assertIs(struct.reference, base)
+                    self.assertIsNotNone(
+                        struct.fields["value"].type.reference)
+                    self.assertEqual(
+                        list(self.processor.all_fields(struct)),
+                        ["id", "value"])
+                self.assertEqual(len(self.processor.get_usages(base)),
+                                 len(structs))
+                self.assertIs(self.processor.get_package("Base").
+                              typecollections["Types"].structs["Base"], base)
+                return len(structs)
+
+        def read(seen, ready):
+            try:
+                while not done.is_set():
+                    after_halfway = halfway.is_set()
+                    seen.append(query())
+                    ready.set()
+                    if after_halfway:
+                        observed.set()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                ready.set()
+                observed.set()
+
+        seens = [[] for _ in range(4)]
+        ready = [threading.Event() for _ in seens]
+        readers = [threading.Thread(target=read, args=(seen, event))
+                   for seen, event in zip(seens, ready)]
+        for reader in readers:
+            reader.start()
+        try:
+            # Every reader queries before the imports start, and at least
+            #   one between the first and the second half of them.
+            for event in ready:
+                self.assertTrue(event.wait(60))
+            for index, fspec in enumerate(fspecs):
+                if index == len(fspecs) // 2:
+                    halfway.set()
+                    self.assertTrue(observed.wait(60))
+                self.processor.import_file(fspec)
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+        self.assertEqual(errors, [])
+        for seen in seens:
+            self.assertEqual(seen[0], 0)
+            # Packages appear one at a time, never partially.
+            self.assertEqual(seen, sorted(seen))
+        self.assertIn(20, [count for seen in seens for count in seen])
+        with self.processor.reading():
+            self.assertEqual(len(self.processor.files), 41)
+            self.assertEqual(
+                len(self.processor.packages["Shared"].typecollections), 20)
+
+    def test_get_package_during_import(self):
+        self.import_tmp_fidl("base.fidl", """
+            package Base
+            typeCollection Types { }
+        """)
+        importing = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            # Stand-in for an import in progress.
+            with self.processor._import_lock:
+                importing.set()
+                release.wait(30)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        try:
+            self.assertTrue(importing.wait(30))
+            self.assertIsNotNone(self.processor.get_package("Base"))
+            self.assertIsNone(self.processor.get_package("Unknown"))
+            self.assertTrue(holder.is_alive())
+        finally:
+            release.set()
+            holder.join()
+
+
+class TestFork(BaseTestCase):
+    """Test forking a linked processor."""
+
+    def setUp(self):
+        super(TestFork, self).setUp()
+        self.import_tmp_fidl("base.fidl", """
+            package P
+            typeCollection TC {
+                typedef Timestamp is UInt64
+                struct S { Timestamp t }
+            }
+        """)
+        self.package = self.processor.packages["P"]
+        self.tc = self.package.typecollections["TC"]
+        self.fork = self.processor.fork()
+
+    def test_shared_model(self):
+        self.assertIs(self.fork.packages["P"], self.package)
+        self.assertIs(self.fork.files[self.get_spec(filename="base.fidl")],
+                      self.package)
+        self.assertEqual(len(self.fork.get_usages(self.tc["Timestamp"])), 1)
+        self.assertIs(self.fork.import_file(self.get_spec(filename="base.fidl")),
+                      self.package)
+
+    def test_overlay(self):
+        fspec = self.tmp_fidl("overlay.fidl", """
+            package P
+            import P.TC.* from "base.fidl"
+            typeCollection Overlay { struct S2 { Timestamp t } }
+        """)
+        package = self.fork.import_file(fspec)
+        # The fork copies the package it extends.
+        self.assertIsNot(self.fork.packages["P"], self.package)
+        self.assertIs(self.fork.packages["P"].typecollections["TC"], self.tc)
+        self.assertIn("Overlay", self.fork.packages["P"])
+        self.assertIs(self.fork.files[self.get_spec(filename="base.fidl")],
+                      self.fork.packages["P"])
+        self.assertEqual(len(self.fork.get_usages(self.tc["Timestamp"])), 2)
+        self.assertIsNotNone(package.typecollections["Overlay"]
+                             .structs["S2"].fields["t"].type.reference)
+        # The original processor is not affected.
+        self.assertNotIn("Overlay", self.package)
+        self.assertEqual(self.package.files, [self.get_spec(filename="base.fidl")])
+        self.assertNotIn(fspec, self.processor.files)
+        self.assertEqual(
+            len(self.processor.get_usages(self.tc["Timestamp"])), 1)
+
+    def test_import_into_original(self):
+        self.import_tmp_fidl("more.fidl", """
+            package P
+            import P.TC.* from "base.fidl"
+            typeCollection More { typedef T is Timestamp }
+        """)
+        self.assertIn("More", self.processor.packages["P"])
+        self.assertEqual(
+            len(self.processor.get_usages(self.tc["Timestamp"])), 2)
+        self.assertIs(self.fork.packages["P"], self.package)
+        self.assertNotIn("More", self.package)
+        self.assertEqual(len(self.fork.get_usages(self.tc["Timestamp"])), 1)
+
+    def test_fork_of_fork(self):
+        fork2 = self.fork.fork()
+        fork2.import_string("a.fidl", """
+            package A
+            import model "{}"
+            typeCollection TC {{ typedef A is P.TC.Timestamp }}
+        """.format(self.get_spec(filename="base.fidl")))
+        self.assertIn("A", fork2.packages)
+        self.assertNotIn("A", self.fork.packages)
+        self.assertEqual(len(fork2.get_usages(self.tc["Timestamp"])), 2)
+        self.assertEqual(len(self.fork.get_usages(self.tc["Timestamp"])), 1)
+
+
+class TestEviction(BaseTestCase):
+    """Test bounding the number of loaded packages."""
+
+    def setUp(self):
+        super(TestEviction, self).setUp()
+        self.tmp_fidl("common.fidl", """
+            package Common
+            typeCollection Types { typedef T is UInt32 }
+        """)
+        self.tmp_fidl("a.fidl", """
+            package A
+            import Common.Types.* from "common.fidl"
+            typeCollection Types { struct S { T t } }
+        """)
+        self.tmp_fidl("c.fidl", """
+            package C
+            typeCollection Types { typedef U is UInt8 }
+        """)
+        self.processor.max_packages = 2
+
+    def _import(self, filename):
+        return self.processor.import_file(self.get_spec(filename=filename))
+
+    def test_least_recently_used(self):
+        self._import("c.fidl")
+        self._import("a.fidl")
+        self.assertEqual(sorted(self.processor.packages), ["A", "Common"])
+        self.assertNotIn(self.get_spec(filename="c.fidl"),
+                         self.processor.files)
+        self.assertEqual(self.processor.evictions, 1)
+        self.assertEqual(self.processor.get_package("C").name, "C")
+        # Common is still imported by A.
+        self.assertEqual(sorted(self.processor.packages), ["C", "Common"])
+        self.assertEqual(self.processor.evictions, 2)
+        self.assertIsNone(self.processor.get_package("Unknown"))
+
+    def test_imported_packages_are_kept(self):
+        self.processor.max_packages = 1
+        self._import("a.fidl")
+        self.assertEqual(sorted(self.processor.packages), ["A", "Common"])
+        self.assertEqual(self.processor.evictions, 0)
+        # Evicting A releases Common.
+        self._import("c.fidl")
+        self.assertEqual(list(self.processor.packages), ["C"])
+        self.assertEqual(self.processor.evictions, 2)
+
+    def test_evicted_usages(self):
+        self._import("a.fidl")
+        t = self.processor.packages["Common"]["Types"].typedefs["T"]
+        self.assertEqual(len(self.processor.get_usages(t)), 1)
+        self.processor.max_packages = 1
+        self._import("c.fidl")
+        self.assertEqual(self.processor.get_usages(t), [])
+
+    def test_reload(self):
+        self.processor.parse_cache = ParseCache()
+        self._import("a.fidl")
+        self._import("c.fidl")
+        self.assertNotIn("A", self.processor.packages)
+        a = self.processor.get_package("A")
+        self.assertEqual(self.processor.parse_cache.hits, 1)
+        common = self.processor.packages["Common"]
+        self.assertIs(a["Types"].structs["S"].fields["t"].type.reference,
+                      common["Types"].typedefs["T"])
+        self.assertIs(self.processor.get_package("A"), a)
+
+    def test_reload_while_reading(self):
+        self.processor.max_packages = 1
+        self._import("a.fidl")
+        self._import("c.fidl")
+        errors = []
+
+        def read():
+            with self.processor.reading():
+                try:
+                    self.processor.get_package("Common")
+                except ProcessorException as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.daemon = True
+        reader.start()
+        reader.join(30)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.processor.get_package("Common").name, "Common")
+
+    def test_counters(self):
+        self._import("a.fidl")
+        self._import("a.fidl")
+        self._import("common.fidl")
+        self.assertEqual(self.processor.misses, 2)
+        self.assertEqual(self.processor.hits, 2)
+
+    def test_unload(self):
+        self.processor.max_packages = None
+        self._import("a.fidl")
+        self._import("c.fidl")
+        unloaded = self.processor.unload([self.get_spec(
+            filename="common.fidl")])
+        # Importers of the unloaded package are unloaded as well.
+        self.assertEqual(unloaded, set([self.get_spec(filename="common.fidl"),
+                                        self.get_spec(filename="a.fidl")]))
+        self.assertEqual(list(self.processor.packages), ["C"])
+        self.assertEqual(self.processor.evictions, 0)
+        self.assertIsNone(self.processor.get_package("A"))
+        a = self._import("a.fidl")
+        self.assertIs(a["Types"].structs["S"].fields["t"].type.reference,
+                      self.processor.packages["Common"]["Types"].typedefs["T"])
+
+
+class TestWeakReferences(BaseTestCase):
+    """Test linking with weak references."""
+
+    def setUp(self):
+        super(TestWeakReferences, self).setUp()
+        self.tmp_fidl("common.fidl", """
+            package Common
+            typeCollection Types {
+                struct Node { Node[] children }
+                struct Leaf extends Node { UInt8 value }
+            }
+            typeCollection More { typedef T is Node }
+        """)
+        self.tmp_fidl("interfaces.fidl", """
+            package Common
+            import Common.Types.* from "common.fidl"
+            interface Base { attribute Leaf leaf }
+        """)
+        self.fspec = self.tmp_fidl("model.fidl", """
+            package P
+            import model "common.fidl"
+            import model "interfaces.fidl"
+            interface I extends Base { method M { in { Node node } } }
+        """)
+        self.processor.weak_references = True
+
+    def _references(self):
+        processor = self.processor
+        common = processor.packages["Common"]
+        types = common.typecollections["Types"]
+        node = types.structs["Node"]
+        self.assertIs(types.package, common)
+        self.assertIs(node.namespace, types)
+        self.assertIs(node.fields["children"].type.type.reference, node)
+        self.assertIs(types.structs["Leaf"].reference, node)
+        self.assertIn(common.typecollections["More"],
+                      types.namespace_references)
+        i = processor.packages["P"].interfaces["I"]
+        self.assertIs(i.reference, common.interfaces["Base"])
+        self.assertIs(i.reference.package, common)
+        self.assertIs(processor.packages["P"].imports[0].package_reference,
+                      common)
+        self.assertEqual(list(processor.all_fields(types.structs["Leaf"])),
+                         ["children", "value"])
+        self.assertEqual(list(processor.all_attributes(i)), ["leaf"])
+
+    def test_references(self):
+        self.processor.import_file(self.fspec)
+        self._references()
+
+    def test_freed_without_garbage_collection(self):
+        self.processor.import_file(self.fspec)
+        ref = weakref.ref(
+            self.processor.packages["Common"].typecollections["Types"])
+        gc.disable()
+        try:
+            self.processor = None
+            self.assertIsNone(ref())
+        finally:
+            gc.enable()
+
+    def test_pickle(self):
+        self.processor.import_file(self.fspec)
+        packages = pickle.loads(pickle.dumps(self.processor.packages,
+                                             pickle.HIGHEST_PROTOCOL))
+        node = packages["Common"].typecollections["Types"].structs["Node"]
+        self.assertIs(node.namespace.package, packages["Common"])
+        self.assertIs(node.fields["children"].type.type.reference, node)
+
+    def test_fork(self):
+        self.processor.import_file(self.fspec)
+        fork = self.processor.fork()
+        fork.import_string("overlay.fidl", """
+            package Common
+            typeCollection Overlay { typedef U is UInt8 }
+        """)
+        self.processor = None
+        gc.collect()
+        types = fork.packages["Common"].typecollections["Types"]
+        # Shared namespaces refer to the package of the original processor.
+        self.assertEqual(types.package.name, "Common")
+        self.assertIsNot(types.package, fork.packages["Common"])
+        self.assertIs(fork.packages["P"].imports[0].package_reference
+                      .typecollections["Types"], types)
+        self.assertIsNotNone(fork.packages["Common"]
+                             .typecollections["Overlay"].package)
+
+
+class TestBulkLoad(BaseTestCase):
+    """Test suspending the garbage collection while importing."""
+
+    def setUp(self):
+        super(TestBulkLoad, self).setUp()
+        self.fspec = self.tmp_fidl("model.fidl", """
+            package P
+            typeCollection TC { struct S { UInt8 x } }
+        """)
+
+    def tearDown(self):
+        gc.enable()
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+        super(TestBulkLoad, self).tearDown()
+
+    def test_collection_suspended(self):
+        with self.processor.bulk_load(freeze=False):
+            self.assertFalse(gc.isenabled())
+            with self.processor.bulk_load(freeze=False):
+                self.processor.import_file(self.fspec)
+            self.assertFalse(gc.isenabled())
+        self.assertTrue(gc.isenabled())
+        self.assertIn("P", self.processor.packages)
+
+    def test_disabled_collection(self):
+        gc.disable()
+        with self.processor.bulk_load(freeze=False):
+            self.processor.import_file(self.fspec)
+        self.assertFalse(gc.isenabled())
+
+    def test_error(self):
+        with self.assertRaises(ProcessorException):
+            with self.processor.bulk_load(freeze=False):
+                self.processor.import_file("missing.fidl")
+        self.assertTrue(gc.isenabled())
+
+    @unittest.skipUnless(hasattr(gc, "freeze"), "requires gc.freeze()")
+    def test_freeze(self):
+        with self.processor.bulk_load():
+            self.processor.import_file(self.fspec)
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertTrue(gc.isenabled())
+
+
+class TestArtifact(BaseTestCase):
+    """Test saving and loading the linked state."""
+
+    def setUp(self):
+        super(TestArtifact, self).setUp()
+        self.tmp_fidl("common.fidl", """
+            package Common
+            typeCollection Types {
+                struct Node { Node[] children }
+                struct Leaf extends Node { UInt8 value }
+            }
+            typeCollection More { typedef T is Node }
+        """)
+        self.tmp_fidl("interfaces.fidl", """
+            package Common
+            import Common.Types.* from "common.fidl"
+            interface Base { attribute Leaf leaf }
+        """)
+        self.fspec = self.tmp_fidl("model.fidl", """
+            package P
+            import model "common.fidl"
+            import model "interfaces.fidl"
+            interface I extends Base { method M { in { Node node } } }
+        """)
+        self.tmp_fidl("other.fidl", """
+            package Other
+            typeCollection TC { typedef T is UInt8 }
+        """)
+        self.artifact = self.get_spec(filename="model.pfa")
+
+    def _save(self):
+        self.processor.import_file(self.fspec)
+        self.processor.import_file("other.fidl")
+        self.processor.save(self.artifact)
+        self.processor = Processor()
+        self.processor.package_paths.append(self.get_spec())
+
+    def _references(self):
+        processor = self.processor
+        common = processor.packages["Common"]
+        types = common.typecollections["Types"]
+        node = types.structs["Node"]
+        self.assertIs(types.package, common)
+        self.assertIs(node.fields["children"].type.type.reference, node)
+        self.assertIs(types.structs["Leaf"].reference, node)
+        self.assertIn(common.typecollections["More"],
+                      types.namespace_references)
+        i = processor.packages["P"].interfaces["I"]
+        self.assertIs(i.reference, common.interfaces["Base"])
+        self.assertIs(i.methods["M"].in_args["node"].type.reference, node)
+        self.assertIs(processor.packages["P"].imports[0].package_reference,
+                      common)
+        self.assertIs(processor.files[self.fspec], processor.packages["P"])
+        self.assertEqual(list(processor.all_fields(types.structs["Leaf"])),
+                         ["children", "value"])
+        self.assertEqual(list(processor.all_attributes(i)), ["leaf"])
+        self.assertEqual(
+            sorted(usage.kind for usage in processor.get_usages(node)),
+            ["argument", "extends", "field", "typedef"])
+
+    def test_load(self):
+        self._save()
+        self.processor.load(self.artifact)
+        self.assertEqual(sorted(self.processor.packages),
+                         ["Common", "Other", "P"])
+        self.assertIsNone(self.processor.parser)
+        self._references()
+
+    def test_lazy(self):
+        self._save()
+        self.processor.load(self.artifact, lazy=True)
+        self.assertEqual(self.processor.packages, {})
+        self.processor.import_file(self.fspec)
+        self.assertEqual(sorted(self.processor.packages), ["Common", "P"])
+        self.assertIsNone(self.processor.parser)
+        self._references()
+        self.assertIsNotNone(self.processor.get_package("Other"))
+
+    def test_import_into_lazy_package(self):
+        self._save()
+        self.processor.load(self.artifact, lazy=True)
+        self.processor.import_string("overlay.fidl", """
+            package Common
+            typeCollection Overlay { typedef U is UInt8 }
+        """)
+        common = self.processor.packages["Common"]
+        self.assertEqual(list(common.typecollections),
+                         ["Types", "More", "Overlay"])
+        self.processor.import_file(self.fspec)
+        self._references()
+
+    def test_weak_references(self):
+        self.processor.weak_references = True
+        self._save()
+        self.processor.load(self.artifact)
+        self.assertTrue(self.processor.weak_references)
+        self._references()
+
+    def test_mutual_dependency(self):
+        self.tmp_fidl("a.fidl", """
+            package A
+            typeCollection T { struct S { UInt8 x } }
+        """)
+        self.tmp_fidl("b.fidl", """
+            package B
+            import A.T.* from "a.fidl"
+            typeCollection U { struct R { S s } }
+        """)
+        self.processor.import_file("b.fidl")
+        self.processor.import_string("a2.fidl", """
+            package A
+            import B.U.* from "b.fidl"
+            typeCollection V { struct W { R r } }
+        """)
+        self.processor.save(self.artifact)
+        self.processor = Processor()
+        self.processor.load(self.artifact, lazy=True)
+        b = self.processor.get_package("B")
+        a = self.processor.packages["A"]
+        r = b.typecollections["U"].structs["R"]
+        self.assertIs(r.fields["s"].type.reference,
+                      a.typecollections["T"].structs["S"])
+        self.assertIs(a.typecollections["V"].structs["W"].fields["r"]
+                      .type.reference, r)
+
+    def test_changed_model(self):
+        self._save()
+        self.tmp_fidl("other.fidl", """
+            package Other
+            typeCollection TC { typedef T is UInt16 }
+        """)
+        with self.assertRaises(ProcessorException) as context:
+            self.processor.load(self.artifact)
+        self.assertEqual(
+            str(context.exception),
+            "Model artifact '{}' outdated, '{}' changed.".format(
+                self.artifact, self.get_spec(filename="other.fidl")))
+
+    def test_other_version(self):
+        self._save()
+        with open(self.artifact, "rb") as f:
+            artifact = pickle.load(f)
+        artifact["version"] = "0.1"
+        with open(self.artifact, "wb") as f:
+            pickle.dump(artifact, f)
+        with self.assertRaises(ProcessorException) as context:
+            self.processor.load(self.artifact)
+        self.assertEqual(str(context.exception),
+                         "Model artifact '{}' saved by pyfranca 0.1.".format(
+                             self.artifact))
+
+    def test_invalid(self):
+        with self.assertRaises(ProcessorException):
+            self.processor.load(self.fspec)
+        self._save()
+        self.processor.import_file("other.fidl")
+        with self.assertRaises(ProcessorException):
+            self.processor.load(self.artifact)
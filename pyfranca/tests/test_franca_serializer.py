@@ -0,0 +1,201 @@
+"""
+Pyfranca serializer tests.
+"""
+
+import io
+from pyfranca import Processor, Parser
+from pyfranca.franca_fingerprint import fingerprint
+from pyfranca.franca_serializer import Serializer, dump, dumps, \
+    SerializerException
+from pyfranca import ast
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """<** @description: Test package. **>
+package P
+
+import P.Other.* from "other.fidl"
+import model "common.fidl"
+
+typeCollection TC {
+	version { major 1 minor 2 }
+
+	typedef T is UInt8[]
+
+	<**
+		@description: Colors.
+		@author: Somebody
+	**>
+	enumeration E {
+		A
+		<** @deprecated **>
+		B = 0x1F
+		C = 0b101
+		D = 7
+	}
+
+	enumeration F extends E {
+		G
+	}
+
+	struct S polymorphic {
+		<** @description: Time. **>
+		UInt64 time
+		P.Other.X[] values
+	}
+
+	struct Derived extends S {
+	}
+
+	union U {
+		Int8 a
+		String s
+	}
+
+	array A of String
+
+	map M {
+		UInt16 to S
+	}
+
+	const UInt32 HEX = 0xFF
+
+	const Boolean FLAG = true
+
+	const Float PI = 3.14f
+
+	const Double E2 = 100.5d
+
+	const String NAME = "name"
+}
+
+interface I extends P.Base {
+	attribute UInt8 a readonly noSubscriptions
+
+	method m fireAndForget {
+		in {
+			<** @description: Input. **>
+			Int32 x
+		}
+	}
+
+	method n {
+		in {
+			UInt8 x
+		}
+		out {
+			Boolean ok
+		}
+		error {
+			FAILED
+			TIMEOUT = 10
+		}
+	}
+
+	method o {
+		error P.TC.E
+	}
+
+	broadcast b selective {
+		out {
+			UInt8[] data
+		}
+	}
+}
+"""
+
+
+class TestSerializer(BaseTestCase):
+
+    def _parse(self, text):
+        return Parser().parse(text)
+
+    def test_canonical_round_trip(self):
+        package = self._parse(MODEL)
+        self.assertEqual(dumps(package), MODEL)
+
+    def test_reformatting(self):
+        package = self._parse("package P typeCollection TC {"
+                              "struct S{UInt8 a} const UInt8 C=0b11}")
+        self.assertEqual(dumps(package, indent="    "),
+                         "package P\n"
+                         "\n"
+                         "typeCollection TC {\n"
+                         "    struct S {\n"
+                         "        UInt8 a\n"
+                         "    }\n"
+                         "\n"
+                         "    const UInt8 C = 0b11\n"
+                         "}\n")
+
+    def test_equal_models(self):
+        fidl = MODEL.replace("import P.Other.* from \"other.fidl\"\n", "") \
+            .replace("import model \"common.fidl\"\n", "") \
+            .replace("P.Other.X[]", "UInt8[]") \
+            .replace(" extends P.Base", "")
+        self.processor.import_string("first.fidl", fidl)
+        first = self.processor.packages["P"]
+        other = Processor()
+        other.import_string("second.fidl", dumps(first))
+        second = other.packages["P"]
+        self.assertEqual(fingerprint(first, comments=True),
+                         fingerprint(second, comments=True))
+
+    def test_linked_round_trip(self):
+        # Linking strips the qualifiers telling the types T apart.
+        self.processor.import_string("first.fidl", """
+            package P
+            typeCollection A { typedef T is UInt8 }
+            typeCollection B {
+                typedef T is String
+                struct S { P.A.T first B.T second }
+            }
+            interface I { attribute P.A.T a attribute P.B.T b }
+        """)
+        self.processor.import_string("second.fidl", """
+            package Q
+            import model "first.fidl"
+            interface J { attribute P.B.T b }
+        """)
+        first = self.processor.packages["P"]
+        text = dumps(first)
+        self.assertIn("\t\tA.T first\n\t\tB.T second\n", text)
+        other = Processor()
+        other.import_string("first.fidl", text)
+        other.import_string("second.fidl",
+                            dumps(self.processor.packages["Q"]))
+        second = other.packages["P"]
+        self.assertIs(second["B"].structs["S"].fields["first"].type.reference,
+                      second["A"].typedefs["T"])
+        self.assertIs(second["I"].attributes["b"].type.reference,
+                      second["B"].typedefs["T"])
+        self.assertIs(other.packages["Q"]["J"].attributes["b"].type.reference,
+                      second["B"].typedefs["T"])
+        self.assertEqual(dumps(second), text)
+
+    def test_members(self):
+        package = self._parse(MODEL)
+        self.assertEqual(dumps(package["TC"].maps["M"]),
+                         "map M {\n\tUInt16 to S\n}\n")
+        self.assertEqual(dumps(package["I"].attributes["a"]),
+                         "attribute UInt8 a readonly noSubscriptions\n")
+
+    def test_streams(self):
+        package = self._parse(MODEL)
+        stream = io.StringIO()
+        dump(package, stream)
+        self.assertEqual(stream.getvalue(), MODEL)
+        pieces = []
+
+        class Recorder(object):
+            write = pieces.append
+
+        Serializer(Recorder()).write(package)
+        self.assertEqual("".join(pieces), MODEL)
+
+    def test_errors(self):
+        constant = ast.Constant("C", ast.String(), ast.StringValue("a\"b"))
+        with self.assertRaises(SerializerException):
+            dumps(constant)
+        with self.assertRaises(SerializerException):
+            dumps(ast.Version(1, 0))
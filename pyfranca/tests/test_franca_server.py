@@ -0,0 +1,226 @@
+"""
+Pyfranca server tests.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from pyfranca.franca_server import Server, request
+from .test_franca_processor import BaseTestCase
+
+
+class BaseServerTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(BaseServerTestCase, self).setUp()
+        self.server = Server()
+
+    def _call(self, method, **params):
+        return self.server.handle({"id": 1, "method": method,
+                                   "params": params})
+
+
+class TestValidate(BaseServerTestCase):
+    """Test the validate method."""
+
+    def test_valid(self):
+        fspec = self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        response = self._call("validate", files=[fspec])
+        self.assertEqual(response["id"], 1)
+        self.assertTrue(response["result"]["valid"])
+        self.assertEqual(response["result"]["files"], [fspec])
+        self.assertFalse(response["result"]["cached"])
+
+    def test_invalid(self):
+        fspec = self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Unknown }
+        """)
+        response = self._call("validate", files=[fspec])
+        result = response["result"]
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["error"]["type"], "ProcessorException")
+        self.assertEqual(result["error"]["message"],
+                         "Unresolved reference 'Unknown'.")
+        self.assertEqual(result["error"]["file"], fspec)
+        self.assertEqual((result["error"]["line"], result["error"]["column"]),
+                         (3, 46))
+
+    def test_unchanged_model_is_reused(self):
+        fspec = self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        self._call("validate", files=[fspec])
+        response = self._call("validate", files=[fspec])
+        self.assertTrue(response["result"]["cached"])
+
+    def test_only_changed_files_are_parsed(self):
+        self.tmp_fidl("common.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        fspec = self.tmp_fidl("test.fidl", """
+            package P2
+            import P.TC.* from "common.fidl"
+            typeCollection TC2 { typedef B is A }
+        """)
+        self._call("validate", files=[fspec])
+        self.assertEqual(self.server.parse_cache.misses, 2)
+        self.tmp_fidl("test.fidl", """
+            package P2
+            import P.TC.* from "common.fidl"
+            typeCollection TC2 { typedef C is A }
+        """)
+        response = self._call("validate", files=[fspec])
+        self.assertTrue(response["result"]["valid"])
+        self.assertFalse(response["result"]["cached"])
+        self.assertEqual(self.server.parse_cache.misses, 3)
+        self.assertEqual(self.server.parse_cache.hits, 1)
+
+    def test_fixed_model(self):
+        fspec = self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC { typedef A is B }
+        """)
+        response = self._call("validate", files=[fspec])
+        self.assertFalse(response["result"]["valid"])
+        self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC { typedef A is Int32 }
+        """)
+        response = self._call("validate", files=[fspec])
+        self.assertTrue(response["result"]["valid"])
+
+    def test_missing_file(self):
+        response = self._call("validate", files=[
+            self.get_spec(filename="nosuch.fidl")])
+        self.assertFalse(response["result"]["valid"])
+        self.assertEqual(response["result"]["error"]["type"],
+                         "ProcessorException")
+
+    def test_directory(self):
+        response = self._call("validate", files=[self.get_spec()])
+        self.assertFalse(response["result"]["valid"])
+        self.assertEqual(response["result"]["error"]["type"],
+                         "ProcessorException")
+        # The server is still serving.
+        self.assertEqual(self._call("ping")["result"], "pong")
+
+    def test_invalid_files(self):
+        for files in ("test.fidl", [1]):
+            response = self._call("validate", files=files)
+            self.assertEqual(response["error"]["type"], "ServerException")
+
+
+class TestQueries(BaseServerTestCase):
+    """Test the dump and resolve methods."""
+
+    def setUp(self):
+        super(TestQueries, self).setUp()
+        self.fspec = self.tmp_fidl("test.fidl", """
+            package P
+            typeCollection TC {
+                <** @description: A type **>
+                typedef A is Int32
+                typedef B is A
+                const UInt8 C = 1
+            }
+            interface I {
+                version { major 1 minor 2 }
+                method M {}
+            }
+        """)
+
+    def test_dump(self):
+        response = self._call("dump", files=[self.fspec])
+        package = response["result"]["packages"][0]
+        self.assertEqual(package["name"], "P")
+        self.assertEqual(package["typecollections"][0]["typedefs"],
+                         ["A", "B"])
+        self.assertEqual(package["interfaces"][0]["version"], "1.2")
+        self.assertEqual(package["interfaces"][0]["methods"], ["M"])
+
+    def test_resolve(self):
+        response = self._call("resolve", files=[self.fspec], fqn="P.TC.B")
+        result = response["result"]
+        self.assertEqual(result["kind"], "Typedef")
+        self.assertEqual(result["type"], "P.TC.A")
+        response = self._call("resolve", files=[self.fspec], fqn="P.TC.A")
+        self.assertEqual(response["result"]["type"], "Int32")
+        self.assertEqual(response["result"]["comments"],
+                         {"@description": "A type"})
+
+    def test_resolve_constant(self):
+        response = self._call("resolve", files=[self.fspec], fqn="P.TC.C")
+        self.assertEqual(response["result"]["kind"], "Constant")
+
+    def test_resolve_unknown(self):
+        response = self._call("resolve", files=[self.fspec], fqn="P.TC.X")
+        self.assertEqual(response["error"]["message"],
+                         "Unresolved reference 'P.TC.X'.")
+
+
+class TestProtocol(BaseServerTestCase):
+    """Test request framing and transports."""
+
+    def test_unknown_method(self):
+        response = self._call("nosuch")
+        self.assertEqual(response["error"]["message"],
+                         "Unknown method 'nosuch'.")
+
+    def test_invalid_params(self):
+        response = self.server.handle(
+            {"id": 1, "method": "validate", "params": [1]})
+        self.assertEqual(response["id"], 1)
+        self.assertEqual(response["error"]["message"],
+                         "Invalid 'params', expected an object.")
+
+    def test_invalid_json(self):
+        response = json.loads(self.server.handle_line("{"))
+        self.assertEqual(response["error"]["type"], "ServerException")
+
+    def test_stream(self):
+        instream = StringIO(
+            '{"id": 1, "method": "ping"}\n'
+            '\n'
+            '{"id": 2, "method": "shutdown"}\n'
+            '{"id": 3, "method": "ping"}\n')
+        outstream = StringIO()
+        self.server.serve_stream(instream, outstream)
+        lines = outstream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), {"id": 1, "result": "pong"})
+        self.assertEqual(json.loads(lines[1]), {"id": 2, "result": None})
+
+    @unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"),
+                         "Unix sockets not available.")
+    def test_unix_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), "server.sock")
+        thread = threading.Thread(target=self.server.serve_unix,
+                                  args=(path,))
+        thread.start()
+        try:
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.01)
+            response = request(path, "ping")
+            self.assertEqual(response["result"], "pong")
+        finally:
+            request(path, "shutdown")
+            thread.join()
+        self.assertFalse(os.path.exists(path))
+        os.rmdir(os.path.dirname(path))
@@ -0,0 +1,139 @@
+"""
+Pyfranca payload validation tests.
+"""
+
+from pyfranca.franca_validation import type_validator, method_validators, \
+    broadcast_validator, ValidationException
+from .test_franca_processor import BaseTestCase
+
+
+MODEL = """
+package P
+typeCollection TC {
+    enumeration E { A B = 5 C }
+    enumeration F extends E { D }
+    struct Position { Double latitude Double longitude Float altitude }
+    struct Base { UInt8 a }
+    struct Derived extends Base { Position p E e }
+    union U { UInt8 x String s }
+    array Bytes of UInt8
+    map Names { UInt16 to String }
+    typedef T is Derived
+    struct Node { String name Node[] children }
+}
+interface I {
+    method M { in { Int8 x Bytes b } out { Boolean ok } }
+    broadcast B { out { U u Names n ByteBuffer data } }
+}
+"""
+
+
+class TestValidation(BaseTestCase):
+
+    def setUp(self):
+        super(TestValidation, self).setUp()
+        self.processor.import_string("model.fidl", MODEL)
+        self.tc = self.processor.packages["P"]["TC"]
+        self.i = self.processor.packages["P"]["I"]
+
+    def test_struct(self):
+        validator = type_validator(self.tc.typedefs["T"])
+        self.assertIs(validator, type_validator(self.tc.structs["Derived"]))
+        value = {"a": 1, "e": "B",
+                 "p": {"latitude": 48.1, "longitude": 11, "altitude": 520}}
+        self.assertIsNone(validator.validate(value))
+        value["p"]["altitude"] = "high"
+        self.assertEqual(validator.validate(value),
+                         "$.p.altitude: Expected Float, got str.")
+        del value["p"]
+        self.assertEqual(validator.validate(value), "$: Missing field 'p'.")
+        self.assertEqual(validator.validate([]),
+                         "$: Expected Derived, got list.")
+
+    def test_unknown_field(self):
+        validator = type_validator(self.tc.structs["Base"])
+        self.assertEqual(validator.validate({"a": 1, "b": 2}),
+                         "$: Unknown field 'b'.")
+
+    def test_integer_ranges(self):
+        validator = type_validator(self.tc.structs["Base"])
+        self.assertTrue(validator.is_valid({"a": 255}))
+        self.assertEqual(validator.validate({"a": 256}),
+                         "$.a: 256 is out of the range of UInt8.")
+        self.assertEqual(validator.validate({"a": -1}),
+                         "$.a: -1 is out of the range of UInt8.")
+        self.assertEqual(validator.validate({"a": True}),
+                         "$.a: Expected UInt8, got bool.")
+        self.assertEqual(validator.validate({"a": 1.0}),
+                         "$.a: Expected UInt8, got float.")
+
+    def test_enumerations(self):
+        validator = type_validator(self.tc.enumerations["F"])
+        for value in ("A", "D", 0, 5, 6, 7):
+            self.assertTrue(validator.is_valid(value), value)
+        self.assertEqual(validator.validate(1),
+                         "$: Unknown enumerator 1.")
+        self.assertEqual(validator.validate("X"),
+                         "$: Unknown enumerator 'X'.")
+        self.assertFalse(validator.is_valid(True))
+
+    def test_unions(self):
+        validator = type_validator(self.tc.unions["U"])
+        self.assertTrue(validator.is_valid({"s": "text"}))
+        self.assertEqual(validator.validate({"s": 1}),
+                         "$.s: Expected String, got int.")
+        self.assertEqual(validator.validate({"y": 1}),
+                         "$: Unknown alternative 'y'.")
+        self.assertEqual(validator.validate({}),
+                         "$: Expected one alternative of U, got 0.")
+
+    def test_arrays_and_maps(self):
+        validator = type_validator(self.tc.arrays["Bytes"])
+        self.assertTrue(validator.is_valid([1, 2, 3]))
+        self.assertEqual(validator.validate([1, 2, 300]),
+                         "$[2]: 300 is out of the range of UInt8.")
+        validator = type_validator(self.tc.maps["Names"])
+        self.assertTrue(validator.is_valid({1: "one"}))
+        self.assertTrue(validator.is_valid([[1, "one"], [2, "two"]]))
+        self.assertEqual(validator.validate({1: 1}),
+                         "$[1]: Expected String, got int.")
+        self.assertEqual(validator.validate({"1": "one"}),
+                         "$['1'] (key): Expected UInt16, got str.")
+        self.assertEqual(validator.validate([[1]]),
+                         "$[0]: Expected a key-value pair.")
+
+    def test_recursive_types(self):
+        validator = type_validator(self.tc.structs["Node"])
+        value = {"name": "root", "children": [
+            {"name": "leaf", "children": []},
+            {"name": "bad", "children": [{"name": 1, "children": []}]}]}
+        self.assertEqual(validator.validate(value),
+                         "$.children[1].children[0].name: "
+                         "Expected String, got int.")
+
+    def test_methods_and_broadcasts(self):
+        request, response = method_validators(self.i.methods["M"])
+        self.assertIs(request, method_validators(self.i.methods["M"])[0])
+        self.assertTrue(request.is_valid({"x": -128, "b": [0]}))
+        self.assertEqual(request.validate({"x": -129, "b": []}),
+                         "$.x: -129 is out of the range of Int8.")
+        self.assertTrue(response.is_valid({"ok": False}))
+        validator = broadcast_validator(self.i.broadcasts["B"])
+        self.assertTrue(validator.is_valid(
+            {"u": {"x": 1}, "n": {}, "data": "AAE="}))
+
+    def test_check(self):
+        validator = type_validator(self.tc.structs["Base"])
+        validator.check({"a": 0})
+        with self.assertRaises(ValidationException) as context:
+            validator.check({"a": "0"})
+        self.assertEqual(str(context.exception),
+                         "$.a: Expected UInt8, got str.")
+
+    def test_batch(self):
+        validator = type_validator(self.tc.structs["Base"])
+        errors = validator.validate_batch(
+            [{"a": 0}, {"a": 1000}, {"a": 1}, {}])
+        self.assertEqual(errors, [
+            (1, "$.a: 1000 is out of the range of UInt8."),
+            (3, "$: Missing field 'a'.")])
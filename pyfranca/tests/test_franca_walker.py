@@ -0,0 +1,130 @@
+"""
+Pyfranca AST walker tests.
+"""
+
+from pyfranca import ast
+from pyfranca.franca_walker import walk, walk_with_parents, children, \
+    Visitor, MultiVisitor
+from .test_franca_processor import BaseTestCase
+
+
+class BaseWalkerTestCase(BaseTestCase):
+
+    def setUp(self):
+        super(BaseWalkerTestCase, self).setUp()
+        self.tmp_fidl("common.fidl", """
+            package Common
+            typeCollection Types {
+                typedef Timestamp is UInt64
+                struct Sample { Timestamp time Float[] values }
+            }
+        """)
+        self.import_tmp_fidl("test.fidl", """
+            package P
+            import model "common.fidl"
+            typeCollection TC {
+                version { major 1 minor 0 }
+                enumeration E { A B = 2 }
+                map M { String to Sample }
+                const UInt8 C = 1
+            }
+            interface I {
+                attribute Sample a
+                method Get { in { UInt8 x } out { Sample y } error { FAILED } }
+                broadcast Changed { out { Timestamp t } }
+            }
+        """)
+        self.p = self.processor.packages["P"]
+
+
+class TestWalk(BaseWalkerTestCase):
+    """Test generator based traversal."""
+
+    def test_order(self):
+        names = [node.name for node in walk(self.p, ast.Type)
+                 if not isinstance(node, ast.PrimitiveType)]
+        self.assertEqual(names, [
+            "a", "Sample", "Get", "Sample", "Changed", "Timestamp",
+            "E", "IntegerValue", "M", "Sample", "C", "IntegerValue"])
+
+    def test_kinds(self):
+        nodes = list(walk(self.processor.packages,
+                          (ast.Struct, ast.Enumerator)))
+        self.assertEqual(sorted(node.name for node in nodes),
+                         ["A", "B", "FAILED", "Sample"])
+
+    def test_namespace_members(self):
+        i = self.p.interfaces["I"]
+        self.assertEqual([node.name for node in children(i)],
+                         ["a", "Get", "Changed"])
+        self.assertEqual(len(list(walk(i, ast.Argument))), 3)
+
+    def test_parents(self):
+        for node, parent in walk_with_parents(self.p, ast.Argument):
+            self.assertIsInstance(parent, (ast.Method, ast.Broadcast))
+
+    def test_follow_references(self):
+        structs = list(walk(self.p, ast.Struct))
+        self.assertEqual(structs, [])
+        structs = list(walk(self.p, ast.Struct, follow_references=True))
+        self.assertEqual([s.name for s in structs], ["Sample"])
+        typedefs = list(walk(self.p, ast.Typedef, follow_references=True))
+        self.assertEqual([t.name for t in typedefs], ["Timestamp"])
+
+    def test_deep_model(self):
+        # Deeper than the default recursion limit.
+        node = ast.Int32()
+        for _ in range(5000):
+            node = ast.Array(None, node)
+        self.assertEqual(len(list(walk(node, ast.Array))), 5000)
+
+    def test_lazy(self):
+        nodes = walk(self.processor.packages)
+        self.assertIsInstance(next(nodes), ast.Package)
+
+
+class TestMultiVisitor(BaseWalkerTestCase):
+    """Test sharing a traversal between visitors."""
+
+    def test_run(self):
+        class Counter(Visitor):
+            def __init__(self):
+                self.structs = 0
+                self.primitives = 0
+
+            def visit_Struct(self, node, parent):
+                self.structs += 1
+
+            def visit_PrimitiveType(self, node, parent):
+                self.primitives += 1
+
+        class Collector(Visitor):
+            def __init__(self):
+                self.methods = []
+
+            def visit_Method(self, node, parent):
+                self.methods.append((node.name, parent.name))
+
+        counter = Counter()
+        collector = Collector()
+        MultiVisitor([counter, collector]).run(self.processor.packages)
+        self.assertEqual(counter.structs, 1)
+        self.assertEqual(counter.primitives, 5)
+        self.assertEqual(collector.methods, [("Get", "I")])
+
+    def test_most_specific_method(self):
+        class TypeVisitor(Visitor):
+            def __init__(self):
+                self.types = []
+                self.structs = []
+
+            def visit_Type(self, node, parent):
+                self.types.append(node)
+
+            def visit_Struct(self, node, parent):
+                self.structs.append(node)
+
+        visitor = TypeVisitor()
+        MultiVisitor([visitor]).run(self.processor.packages["Common"])
+        self.assertEqual(len(visitor.structs), 1)
+        self.assertNotIn(visitor.structs[0], visitor.types)
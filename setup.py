@@ -35,13 +35,21 @@ setup(
     platforms="Python 2.7 or 3.4 .",
     keywords=["franca", "franca-idl", "idl", "fidl", "parsing"],
     install_requires=["ply"],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     setup_requires=[
         'setuptools_pep8',
         'sphinx',
     ],
     test_suite="pyfranca.tests.get_suite",
     scripts=[
+        "tools/fidl_diff.py",
         "tools/fidl_dump.py",
+        "tools/fidl_formatter.py",
+        "tools/fidl_lint.py",
+        "tools/fidl_lsp.py",
+        "tools/fidl_server.py",
         "tools/fidl_validator.py",
     ],
 )
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import argparse
+from pyfranca import Processor, LexerException, ParserException, \
+    ProcessorException
+from pyfranca.franca_diff import diff, is_compatible
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compares two versions of a Franca IDL model.")
+    parser.add_argument(
+        "old",
+        help="Old model FIDL file.")
+    parser.add_argument(
+        "new",
+        help="New model FIDL file.")
+    parser.add_argument(
+        "-I", "--import", dest="import_dirs", metavar="import_dir",
+        action="append", help="Model import directories of the new model.")
+    parser.add_argument(
+        "-O", "--old-import", dest="old_import_dirs", metavar="import_dir",
+        action="append", help="Model import directories of the old model.")
+    args = parser.parse_args()
+    return args
+
+
+def load(fidl, import_dirs):
+    processor = Processor()
+    if import_dirs:
+        processor.package_paths.extend(import_dirs)
+    try:
+        processor.import_file(fidl)
+    except (LexerException, ParserException, ProcessorException) as e:
+        print("ERROR: {}: {}".format(fidl, e))
+        exit(2)
+    return processor
+
+
+def main():
+    args = parse_command_line()
+
+    old = load(args.old, args.old_import_dirs)
+    new = load(args.new, args.import_dirs)
+    changes = diff(old, new)
+    for change in changes:
+        print(change)
+    if not is_compatible(changes):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 import argparse
 from pyfranca import Processor, LexerException, ParserException, \
     ProcessorException
+from pyfranca.franca_layout import layout, method_layouts, \
+    broadcast_layout
 
 
 def dump_comments(item, prefix):
@@ -97,6 +99,38 @@ def dump_packages(packages):
         dump_package(package)
 
 
+def dump_layout(name, item_layout, prefix):
+    print("{}- {}: {}, aligned to {}".format(
+        prefix, name, item_layout, item_layout.alignment))
+    if item_layout.offsets:
+        for field, offset in item_layout.offsets.items():
+            if offset is not None:
+                print("{}\t{} @ {}".format(prefix, field, offset))
+
+
+def dump_namespace_layouts(namespace):
+    for members in (namespace.structs, namespace.unions):
+        for item in members.values():
+            dump_layout(item.name, layout(item), "\t\t")
+    if hasattr(namespace, "methods"):
+        for item in namespace.methods.values():
+            request, response = method_layouts(item)
+            dump_layout(item.name + " in", request, "\t\t")
+            dump_layout(item.name + " out", response, "\t\t")
+        for item in namespace.broadcasts.values():
+            dump_layout(item.name, broadcast_layout(item), "\t\t")
+
+
+def dump_layouts(packages):
+    print("Layouts:")
+    for package in packages.values():
+        print("- {}".format(package.name))
+        for namespace in list(package.typecollections.values()) + \
+                list(package.interfaces.values()):
+            print("\t- {}".format(namespace.name))
+            dump_namespace_layouts(namespace)
+
+
 def plot_namepsace_dependencie(namespace, output):
     ns_fqn = "{}.{}".format(namespace.package.name,namespace.name)
 
@@ -175,6 +209,10 @@ def parse_command_line():
                                 f    plot file dependencies
                                 c    plot type collaboration diagram
                          ''')
+    parser.add_argument(
+        "-l", "--layout", action="store_true",
+        help="Report the serialized sizes of structs, unions, methods and "
+             "broadcasts and the field offsets of fixed-size structs.")
     args = parser.parse_args()
     return args
 
@@ -193,7 +231,9 @@ def main():
         print("ERROR: {}".format(e))
         exit(1)
 
-    if args.plot is None:
+    if args.layout:
+        dump_layouts(processor.packages)
+    elif args.plot is None:
         dump_packages(processor.packages)
     elif args.plot == "p":
         plot_packages_dependencies(processor.packages)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+from pyfranca.franca_formatter import format_files, FormatCache, \
+    REFORMATTED, ERROR
+
+
+def find_files(paths):
+    """
+    Expand directories to the FIDL files they contain.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name)
+                             for name in sorted(names)
+                             if name.endswith(".fidl"))
+        else:
+            files.append(path)
+    return files
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Formats Franca IDL files.")
+    parser.add_argument(
+        "fidl", nargs="+",
+        help="Input FIDL file or directory.")
+    parser.add_argument(
+        "-c", "--check", action="store_true",
+        help="Report files that are not formatted instead of rewriting "
+             "them.")
+    parser.add_argument(
+        "--cache", metavar="cache_file",
+        help="File recording the digests of formatted files, which are "
+             "skipped.")
+    parser.add_argument(
+        "-i", "--indent", type=int, default=0,
+        help="Number of spaces per indentation level. Tabs by default.")
+    parser.add_argument(
+        "-j", "--jobs", dest="jobs", type=int, default=1,
+        help="Number of worker processes.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    indent = " " * args.indent if args.indent else "\t"
+    cache = FormatCache(args.cache, indent) if args.cache else None
+    results = format_files(find_files(args.fidl), check=args.check,
+                           jobs=args.jobs, cache=cache, indent=indent)
+    if cache is not None:
+        cache.save()
+
+    errors = False
+    changed = False
+    for path, result, message in results:
+        if result == ERROR:
+            print("ERROR: {}: {}".format(path, message))
+            errors = True
+        elif result == REFORMATTED:
+            print("{} {}".format(
+                "Would reformat" if args.check else "Reformatted", path))
+            changed = True
+    if errors:
+        exit(2)
+    if args.check and changed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
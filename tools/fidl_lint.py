@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import argparse
+from pyfranca import Processor, LexerException, ParserException, \
+    ProcessorException
+from pyfranca.franca_lint import Linter, RULES
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Checks a Franca IDL model against lint rules.")
+    parser.add_argument(
+        "fidl", nargs="+",
+        help="Input FIDL file.")
+    parser.add_argument(
+        "-I", "--import", dest="import_dirs", metavar="import_dir",
+        action="append", help="Model import directories.")
+    parser.add_argument(
+        "-d", "--disable", dest="disabled", metavar="rule",
+        action="append", choices=list(RULES.keys()),
+        help="Disable a rule. One of: {}.".format(", ".join(RULES.keys())))
+    parser.add_argument(
+        "-j", "--jobs", dest="jobs", type=int, default=1,
+        help="Number of worker processes.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    processor = Processor()
+    if args.import_dirs:
+        processor.package_paths.extend(args.import_dirs)
+
+    try:
+        for fidl in args.fidl:
+            processor.import_file(fidl)
+    except (LexerException, ParserException, ProcessorException) as e:
+        print("ERROR: {}".format(e))
+        exit(2)
+
+    disabled = args.disabled or []
+    rules = [rule() for name, rule in RULES.items() if name not in disabled]
+    diagnostics = Linter(rules).run(processor, jobs=args.jobs)
+    for diagnostic in diagnostics:
+        print(diagnostic)
+    if diagnostics:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+
+import argparse
+from pyfranca.franca_lsp import LanguageServer
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Franca IDL language server. Communicates over stdio.")
+    parser.add_argument(
+        "-I", "--import", dest="import_dirs", metavar="import_dir",
+        action="append", help="Model import directories.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    server = LanguageServer()
+    if args.import_dirs:
+        server.workspace.package_paths.extend(args.import_dirs)
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import argparse
+import sys
+from pyfranca.franca_server import Server
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Serves Franca IDL validation requests from a warm "
+                    "processor.")
+    parser.add_argument(
+        "-s", "--socket", dest="socket", metavar="socket",
+        help="Unix socket to listen on. Requests are read from stdin if "
+             "not specified.")
+    parser.add_argument(
+        "-I", "--import", dest="import_dirs", metavar="import_dir",
+        action="append", help="Model import directories.")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_command_line()
+
+    server = Server(args.import_dirs)
+    try:
+        if args.socket:
+            server.serve_unix(args.socket)
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
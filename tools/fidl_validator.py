@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 
 import argparse
+import os
+import socket
 from pyfranca import Processor, LexerException, ParserException, \
     ProcessorException
+from pyfranca.franca_server import ServerException, request
 
 
 def parse_command_line():
@@ -14,23 +17,71 @@ def parse_command_line():
     parser.add_argument(
         "-I", "--import", dest="import_dirs", metavar="import_dir",
         action="append", help="Model import directories.")
+    parser.add_argument(
+        "-e", "--max-errors", dest="max_errors", type=int,
+        help="Report up to this number of syntax errors per file instead of "
+             "stopping at the first one.")
+    parser.add_argument(
+        "-s", "--server", dest="socket", metavar="socket",
+        help="Send the request to a fidl_server.py listening on this Unix "
+             "socket.")
+    parser.add_argument(
+        "-o", "--output", metavar="artifact",
+        help="Save the linked model to this artifact for Processor.load().")
     args = parser.parse_args()
+    if args.socket and args.output:
+        parser.error("argument -o/--output: not allowed with -s/--server")
     return args
 
 
-def main():
-    args = parse_command_line()
+def validate_remote(args):
+    params = {
+        "files": [os.path.abspath(fidl) for fidl in args.fidl],
+        "import_dirs": [os.path.abspath(d) for d in args.import_dirs or []],
+    }
+    try:
+        response = request(args.socket, "validate", params)
+    except (socket.error, ServerException) as e:
+        print("ERROR: Server not available: {}".format(e))
+        exit(2)
+    if "error" in response:
+        print("ERROR: {}".format(response["error"]["message"]))
+        exit(1)
+    result = response["result"]
+    if not result["valid"]:
+        print("ERROR: {}".format(result["error"]["message"]))
+        exit(1)
 
+
+def validate_local(args):
     processor = Processor()
+    processor.max_errors = args.max_errors
     if args.import_dirs:
         processor.package_paths.extend(args.import_dirs)
 
     try:
         for fidl in args.fidl:
             processor.import_file(fidl)
-    except (LexerException, ParserException, ProcessorException) as e:
+    except ParserException as e:
+        if not e.errors:
+            print("ERROR: {}".format(e))
+        for error in e.errors:
+            print("ERROR: {}".format(error))
+        exit(1)
+    except (LexerException, ProcessorException) as e:
         print("ERROR: {}".format(e))
         exit(1)
+    if args.output:
+        processor.save(args.output)
+
+
+def main():
+    args = parse_command_line()
+
+    if args.socket:
+        validate_remote(args)
+    else:
+        validate_local(args)
 
     print("Valid Franca model.")
 